@@ -0,0 +1,123 @@
+"""
+Checkpoint journal for resumable batch runs.
+
+  checkpoint = Checkpoint("out/.checkpoint", flush_every=1000, flush_seconds=5.0)
+  run_jobs(jobs, "out/", checkpoint=checkpoint)    # skips keys already journaled
+
+The journal is a text file with one completed page key (page_key(), the
+same key that names the output file) per line, appended in batches.
+A key is recorded only after its output file has been written (atomically),
+and only for pages that built without error. So:
+
+  - a restarted run skips every journaled page and redoes the rest;
+  - pages finished after the last flush are built again, overwriting the
+    same <key>.json, so there are never duplicate outputs;
+  - a line torn by a crash mid-write is truncated away on load;
+  - once every job has been run, complete() removes the journal, so a
+    later run with the same path regenerates everything.
+
+Cost per page: one set lookup on the way in, one list append on the way
+out, and a write + fsync every flush_every pages / flush_seconds.
+"""
+
+import os
+import time
+
+
+class Checkpoint:
+    def __init__(self, path: str, flush_every: int = 1000, flush_seconds: float = 5.0, resume: bool = True):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.done = self._load() if resume else set()
+        self.done_before = len(self.done)
+        self.pending = []
+        self.recorded = 0
+        self.skipped = 0
+        self.flushes = 0
+        self.seconds = 0.0
+        self.completed = False
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        self._last_flush = time.perf_counter()
+
+    def _load(self) -> set:
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return set()
+        # Everything after the last "\n" is a torn write. Truncate it away so
+        # later appends can't complete the fragment into a key.
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            os.truncate(self.path, end)
+        return {line for line in data[:end].decode("utf-8").split("\n") if line}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def pending_jobs(self, jobs, key_of):
+        """
+        Jobs whose key isn't journaled yet; counts the rest in `skipped`.
+        """
+        for job in jobs:
+            if key_of(job) in self.done:
+                self.skipped += 1
+                continue
+            yield job
+
+    def mark(self, key: str):
+        started = time.perf_counter()
+        self.done.add(key)
+        self.pending.append(key)
+        if len(self.pending) >= self.flush_every or started - self._last_flush >= self.flush_seconds:
+            self.flush()
+        self.seconds += time.perf_counter() - started
+
+    def flush(self):
+        if self.pending:
+            self._file.write("".join(f"{key}\n" for key in self.pending))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.recorded += len(self.pending)
+            self.pending.clear()
+            self.flushes += 1
+        self._last_flush = time.perf_counter()
+
+    def complete(self):
+        """
+        The run got through every job: close and remove the journal.
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self.completed = True
+
+    def close(self):
+        if not self._file.closed:
+            started = time.perf_counter()
+            self.flush()
+            self._file.close()
+            self.seconds += time.perf_counter() - started
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def report(self) -> dict:
+        return {
+            "path": self.path,
+            "done_before": self.done_before,
+            "skipped": self.skipped,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "seconds": round(self.seconds, 4),
+            "completed": self.completed,
+        }
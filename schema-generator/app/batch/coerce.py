@@ -0,0 +1,350 @@
+"""
+Typed coercion for the numeric columns of bulk feeds.
+
+Usage (from the app/ directory):
+  python -m batch.coerce feed.csv --out feed.coerced.ndjson --errors coerce-errors.csv
+  python -m batch.coerce feed.ndjson --out feed.coerced.ndjson --chunk-size 200000
+
+Prices, ratings and day counts reach the output as whatever string the feed
+(or st.text_input) had. This stage normalizes them a whole column at a time
+with pandas / NumPy on Arrow-backed strings, instead of one Python call per cell:
+
+  price                    "$1,234.5" / "1.234,50"  -> "1234.50"  (fixed precision, rounded half up)
+  review / day counts      "12" / "12.0" / "1,200"  -> 12 / 1200  (int; "1,5" is an error)
+  rating_value, ...        "4,5"                    -> 4.5        (worstRating 1 .. bestRating)
+
+A bad cell becomes missing (so the builders leave the property out) and is
+reported as {"row", "column", "value", "error"}, rows numbered from 1.
+The coerced feed is NDJSON, readable by every batch command.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from batch.ingest import load_json
+from batch.output import dumps_ndjson_line
+
+
+PRICE_COLUMNS = ("price",)
+COUNT_COLUMNS = (
+    "review_count", "product_review_count",
+    "handling_min_days", "handling_max_days",
+    "transit_min_days", "transit_max_days",
+    "return_days",
+)
+# rating column -> column holding its bestRating (None: schema.org default)
+RATING_COLUMNS = {"rating_value": None, "product_rating_value": "product_best_rating"}
+# (minValue, maxValue) columns that must be in order
+RANGE_PAIRS = (("handling_min_days", "handling_max_days"), ("transit_min_days", "transit_max_days"))
+
+WORST_RATING = 1.0
+DEFAULT_BEST_RATING = 5.0
+# integer digits allowed in a price, so minor units stay inside int64
+MAX_PRICE_DIGITS = 15
+
+ERROR_COLUMNS = ["row", "column", "value", "error"]
+
+
+# -------------------------
+# Column helpers
+# -------------------------
+def _flags(mask) -> np.ndarray:
+    """
+    Plain bool array from a (possibly nullable) boolean Series or Arrow array;
+    missing counts as False.
+    """
+    if isinstance(mask, pd.Series):
+        mask = mask.fillna(False)
+    elif isinstance(mask, (pa.Array, pa.ChunkedArray)):
+        mask = pc.fill_null(mask, False)
+    return np.asarray(mask, dtype=bool)
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """
+    Column as stripped pandas strings; "" becomes missing.
+    """
+    text = series.astype("string[pyarrow]").str.strip()
+    return text.mask(text.fillna("") == "")
+
+
+_NUMBER = r"-?(?:\d+\.?\d*|\.\d+)"
+
+
+def _to_float(text: pd.Series) -> np.ndarray:
+    """
+    float64 array; anything that isn't a plain decimal number is NaN.
+    Validation and parsing both run in Arrow, not per cell.
+    """
+    numeric = text.where(_flags(text.str.fullmatch(_NUMBER)))
+    return numeric.astype("float64[pyarrow]").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _arrow(series: pd.Series):
+    return pa.array(series.array)
+
+
+def _to_int(strings) -> np.ndarray:
+    return np.asarray(pc.cast(strings, pa.int64()))
+
+
+def _choose(cond: np.ndarray, a: pd.Series, b: pd.Series) -> pd.Series:
+    """
+    a where cond, else b. Series.where() with a Series `other` goes through
+    Python objects for Arrow strings; pc.if_else doesn't.
+    """
+    chosen = pc.if_else(pa.array(cond), _arrow(a), _arrow(b))
+    return pd.Series(pd.arrays.ArrowStringArray(chosen), index=a.index)
+
+
+def _flag(errors: list, bad, column: str, raw: pd.Series, message: str):
+    bad = _flags(bad)
+    if bad.any():
+        errors.append(pd.DataFrame({
+            "row": raw.index[bad],
+            "column": column,
+            "value": raw[bad].astype(str).to_numpy(),
+            "error": message,
+        }))
+
+
+# -------------------------
+# Coercers (one column each)
+# -------------------------
+# Dropped from prices before validation; anything else left over is an error
+_CODES = "(?:USD|EUR|GBP|CAD|AUD|JPY|INR|CHF)"
+CURRENCY_TOKENS = rf"(?i)[$€£¥₹]|\b{_CODES}|{_CODES}\b"
+_THOUSANDS_ONLY = r"^-?\d{1,3}(?:,\d{3})+$"
+
+
+def _decimal_text(text: pd.Series) -> pd.Series:
+    """
+    One separator rule for every numeric column: a comma is the decimal
+    separator when it comes last and isn't a thousands group ("12,5",
+    "1.234,50", "1,0"; not "1,234"). Otherwise commas are thousands
+    separators and are dropped. The result still has to pass _NUMBER.
+    """
+    decimal_comma = _flags(text.str.contains(r",\d*$", regex=True) & ~text.str.match(_THOUSANDS_ONLY))
+    return _choose(
+        decimal_comma,
+        text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+        text.str.replace(",", "", regex=False),
+    )
+
+
+def coerce_price(raw: pd.Series, errors: list, column: str = "price", precision: int = 2) -> pd.Series:
+    """
+    Decimal strings with exactly `precision` places. Rounding works on the
+    digits themselves, so there is no float round-off ("2.675" -> "2.68").
+    Whitespace and currency symbols / codes (CURRENCY_TOKENS) are dropped;
+    any other character makes the cell "not a price" ("5e3", "2 x 10").
+    Separators follow _decimal_text().
+    """
+    text = _as_text(raw)
+    present = _flags(text.notna())
+    stripped = text.str.replace(CURRENCY_TOKENS, "", regex=True).str.replace(r"\s+", "", regex=True)
+    cleaned = _decimal_text(stripped.where(_flags(stripped.str.fullmatch(r"-?[\d.,]+"))))
+
+    valid = _flags(cleaned.str.fullmatch(_NUMBER))
+    negative = valid & _flags(cleaned.str.startswith("-"))
+    parts = pc.extract_regex(_arrow(cleaned.where(valid)), r"^-?0*(?P<whole>\d*)\.?(?P<frac>\d*)$")
+    whole = pc.fill_null(pc.struct_field(parts, [0]), "")
+    frac = pc.fill_null(pc.struct_field(parts, [1]), "")
+    too_large = valid & _flags(pc.greater(pc.utf8_length(whole), MAX_PRICE_DIGITS))
+    ok = valid & ~negative & ~too_large
+
+    _flag(errors, present & ~valid, column, raw, "not a price")
+    _flag(errors, negative, column, raw, "negative price")
+    _flag(errors, too_large, column, raw, "price too large")
+
+    # minor units = whole * 10^p + first p fraction digits, +1 when digit p+1 is >= 5
+    ok_arrow = pa.array(ok)
+    whole = pc.if_else(ok_arrow, whole, "")
+    frac = pc.utf8_slice_codeunits(pc.utf8_rpad(pc.if_else(ok_arrow, frac, ""), precision + 1, "0"), 0, precision + 1)
+    frac_n = _to_int(frac)
+    minor = _to_int(pc.utf8_lpad(whole, 1, "0")) * 10 ** precision + frac_n // 10 + (frac_n % 10 >= 5)
+
+    digits = pc.utf8_lpad(pc.cast(pa.array(minor), pa.string()), precision + 1, "0")
+    if precision:
+        digits = pc.utf8_replace_slice(digits, -precision, -precision, ".")
+    return pd.Series(pd.arrays.ArrowStringArray(digits), index=raw.index).where(ok)
+
+
+def coerce_count(raw: pd.Series, errors: list, column: str) -> pd.Series:
+    """
+    Non-negative whole numbers as nullable Int64 ("12.0" and "1,200" are
+    fine; "12.5" and "1,5" aren't). Separators follow _decimal_text().
+    """
+    text = _as_text(raw)
+    present = _flags(text.notna())
+    values = _to_float(_decimal_text(text))
+    finite = np.isfinite(values)
+    fractional = finite & (values != np.floor(np.where(finite, values, 0)))
+    negative = finite & (values < 0)
+    ok = finite & ~fractional & ~negative
+
+    _flag(errors, present & ~finite, column, raw, "not a number")
+    _flag(errors, fractional, column, raw, "not a whole number")
+    _flag(errors, negative, column, raw, "negative count")
+    counts = pd.arrays.IntegerArray(np.where(ok, values, 0).astype("int64"), ~ok)
+    return pd.Series(counts, index=raw.index)
+
+
+def coerce_number(raw: pd.Series, errors: list, column: str) -> pd.Series:
+    """
+    Positive numbers as float64 (NaN when missing or invalid).
+    """
+    text = _as_text(raw)
+    present = _flags(text.notna())
+    values = _to_float(_decimal_text(text))
+    finite = np.isfinite(values)
+    ok = finite & (np.where(finite, values, 0) > 0)
+
+    _flag(errors, present & ~finite, column, raw, "not a number")
+    _flag(errors, finite & ~ok, column, raw, "must be positive")
+    return pd.Series(np.where(ok, values, np.nan), index=raw.index)
+
+
+def coerce_rating(raw: pd.Series, errors: list, column: str, best: pd.Series | None = None) -> pd.Series:
+    """
+    Ratings as float64, checked against WORST_RATING .. best (per row;
+    DEFAULT_BEST_RATING where best is missing).
+    """
+    text = _as_text(raw)
+    present = _flags(text.notna())
+    values = _to_float(_decimal_text(text))
+    finite = np.isfinite(values)
+
+    upper = np.full(len(values), DEFAULT_BEST_RATING)
+    if best is not None:
+        best_values = best.to_numpy(dtype="float64", na_value=np.nan)
+        upper = np.where(np.isnan(best_values), upper, best_values)
+    checked = np.where(finite, values, WORST_RATING)
+    out_of_range = finite & ((checked < WORST_RATING) | (checked > upper))
+    ok = finite & ~out_of_range
+
+    _flag(errors, present & ~finite, column, raw, "not a number")
+    _flag(errors, out_of_range, column, raw, "rating out of range")
+    return pd.Series(np.where(ok, values, np.nan), index=raw.index)
+
+
+def coerce_frame(frame: pd.DataFrame, precision: int = 2) -> tuple:
+    """
+    Returns (coerced copy of frame, errors DataFrame). Only the known numeric
+    columns are touched; other columns pass through unchanged.
+    """
+    out = frame.copy()
+    errors = []
+
+    for column in PRICE_COLUMNS:
+        if column in out:
+            out[column] = coerce_price(out[column], errors, column, precision)
+
+    for column in COUNT_COLUMNS:
+        if column in out:
+            out[column] = coerce_count(out[column], errors, column)
+
+    for column, best_column in RATING_COLUMNS.items():
+        best = None
+        if best_column and best_column in out:
+            best = out[best_column] = coerce_number(out[best_column], errors, best_column)
+        if column in out:
+            out[column] = coerce_rating(out[column], errors, column, best)
+
+    for low, high in RANGE_PAIRS:
+        if low in out and high in out:
+            inverted = _flags(out[low] > out[high])
+            _flag(errors, inverted, high, frame[high], f"less than {low}")
+            out[high] = out[high].mask(inverted)
+
+    if not errors:
+        return out, pd.DataFrame(columns=ERROR_COLUMNS)
+    error_frame = pd.concat(errors, ignore_index=True).sort_values(["row", "column"], kind="stable")
+    return out, error_frame.reset_index(drop=True)
+
+
+# -------------------------
+# Feeds
+# -------------------------
+def iter_feed_frames(path: str, chunk_size: int = 100_000):
+    """
+    Yields DataFrames of up to chunk_size rows, indexed by row number (from 1).
+    CSV cells stay strings, as in iter_feed_rows() (Arrow-backed, so the
+    string work in coerce_frame() never goes through Python objects).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        reader = pd.read_csv(path, dtype="string[pyarrow]", keep_default_na=False, chunksize=chunk_size)
+    elif ext in (".ndjson", ".jsonl"):
+        reader = pd.read_json(path, lines=True, dtype=False, convert_dates=False, chunksize=chunk_size)
+    elif ext == ".json":
+        rows = load_json(path)
+        reader = [pd.DataFrame.from_records([rows] if isinstance(rows, dict) else rows)]
+    else:
+        raise ValueError(f"Unsupported feed format: {path}")
+
+    start = 1
+    for frame in reader:
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+
+def iter_records(frame: pd.DataFrame):
+    """
+    Row dicts with plain Python values; missing and empty cells are dropped.
+    """
+    names = list(frame.columns)
+    columns = [frame.iloc[:, i].to_numpy(dtype=object, na_value=None) for i in range(len(names))]
+    for values in zip(*columns):
+        yield {k: v for k, v in zip(names, values) if v is not None and v != ""}
+
+
+def coerce_feed(path: str, out_path: str, errors_path: str | None = None, chunk_size: int = 100_000,
+                precision: int = 2) -> dict:
+    started = time.perf_counter()
+    summary = {"rows": 0, "errors": 0, "errors_by_column": {}}
+    first_errors = []
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        for frame in iter_feed_frames(path, chunk_size):
+            coerced, errors = coerce_frame(frame, precision)
+            out.writelines(dumps_ndjson_line(row) for row in iter_records(coerced))
+
+            summary["rows"] += len(frame)
+            summary["errors"] += len(errors)
+            for column, n in errors["column"].value_counts().items():
+                summary["errors_by_column"][column] = summary["errors_by_column"].get(column, 0) + int(n)
+            if len(first_errors) < 20:
+                first_errors.extend(errors.head(20 - len(first_errors)).to_dict("records"))
+            if errors_path:
+                errors.to_csv(errors_path, mode="w" if summary["rows"] == len(frame) else "a",
+                              header=summary["rows"] == len(frame), index=False)
+
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    summary["first_errors"] = [{k: (int(v) if k == "row" else v) for k, v in e.items()} for e in first_errors]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalize prices, ratings and day counts in a feed.")
+    parser.add_argument("feed")
+    parser.add_argument("--out", required=True, help="Coerced feed (NDJSON)")
+    parser.add_argument("--errors", default=None, help="Write per-row errors to this CSV file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per DataFrame")
+    parser.add_argument("--precision", type=int, default=2, help="Decimal places for prices")
+    args = parser.parse_args(argv)
+
+    summary = coerce_feed(args.feed, args.out, args.errors, args.chunk_size, args.precision)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Duplicate block report over generated output.
+
+Usage (from the app/ directory):
+  python -m batch.duplicate_blocks out/ --types FAQPage BreadcrumbList --examples 5 --top 50
+  python -m batch.ndjson_filter < pages.ndjson > schemas.ndjson
+  python -m batch.duplicate_blocks schemas.ndjson --report duplicates.json
+
+Finds blocks (FAQPage, BreadcrumbList, ... anywhere in a page's output)
+that are identical across pages once @id is ignored, and reports clusters:
+
+  {"hash": "9f2c...", "type": "FAQPage", "count": 4120, "examples": ["services__a", ...], "sample": {...}}
+
+Memory stays bounded for 500k+ pages: pass 1 keeps only 64-bit hashes,
+spilled to disk as sorted runs and merged; pass 2 re-reads the output and
+collects example pages for the duplicated hashes only.
+"""
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import tempfile
+from array import array
+
+
+DEFAULT_TYPES = ("FAQPage", "BreadcrumbList")
+# hashes held in memory before a sorted run is spilled (8 bytes each)
+RUN_SIZE = 1_000_000
+
+
+def iter_output_pages(path: str):
+    """
+    Yields (page ref, schema) from a batch output directory (<page_key>.json)
+    or an NDJSON file of ndjson_filter results ({"id", "line", "schema"}).
+    """
+    if os.path.isdir(path):
+        for entry in sorted(os.scandir(path), key=lambda e: e.name):
+            if entry.name.endswith(".json") and not entry.name.startswith(".tmp-"):
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    yield entry.name[: -len(".json")], json.load(f)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("schema"):
+                yield row.get("id") or row.get("url") or f"line {line_no}", row["schema"]
+
+
+def block_type(node: dict, types):
+    """
+    The node's @type if it's in `types`, else None. A list @type (a node with
+    several types) matches on its first type in `types`.
+    """
+    node_type = node.get("@type")
+    if isinstance(node_type, list):
+        return next((t for t in node_type if isinstance(t, str) and t in types), None)
+    return node_type if isinstance(node_type, str) and node_type in types else None
+
+
+def iter_blocks(schema, types):
+    """
+    Every dict node whose @type (or one of its types) is in `types`, at any depth.
+    """
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if block_type(node, types):
+                yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+def normalize(node):
+    """
+    Drops @id / @context at every level, so per-page identifiers don't hide
+    otherwise identical content.
+    """
+    if isinstance(node, dict):
+        return {k: normalize(v) for k, v in node.items() if k not in ("@id", "@context")}
+    if isinstance(node, list):
+        return [normalize(v) for v in node]
+    return node
+
+
+def block_hash(node) -> int:
+    canonical = json.dumps(normalize(node), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return int.from_bytes(hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _spill(buffer: array, tmp_dir: str, runs: list):
+    buffer = array("Q", sorted(buffer))
+    path = os.path.join(tmp_dir, f"run-{len(runs):05d}.bin")
+    with open(path, "wb") as f:
+        buffer.tofile(f)
+    runs.append(path)
+
+
+def _iter_run(path: str, chunk: int = 65_536):
+    with open(path, "rb") as f:
+        while True:
+            buf = array("Q")
+            try:
+                buf.fromfile(f, chunk)
+            except EOFError:
+                pass  # short final read; buf holds what was there
+            if not buf:
+                return
+            yield from buf
+
+
+def count_duplicates(pages, types=DEFAULT_TYPES, min_count: int = 2, run_size: int = RUN_SIZE,
+                     tmp_dir: str | None = None) -> tuple:
+    """
+    Pass 1. Returns ({hash: count} for hashes seen >= min_count times, totals).
+    """
+    types = frozenset(types)
+    totals = {"pages": 0, "blocks": 0, "distinct_blocks": 0, "duplicate_blocks": 0}
+    duplicates = {}
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="dupblocks-") as spill_dir:
+        runs = []
+        buffer = array("Q")
+        for _, schema in pages:
+            totals["pages"] += 1
+            for block in iter_blocks(schema, types):
+                buffer.append(block_hash(block))
+                if len(buffer) >= run_size:
+                    _spill(buffer, spill_dir, runs)
+                    buffer = array("Q")
+        totals["blocks"] = sum(os.path.getsize(r) // 8 for r in runs) + len(buffer)
+
+        in_memory = iter(sorted(buffer))
+        for h, group in itertools.groupby(heapq.merge(in_memory, *(_iter_run(r) for r in runs))):
+            n = sum(1 for _ in group)
+            totals["distinct_blocks"] += 1
+            if n >= min_count:
+                duplicates[h] = n
+                totals["duplicate_blocks"] += n
+
+    totals["clusters"] = len(duplicates)
+    return duplicates, totals
+
+
+def collect_examples(pages, duplicates: dict, types=DEFAULT_TYPES, examples: int = 5) -> dict:
+    """
+    Pass 2. {hash: {"type", "examples": [page refs], "sample"}} for duplicated hashes.
+    """
+    types = frozenset(types)
+    found = {}
+    for page_ref, schema in pages:
+        for block in iter_blocks(schema, types):
+            h = block_hash(block)
+            if h not in duplicates:
+                continue
+            entry = found.get(h)
+            if entry is None:
+                entry = found[h] = {"type": block_type(block, types), "examples": [], "sample": normalize(block)}
+            if len(entry["examples"]) < examples and page_ref not in entry["examples"]:
+                entry["examples"].append(page_ref)
+    return found
+
+
+def duplicate_report(path: str, types=DEFAULT_TYPES, min_count: int = 2, examples: int = 5,
+                     top: int | None = None, run_size: int = RUN_SIZE) -> dict:
+    duplicates, totals = count_duplicates(iter_output_pages(path), types, min_count, run_size)
+
+    ranked = sorted(duplicates.items(), key=lambda item: -item[1])
+    if top:
+        ranked = ranked[:top]
+    wanted = dict(ranked)
+    details = collect_examples(iter_output_pages(path), wanted, types, examples) if wanted else {}
+
+    clusters = []
+    for h, count in ranked:
+        entry = details.get(h, {})
+        clusters.append({
+            "hash": f"{h:016x}",
+            "type": entry.get("type"),
+            "count": count,
+            "examples": entry.get("examples", []),
+            "sample": entry.get("sample"),
+        })
+    return {"totals": totals, "clusters": clusters}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report identical blocks repeated across generated pages.")
+    parser.add_argument("path", help="Batch output directory or NDJSON results file")
+    parser.add_argument("--types", nargs="+", default=list(DEFAULT_TYPES))
+    parser.add_argument("--min-count", type=int, default=2)
+    parser.add_argument("--examples", type=int, default=5, help="Example pages per cluster")
+    parser.add_argument("--top", type=int, default=100, help="Largest clusters to detail (0 = all)")
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE, help="Hashes held in memory per sorted run")
+    parser.add_argument("--report", default=None, help="Write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = duplicate_report(args.path, args.types, args.min_count, args.examples, args.top or None, args.run_size)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(json.dumps(report["totals"], indent=2))
+    for cluster in report["clusters"][:20]:
+        print(f"{cluster['count']:>8}  {cluster['type']:<16} {cluster['hash']}  e.g. {', '.join(map(str, cluster['examples'][:3]))}")
+
+
+if __name__ == "__main__":
+    main()
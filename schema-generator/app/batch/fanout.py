@@ -0,0 +1,92 @@
+"""
+Multi-location LocalBusiness fan-out to sharded NDJSON files.
+
+Usage (from the app/ directory):
+  python -m batch.fanout template.json locations.csv out/ --shard-size 500 --workers 4
+
+Writes:
+  out/organization.json          parent Organization (referenced by every location)
+  out/locations-00000.ndjson     one LocalBusiness per line
+  out/locations-00001.ndjson
+  ...
+
+The shared part of the entity is built once in the parent process and sent
+to each worker together with its shard of rows.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from templates.page_templates import local_business_fanout_base, local_business_location_schema, unique_locations
+from batch.ingest import iter_feed_rows, load_json
+from batch.output import atomic_write_text, dumps_ndjson_line
+from batch.runner import chunked
+from utils.interning import pool_scope
+
+
+def _write_shard(base: dict, rows: list, path: str) -> int:
+    lines = [dumps_ndjson_line(local_business_location_schema(base, row)) for row in rows]
+    atomic_write_text(path, "".join(lines))
+    return len(lines)
+
+
+def write_location_shards(template: dict, locations, out_dir: str, shard_size: int = 500, workers: int | None = None):
+    """
+    Build the shared parts once, then fan locations out to worker processes,
+    one shard file per task. At most 2 * workers shards are in flight, so the
+    location table is streamed rather than loaded. Location @ids are checked
+    for duplicates here, in the parent, before rows go out to the workers.
+
+    Returns:
+      {"organization": path, "shards": [paths], "locations": count}
+    """
+    base = local_business_fanout_base(template)
+    if not base:
+        raise ValueError("Template needs at least 'url' and 'name'")
+
+    os.makedirs(out_dir, exist_ok=True)
+    org_path = os.path.join(out_dir, "organization.json")
+    atomic_write_text(org_path, json.dumps(base["parent"], indent=2))
+
+    workers = workers or os.cpu_count() or 1
+    shard_paths = []
+    total = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for i, rows in enumerate(chunked(unique_locations(base, locations), shard_size)):
+            path = os.path.join(out_dir, f"locations-{i:05d}.ndjson")
+            shard_paths.append(path)
+            pending.append(pool.submit(_write_shard, base, rows, path))
+            if len(pending) >= workers * 2:
+                total += pending.pop(0).result()
+        for future in pending:
+            total += future.result()
+
+    return {"organization": org_path, "shards": shard_paths, "locations": total}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fan out one organization template to many LocalBusiness locations.")
+    parser.add_argument("template", help="JSON file in local_business_schema() input shape")
+    parser.add_argument("locations", help="Location table (.csv, .ndjson or .json)")
+    parser.add_argument("out_dir")
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with pool_scope():
+        result = write_location_shards(
+            load_json(args.template),
+            iter_feed_rows(args.locations),
+            args.out_dir,
+            shard_size=args.shard_size,
+            workers=args.workers,
+        )
+    print(f"{result['locations']} locations -> {len(result['shards'])} shards in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
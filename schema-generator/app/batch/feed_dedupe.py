@@ -0,0 +1,235 @@
+"""
+Duplicate URL / SKU detection for very large feeds.
+
+Usage (from the app/ directory):
+  python -m batch.feed_dedupe feed.csv --fields url sku --expected-rows 20000000
+  python -m batch.feed_dedupe feed.ndjson --report duplicates.json --db dedupe.db
+
+Duplicate URLs or SKUs give conflicting @ids and repeated ItemList entries
+in collection_schema(). Keeping every key of a 20M-row feed in a Python set
+costs gigabytes, so instead:
+
+  pass 1  one Bloom filter per field (a bytearray, ~1.2 bytes per row at a
+          1% false-positive rate). A key the filter has probably seen
+          before is a *candidate* and goes to an on-disk SQLite table.
+  pass 2  re-read the feed; rows whose key is a candidate are recorded
+          with their row number, and GROUP BY confirms exact duplicates
+          (false positives simply end up with a count of 1).
+
+Memory: the Bloom filters plus SQLite's page cache, whatever the feed size.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import time
+
+from batch.ingest import iter_feed_rows
+from batch.runner import chunked
+
+
+DEFAULT_FIELDS = ("url", "sku")
+
+
+class BloomFilter:
+    """
+    Bit array in a bytearray, k probes by double hashing:
+      position_i = (h1 + i * h2) mod m, with h1, h2 from one blake2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.m = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key: str) -> bool:
+        """
+        Adds key. Returns True if it was (probably) already present.
+        """
+        bits = self.bits
+        present = True
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def stats(self) -> dict:
+        return {"bits": self.m, "hashes": self.k, "bytes": len(self.bits), "keys": self.count}
+
+
+def normalize_key(value, lowercase: bool = False) -> str | None:
+    if value in (None, ""):
+        return None
+    key = str(value).strip()
+    return key.lower() if lowercase else key
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (field TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (field, key));
+CREATE TABLE IF NOT EXISTS occurrences (field TEXT NOT NULL, key TEXT NOT NULL, row INTEGER NOT NULL);
+"""
+
+
+def _open_db(path: str):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript("DROP TABLE IF EXISTS candidates; DROP TABLE IF EXISTS occurrences;" + _SCHEMA)
+    return conn
+
+
+def _keyed_rows(rows, fields, lowercase: bool):
+    """
+    (row number, field, key) for every non-empty key field, rows numbered from 1.
+    """
+    for row_no, row in enumerate(rows, 1):
+        for field in fields:
+            key = normalize_key(row.get(field), lowercase)
+            if key is not None:
+                yield row_no, field, key
+
+
+def find_candidates(rows, conn, fields=DEFAULT_FIELDS, expected_rows: int = 1_000_000,
+                    error_rate: float = 0.01, lowercase: bool = False, batch_size: int = 10_000) -> dict:
+    """
+    Pass 1. Returns {"rows", "filters": {field: BloomFilter.stats()}}.
+    """
+    filters = {field: BloomFilter(expected_rows, error_rate) for field in fields}
+    rows_seen = 0
+    pending = []
+    for rows_seen, row in enumerate(rows, 1):
+        for field in fields:
+            key = normalize_key(row.get(field), lowercase)
+            if key is None or not filters[field].add(key):
+                continue
+            pending.append((field, key))
+            if len(pending) >= batch_size:
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO candidates VALUES (?, ?)", pending)
+                pending.clear()
+    if pending:
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO candidates VALUES (?, ?)", pending)
+    return {"rows": rows_seen, "filters": {field: f.stats() for field, f in filters.items()}}
+
+
+def confirm_duplicates(rows, conn, fields=DEFAULT_FIELDS, lowercase: bool = False,
+                       batch_size: int = 10_000) -> int:
+    """
+    Pass 2. Records every occurrence of a candidate key. A small Bloom filter
+    over the candidates keeps SQLite lookups to (nearly) only the real hits.
+    Returns the number of occurrences recorded.
+    """
+    n_candidates = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+    if not n_candidates:
+        return 0
+    prefilter = BloomFilter(n_candidates, 0.001)
+    for field, key in conn.execute("SELECT field, key FROM candidates"):
+        prefilter.add(f"{field}\n{key}")
+
+    lookup = "SELECT 1 FROM candidates WHERE field = ? AND key = ?"
+    recorded = 0
+    for chunk in chunked(_keyed_rows(rows, fields, lowercase), batch_size):
+        hits = [
+            (field, key, row_no) for row_no, field, key in chunk
+            if f"{field}\n{key}" in prefilter and conn.execute(lookup, (field, key)).fetchone()
+        ]
+        if hits:
+            with conn:
+                conn.executemany("INSERT INTO occurrences VALUES (?, ?, ?)", hits)
+            recorded += len(hits)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_occurrences ON occurrences (field, key)")
+    return recorded
+
+
+def iter_duplicates(conn, max_rows: int = 10):
+    """
+    {"field", "key", "count", "rows": [first max_rows row numbers]} per duplicated key, largest first.
+    """
+    sql = """
+        SELECT field, key, COUNT(*) AS n, GROUP_CONCAT(row) FROM (
+            SELECT field, key, row FROM occurrences ORDER BY field, key, row
+        ) GROUP BY field, key HAVING n > 1 ORDER BY n DESC, field, key
+    """
+    for field, key, n, rows in conn.execute(sql):
+        yield {"field": field, "key": key, "count": n, "rows": [int(r) for r in rows.split(",")[:max_rows]]}
+
+
+def dedupe_feed(path: str, fields=DEFAULT_FIELDS, expected_rows: int | None = None, error_rate: float = 0.01,
+                lowercase: bool = False, db_path: str | None = None, max_rows: int = 10) -> dict:
+    started = time.perf_counter()
+    if expected_rows is None:
+        # rough guess from the file size; too small only raises the false-positive rate
+        expected_rows = max(1000, os.path.getsize(path) // 100)
+
+    with tempfile.TemporaryDirectory(prefix="feed-dedupe-") as tmp:
+        conn = _open_db(db_path or os.path.join(tmp, "dedupe.db"))
+        try:
+            pass1 = find_candidates(iter_feed_rows(path, intern=False), conn, fields, expected_rows,
+                                    error_rate, lowercase)
+            candidates = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            confirm_duplicates(iter_feed_rows(path, intern=False), conn, fields, lowercase)
+            duplicates = list(iter_duplicates(conn, max_rows))
+        finally:
+            conn.close()
+
+    by_field = {field: {"duplicate_keys": 0, "duplicate_rows": 0} for field in fields}
+    for dup in duplicates:
+        by_field[dup["field"]]["duplicate_keys"] += 1
+        by_field[dup["field"]]["duplicate_rows"] += dup["count"] - 1
+    return {
+        "rows": pass1["rows"],
+        "candidates": candidates,
+        "fields": by_field,
+        "bloom": pass1["filters"],
+        "seconds": round(time.perf_counter() - started, 2),
+        "duplicates": duplicates,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flag duplicate URLs / SKUs in a large feed.")
+    parser.add_argument("feed")
+    parser.add_argument("--fields", nargs="+", default=list(DEFAULT_FIELDS))
+    parser.add_argument("--expected-rows", type=int, default=None, help="Sizes the Bloom filters")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Bloom false-positive rate")
+    parser.add_argument("--lowercase", action="store_true", help="Compare keys case-insensitively")
+    parser.add_argument("--db", default=None, help="Keep the SQLite working database here")
+    parser.add_argument("--max-rows", type=int, default=10, help="Row numbers listed per duplicate")
+    parser.add_argument("--report", default=None, help="Write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = dedupe_feed(args.feed, args.fields, args.expected_rows, args.error_rate,
+                         args.lowercase, args.db, args.max_rows)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(json.dumps({k: v for k, v in report.items() if k != "duplicates"}, indent=2))
+    for dup in report["duplicates"][:20]:
+        print(f"{dup['count']:>6}x  {dup['field']:<5} {dup['key']}  rows {dup['rows']}")
+
+
+if __name__ == "__main__":
+    main()
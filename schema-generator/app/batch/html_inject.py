@@ -0,0 +1,217 @@
+"""
+Inject generated JSON-LD into a static site's HTML files, in place.
+
+Usage (from the app/ directory):
+  python -m batch.html_inject site/ out/ --workers 8
+
+For every *.html file under the site directory, the schemas written by the
+batch runner for the same page (<out_dir>/<page_key>.json, one per page type
+built for its URL) are rendered with render_schema_blocks() and placed in
+the page's <head>:
+
+  - existing <script type="application/ld+json"> blocks in the head are
+    removed, and the new blocks go where the first one was;
+  - otherwise they are inserted just before </head>.
+
+HTML path -> url key:
+  site/index.html                    -> "index"
+  site/services/plumbing/index.html  -> "services__plumbing"
+  site/shoes.html                    -> "shoes"
+
+Only the head is read and rewritten (no DOM parsing); the body is streamed
+unchanged into a temp file that atomically replaces the original. Files
+whose head wouldn't change are not touched.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from templates.page_templates import PAGE_BUILDERS, render_schema_blocks
+from batch.runner import bounded_map, chunked, page_type_slug, url_key
+
+
+_READ_SIZE = 64 * 1024
+# Give up on files whose </head> isn't within this many bytes
+MAX_HEAD_BYTES = 4 * 1024 * 1024
+
+_HEAD_END = re.compile(rb"</head\s*>", re.IGNORECASE)
+# A whole JSON-LD block, plus its line's leading indentation and any blank lines after it
+_LD_JSON_BLOCK = re.compile(
+    rb"[ \t]*<script\b[^>]*\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>.*?</script\s*>(?:[ \t]*\r?\n)*",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def html_page_key(rel_path: str) -> str:
+    """
+    Path relative to the site root -> url_key() of the page it serves.
+    """
+    path = rel_path.replace(os.sep, "/")
+    if path == "index.html" or path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    elif path.endswith((".html", ".htm")):
+        path = path.rsplit(".", 1)[0]
+    return url_key("/" + path)
+
+
+def schema_paths(schema_dir: str, key: str) -> list:
+    """
+    Batch outputs for one url key, one per page type, in PAGE_BUILDERS order.
+    """
+    paths = (os.path.join(schema_dir, f"{key}@{page_type_slug(t)}.json") for t in PAGE_BUILDERS)
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _load_blocks(paths: list):
+    blocks = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            schema = json.load(f)
+        blocks.extend(schema if isinstance(schema, list) else [schema])
+    return blocks
+
+
+def iter_html_files(site_dir: str):
+    for root, dirs, files in os.walk(site_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith((".html", ".htm")):
+                yield os.path.join(root, name)
+
+
+def _read_head(f):
+    """
+    Reads until just past </head>. Returns (head_bytes, end_of_head_offset),
+    or (buffer, None) when no </head> was found.
+    """
+    buf = b""
+    while len(buf) < MAX_HEAD_BYTES:
+        chunk = f.read(_READ_SIZE)
+        if not chunk:
+            break
+        # re-scan a few bytes of the previous chunk in case the tag was split
+        start = max(0, len(buf) - 8)
+        buf += chunk
+        match = _HEAD_END.search(buf, start)
+        if match:
+            return buf, match.start()
+    return buf, None
+
+
+def rewrite_head(head: bytes, head_end: int, blocks: bytes) -> bytes:
+    """
+    head[:head_end] is everything before </head>. Replaces its JSON-LD blocks
+    with `blocks` (or inserts them before </head>). Returns the new head.
+    """
+    before = head[:head_end]
+    matches = list(_LD_JSON_BLOCK.finditer(before))
+    if matches:
+        insert_at = matches[0].start()
+        kept = _LD_JSON_BLOCK.sub(b"", before)
+        return kept[:insert_at] + blocks + b"\n" + kept[insert_at:] + head[head_end:]
+
+    # keep </head> on its own line
+    line_start = before.rfind(b"\n") + 1
+    if before[line_start:].strip():
+        return before + b"\n" + blocks + b"\n" + head[head_end:]
+    return before[:line_start] + blocks + b"\n" + before[line_start:] + head[head_end:]
+
+
+def inject_file(path: str, blocks: str) -> str:
+    """
+    Returns "updated", "unchanged" or raises ValueError when there's no </head>.
+    """
+    with open(path, "rb") as src:
+        head, head_end = _read_head(src)
+        if head_end is None:
+            raise ValueError("no </head> found")
+
+        new_head = rewrite_head(head, head_end, blocks.encode("utf-8"))
+        if new_head == head:
+            return "unchanged"
+
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+        try:
+            with os.fdopen(fd, "wb") as dst:
+                dst.write(new_head)
+                shutil.copyfileobj(src, dst, _READ_SIZE)
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    return "updated"
+
+
+def inject_page(path: str, site_dir: str, schema_dir: str) -> dict:
+    key = html_page_key(os.path.relpath(path, site_dir))
+    try:
+        paths = schema_paths(schema_dir, key)
+        if not paths:
+            status = "no_schema"
+        else:
+            status = inject_file(path, render_schema_blocks(_load_blocks(paths)))
+        error = None
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+    return {"path": path, "key": key, "status": status, "error": error}
+
+
+def inject_chunk(paths: list, site_dir: str, schema_dir: str) -> list:
+    return [inject_page(path, site_dir, schema_dir) for path in paths]
+
+
+def inject_site(site_dir: str, schema_dir: str, workers: int | None = None, chunk_size: int = 256) -> dict:
+    """
+    Runs every HTML file under site_dir through inject_page() in a process pool.
+    Returns {"files", "updated", "unchanged", "no_schema", "errors", "wall_seconds", "files_per_sec"}.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    counts = {"updated": 0, "unchanged": 0, "no_schema": 0}
+    errors = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = chunked(iter_html_files(site_dir), chunk_size)
+        for results in bounded_map(pool, inject_chunk, chunks, workers * 4, site_dir, schema_dir):
+            for result in results:
+                if result["error"]:
+                    errors.append({"path": result["path"], "error": result["error"]})
+                else:
+                    counts[result["status"]] += 1
+
+    wall = time.perf_counter() - started
+    files = sum(counts.values()) + len(errors)
+    return {
+        "files": files,
+        **counts,
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "files_per_sec": round(files / wall, 1) if wall else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write generated JSON-LD into static HTML files in place.")
+    parser.add_argument("site_dir", help="Directory of built HTML files")
+    parser.add_argument("schema_dir", help="Batch output directory (<page_key>.json per page)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args(argv)
+
+    report = inject_site(args.site_dir, args.schema_dir, workers=args.workers, chunk_size=args.chunk_size)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Local feed readers for batch generation.
+
+Every reader is a generator, so feeds of any size are streamed row by row.
+Supported formats (by extension): .csv, .ndjson / .jsonl, .json (list of rows).
+"""
+
+import csv
+import json
+import os
+
+from utils.interning import intern_row
+
+
+def iter_feed_rows(path: str, intern: bool = True):
+    """
+    Yields one dict per row.
+    CSV cells stay strings; empty cells are dropped so builders see missing keys.
+    With intern=True, keys and repeated values (currency, availability, brand,
+    ...) are shared through the active InternPool, if any (see pool_scope()).
+    """
+    rows = _iter_raw_rows(path)
+    if not intern:
+        yield from rows
+        return
+    for row in rows:
+        yield intern_row(row)
+
+
+def _iter_raw_rows(path: str):
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if k and v not in (None, "")}
+
+    elif ext in (".ndjson", ".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    elif ext == ".json":
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = [rows]
+        yield from rows
+
+    else:
+        raise ValueError(f"Unsupported feed format: {path}")
+
+
+def load_json(path: str):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_MAX_INCLUDE_DEPTH = 8
+
+
+def _check_inside(path: str, root: str | None):
+    """
+    Raises ValueError when root is set and path (symlinks resolved) is outside it.
+    """
+    if root is None:
+        return
+    real = os.path.realpath(path)
+    if os.path.commonpath([real, root]) != root:
+        raise ValueError(f"{path} is outside the data directory")
+
+
+def _resolve_includes(value, base_dir: str, deps: list, depth: int, root: str | None = None):
+    if isinstance(value, dict):
+        if len(value) == 1 and "$include" in value:
+            if depth >= _MAX_INCLUDE_DEPTH:
+                raise ValueError(f"$include nested too deeply: {value['$include']}")
+            path = os.path.abspath(os.path.join(base_dir, value["$include"]))
+            _check_inside(path, root)
+            deps.append(path)
+            return _resolve_includes(load_json(path), base_dir, deps, depth + 1, root)
+        return {k: _resolve_includes(v, base_dir, deps, depth, root) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve_includes(v, base_dir, deps, depth, root) for v in value]
+    return value
+
+
+def load_page_data(path: str, root: str | None = None):
+    """
+    Load a page data file, expanding shared fragments:
+      {"faq_enabled": true, "faqs": {"$include": "shared/hvac-faqs.json"}}
+    Include paths are relative to the page file's directory.
+
+    root: when set, path is relative to it, and neither the page file nor
+    any include may resolve outside it (ValueError). For untrusted input.
+
+    Returns (data, deps): deps are the absolute paths of the page file and
+    every file it included.
+    """
+    if root is not None:
+        root = os.path.realpath(root)
+        path = os.path.join(root, path)
+        _check_inside(path, root)
+    deps = [os.path.abspath(path)]
+    data = _resolve_includes(load_json(path), os.path.dirname(os.path.abspath(path)), deps, 0, root)
+    return data, deps
@@ -0,0 +1,232 @@
+"""
+Long-lived NDJSON filter: page payloads on stdin, JSON-LD on stdout.
+
+Usage (from the app/ directory):
+  producer | python -m batch.ndjson_filter --workers 4 | consumer
+
+Input, one JSON object per line (same fields as a runner job):
+  {"id": "p-1", "page_type": "Product Page", "url": "https://x.com/p/1", "data": {...}}
+
+Output, one line per input line, in input order:
+  {"id": "p-1", "line": 1, "page_type": "Product Page", "schema": {...}, "error": null}
+  {"id": null, "line": 2, "page_type": null, "schema": null, "error": "JSONDecodeError: ..."}
+
+Rows normally carry their "data" inline. A "data_path" row reads a file, so
+it is refused unless --data-dir is given; the path is then relative to that
+directory and may not leave it (nor may its $include fragments).
+
+A bad line produces an error line and the stream continues. Output is
+buffered and flushed every --flush-every lines, and whenever the filter
+would otherwise wait (for input, or for a worker). So request/response
+style pipes get each answer without waiting for more input.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from batch.output import dumps_ndjson_line
+from batch.runner import _ignore_sigint, build_job, chunked
+
+
+def filter_line(line_no: int, raw: bytes, data_root: str | None = None) -> tuple:
+    """
+    One input line -> (output line with trailing newline, failed). Never raises.
+    data_path rows are an error unless data_root is set.
+    """
+    job_id = page_type = schema = None
+    try:
+        job = json.loads(raw)
+        if not isinstance(job, dict):
+            raise ValueError("expected a JSON object")
+        job_id = job.get("id")
+        page_type = job.get("page_type")
+        if job.get("data") is None and "data_path" in job and data_root is None:
+            raise ValueError("data_path rows need --data-dir")
+        schema = build_job(job, data_root)
+        error = None
+    except Exception as e:
+        schema, error = None, f"{type(e).__name__}: {e}"
+    out = dumps_ndjson_line({"id": job_id, "line": line_no, "page_type": page_type, "schema": schema, "error": error})
+    return out, error is not None
+
+
+def filter_chunk(lines: list, data_root: str | None = None) -> tuple:
+    """
+    Returns (output text, line count, error count).
+    """
+    results = [filter_line(line_no, raw, data_root) for line_no, raw in lines]
+    return "".join(out for out, _ in results), len(results), sum(failed for _, failed in results)
+
+
+def _numbered_lines(stream):
+    for line_no, raw in enumerate(stream, 1):
+        if raw.strip():
+            yield line_no, raw
+
+
+_READ_SIZE = 1 << 16
+
+
+def _read_chunks(stream, chunk_size: int):
+    """
+    Numbered non-blank lines in chunks of up to chunk_size. read1() returns
+    whatever input is already there, so a chunk is cut short as soon as the
+    producer goes quiet instead of waiting for chunk_size lines.
+    """
+    read1 = getattr(stream, "read1", None)
+    if read1 is None:
+        yield from chunked(_numbered_lines(stream), 1)
+        return
+    line_no = 0
+    partial = bytearray()
+    numbered = []
+    while True:
+        data = read1(_READ_SIZE)
+        if not data:
+            break
+        end = data.rfind(b"\n")
+        if end < 0:
+            partial += data
+            continue
+        complete = bytes(partial) + data[: end + 1] if partial else data[: end + 1]
+        partial = bytearray(data[end + 1:])
+        for raw in complete.split(b"\n")[:-1]:
+            line_no += 1
+            if raw.strip():
+                numbered.append((line_no, raw))
+        # a full read means more input is already waiting: keep the tail for the next chunk
+        full = len(numbered) - len(numbered) % chunk_size if len(data) == _READ_SIZE else len(numbered)
+        for i in range(0, full, chunk_size):
+            yield numbered[i: min(i + chunk_size, full)]
+        numbered = numbered[full:]
+    if partial.strip():
+        line_no += 1
+        numbered.append((line_no, bytes(partial)))
+    if numbered:
+        yield numbered
+
+
+_EOF = object()
+
+
+def _put(q, item, stop: threading.Event) -> bool:
+    """
+    Blocking put that gives up once `stop` is set. Returns False when it did.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _submit_chunks(stream_in, results_q, pool, chunk_size: int, stop: threading.Event, data_root: str | None):
+    """
+    Feeds results_q, in input order, with pool futures (or results, in-process).
+    results_q's maxsize is the in-flight window.
+    """
+    try:
+        for chunk in _read_chunks(stream_in, chunk_size):
+            item = pool.submit(filter_chunk, chunk, data_root) if pool is not None else filter_chunk(chunk, data_root)
+            if not _put(results_q, item, stop):
+                return
+        _put(results_q, _EOF, stop)
+    except Exception as e:
+        _put(results_q, e, stop)
+
+
+def run_filter(stream_in, stream_out, workers: int = 0, chunk_size: int = 32, flush_every: int = 100,
+               data_dir: str | None = None) -> dict:
+    """
+    stream_in / stream_out are binary streams. workers=0 builds in-process;
+    otherwise chunks of lines go to a process pool (at most workers * 4 chunks
+    in flight). Results are written in input order. Returns {"lines", "errors"}.
+    data_dir allows data_path rows, confined to that directory.
+
+    Reading and submitting run on a background thread and this thread only
+    writes, so finished lines go out even while the producer is idle: output
+    is flushed every flush_every lines and whenever the next result isn't
+    ready yet.
+    """
+    pool = None
+    if workers:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_sigint)
+        # Start the workers before the reading thread holds stdin's lock: a
+        # child forked meanwhile would deadlock closing its copy of stdin.
+        pool.submit(int).result()
+    stop = threading.Event()
+    results_q = queue.Queue(maxsize=max(1, workers) * 4)
+    threading.Thread(target=_submit_chunks, args=(stream_in, results_q, pool, chunk_size, stop, data_dir),
+                     daemon=True).start()
+
+    lines = errors = pending = 0
+    buffer = []
+
+    def flush():
+        nonlocal pending
+        if buffer:
+            stream_out.write("".join(buffer).encode("utf-8"))
+            stream_out.flush()
+            buffer.clear()
+            pending = 0
+
+    try:
+        while True:
+            try:
+                item = results_q.get_nowait()
+            except queue.Empty:
+                flush()
+                item = results_q.get()
+            if item is _EOF:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if isinstance(item, Future):
+                if not item.done():
+                    flush()
+                item = item.result()
+            text, n, failed = item
+            lines += n
+            pending += n
+            errors += failed
+            buffer.append(text)
+            if pending >= flush_every:
+                flush()
+        flush()
+    finally:
+        stop.set()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return {"lines": lines, "errors": errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read NDJSON page payloads on stdin, write JSON-LD NDJSON on stdout.")
+    parser.add_argument("--workers", type=int, default=0, help="0 = in-process (default)")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Lines per task (at most)")
+    parser.add_argument("--flush-every", type=int, default=100, help="Output lines per flush")
+    parser.add_argument("--data-dir", default=None, help="Allow data_path rows, read from this directory only")
+    parser.add_argument("--quiet", action="store_true", help="Don't print the summary on stderr")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = run_filter(sys.stdin.buffer, sys.stdout.buffer, workers=args.workers,
+                             chunk_size=args.chunk_size, flush_every=max(1, args.flush_every),
+                             data_dir=args.data_dir)
+    except BrokenPipeError:
+        # downstream closed early; don't let the interpreter complain at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    if not args.quiet:
+        print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Output helpers shared by the batch commands.
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_text(path: str, text: str):
+    """
+    Write to a temp file in the same directory, then os.replace() it over the
+    target, so readers never see a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def dumps_ndjson_line(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False) + "\n"
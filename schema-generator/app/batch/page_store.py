@@ -0,0 +1,200 @@
+"""
+SQLite-backed page repository.
+
+Usage (from the app/ directory):
+  python -m batch.page_store import pages.db feed.csv --page-type "Product Page"
+  python -m batch.page_store generate pages.db out/ --page-type "Product Page" --since 2026-01-01T00:00:00
+  python -m batch.page_store generate pages.db out/ --checkpoint out/.checkpoint
+
+One row per (url, page_type) holding the builder input as JSON. updated_at
+only moves when the stored data actually changes, so "changed since T"
+queries select exactly the pages that need regenerating.
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+from batch.ingest import iter_feed_rows
+from batch.checkpoint import Checkpoint
+from batch.runner import chunked, run_jobs
+from utils.interning import pool_scope
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url         TEXT NOT NULL,
+    page_type   TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (url, page_type)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_updated_at ON pages (updated_at);
+CREATE INDEX IF NOT EXISTS idx_pages_type_updated_at ON pages (page_type, updated_at);
+"""
+
+_UPSERT = """
+INSERT INTO pages (url, page_type, data, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (url, page_type) DO UPDATE SET
+    data = excluded.data,
+    updated_at = excluded.updated_at
+WHERE pages.data != excluded.data
+"""
+
+
+def parse_since(value) -> float | None:
+    """
+    None / epoch seconds / ISO-8601 string -> epoch seconds
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class PageStore:
+    """
+    WAL-mode SQLite store for page definitions.
+
+      with PageStore("pages.db") as store:
+          store.upsert_many(rows)
+          for job in store.iter_jobs(page_type="Product Page", since=t):
+              ...
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_many(self, rows, chunk_size: int | None = None) -> int:
+        """
+        rows: iterable of {"url", "page_type", "data", "updated_at"?}
+        One transaction per chunk. Returns the number of rows inserted or changed.
+        """
+        now = time.time()
+        changed = 0
+        for chunk in chunked(rows, chunk_size or self.chunk_size):
+            params = [
+                (
+                    r["url"],
+                    r["page_type"],
+                    json.dumps(r["data"], sort_keys=True, separators=(",", ":")),
+                    r.get("updated_at") or now,
+                )
+                for r in chunk
+            ]
+            with self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(_UPSERT, params)
+                changed += self.conn.total_changes - before
+        return changed
+
+    def iter_jobs(self, page_type: str | None = None, since=None, chunk_size: int | None = None):
+        """
+        Streams runner jobs {"url", "page_type", "data", "updated_at"} ordered by
+        updated_at, fetching chunk_size rows at a time.
+        """
+        sql = "SELECT url, page_type, data, updated_at FROM pages"
+        where, params = [], []
+        if page_type:
+            where.append("page_type = ?")
+            params.append(page_type)
+        since = parse_since(since)
+        if since is not None:
+            where.append("updated_at > ?")
+            params.append(since)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at"
+
+        cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size or self.chunk_size)
+                if not rows:
+                    return
+                for url, row_type, data, updated_at in rows:
+                    yield {"url": url, "page_type": row_type, "data": json.loads(data), "updated_at": updated_at}
+        finally:
+            cursor.close()
+
+    def count(self, page_type: str | None = None) -> int:
+        if page_type:
+            return self.conn.execute("SELECT COUNT(*) FROM pages WHERE page_type = ?", (page_type,)).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+def feed_to_page_rows(rows, page_type: str | None = None):
+    """
+    Feed rows -> store rows. Each row needs "url" and either its own
+    "page_type" column or the page_type argument.
+    """
+    for row in rows:
+        row_type = row.get("page_type") or page_type
+        if not row.get("url") or not row_type:
+            continue
+        data = {k: v for k, v in row.items() if k != "page_type"}
+        yield {"url": row["url"], "page_type": row_type, "data": data}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite page repository.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Bulk upsert a feed into the store")
+    p_import.add_argument("db")
+    p_import.add_argument("feed")
+    p_import.add_argument("--page-type", default=None)
+    p_import.add_argument("--chunk-size", type=int, default=1000)
+
+    p_gen = sub.add_parser("generate", help="Run stored pages through the builders")
+    p_gen.add_argument("db")
+    p_gen.add_argument("out_dir")
+    p_gen.add_argument("--page-type", default=None)
+    p_gen.add_argument("--since", default=None, help="ISO-8601 time or epoch seconds")
+    p_gen.add_argument("--workers", type=int, default=None)
+    p_gen.add_argument("--checkpoint", default=None, help="Journal file; an interrupted run resumes from it")
+    p_gen.add_argument("--checkpoint-every", type=int, default=1000, help="Pages per journal flush")
+    p_gen.add_argument("--restart", action="store_true", help="Ignore (and reset) an existing journal")
+
+    args = parser.parse_args(argv)
+
+    with PageStore(args.db) as store:
+        if args.command == "import":
+            started = time.perf_counter()
+            with pool_scope():
+                changed = store.upsert_many(
+                    feed_to_page_rows(iter_feed_rows(args.feed), args.page_type),
+                    chunk_size=args.chunk_size,
+                )
+            print(f"{changed} pages inserted/changed in {time.perf_counter() - started:.2f}s")
+        else:
+            checkpoint = None
+            if args.checkpoint:
+                checkpoint = Checkpoint(args.checkpoint, flush_every=args.checkpoint_every, resume=not args.restart)
+            report = run_jobs(store.iter_jobs(args.page_type, args.since), args.out_dir,
+                              workers=args.workers, checkpoint=checkpoint)
+            print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""
+Staged batch pipeline with bounded queues.
+
+Usage (from the app/ directory):
+  python -m batch.pipeline jobs.ndjson out/ --workers 4 --queue-depth 256 --max-buffer-mb 64
+  python -m batch.pipeline feed.csv pages.ndjson --page-type "Product Page"
+
+  ingest -> parse -> build -> serialize -> write
+
+Every stage is a thread; build can fan out to a process pool (--workers).
+Stages are connected by bounded queues. A full queue blocks its producer,
+so when writing is slower than building, building slows down instead of
+piling results up in memory. Every buffer is bounded by --queue-depth
+items and by an equal share of --max-buffer-mb bytes:
+
+  raw         input lines (rows: their keys + values)
+  jobs        the input bytes each job was parsed from
+  in flight   input bytes of the chunks out at the process pool
+  built       each tree's compact JSON size, measured where it is built
+  serialized  the output text
+
+so the buffered payload stays near the ceiling however large pages get.
+Trees take more memory than their JSON text, so built / in-flight bytes
+are a proxy, not an exact count.
+
+Input: runner jobs as NDJSON ({"url", "page_type", "data"}, as for
+ndjson_filter), or flat feed rows (.csv / .ndjson / .json) with
+--page-type. Output: a directory (<page_key>.json per page, as run_jobs)
+or an .ndjson file (one {"line", "url", "page_type", "schema", "error"}
+per input row, in input order).
+
+The report shows per stage: items, busy seconds, and time spent waiting
+for input (starved: upstream is slower) or for room downstream (blocked:
+downstream is slower). The busiest stage is the bottleneck.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from batch.ingest import iter_feed_rows
+from batch.output import atomic_write_text, dumps_ndjson_line
+from batch.runner import ThroughputStats, _ignore_sigint, build_job, chunked, job_key
+
+
+_DONE = object()
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage failed or the run was interrupted."""
+
+
+# -------------------------
+# Queues
+# -------------------------
+class BoundedQueue:
+    """
+    FIFO with an item limit and an optional byte limit; put() blocks while
+    either is reached. An item larger than max_bytes still goes through
+    when the queue is empty, so nothing deadlocks. One producer and one
+    consumer per queue, so put_wait / get_wait belong to one stage each.
+    """
+
+    def __init__(self, name: str, max_items: int, max_bytes: int | None = None):
+        self.name = name
+        self.max_items = max(1, max_items)
+        self.max_bytes = max_bytes
+        self._items = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+        self._aborted = False
+
+        self.puts = 0
+        self.peak_items = 0
+        self.peak_bytes = 0
+        self._depth_sum = 0
+        self.put_wait = 0.0
+        self.get_wait = 0.0
+
+    def _full(self, size: int) -> bool:
+        if len(self._items) >= self.max_items:
+            return True
+        return self.max_bytes is not None and bool(self._items) and self._bytes + size > self.max_bytes
+
+    def put(self, item, size: int = 0):
+        with self._cond:
+            if self._full(size) and not self._aborted:
+                started = time.perf_counter()
+                while self._full(size) and not self._aborted:
+                    self._cond.wait()
+                self.put_wait += time.perf_counter() - started
+            if self._aborted:
+                raise PipelineAborted(self.name)
+            self._items.append((item, size))
+            self._bytes += size
+            self.puts += 1
+            self._depth_sum += len(self._items)
+            self.peak_items = max(self.peak_items, len(self._items))
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            if not self._items and not self._aborted:
+                started = time.perf_counter()
+                while not self._items and not self._aborted:
+                    self._cond.wait()
+                self.get_wait += time.perf_counter() - started
+            if self._aborted:
+                raise PipelineAborted(self.name)
+            item, size = self._items.popleft()
+            self._bytes -= size
+            self._cond.notify_all()
+            return item
+
+    def abort(self):
+        with self._cond:
+            self._aborted = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {
+            "max_items": self.max_items,
+            "max_bytes": self.max_bytes,
+            "peak_items": self.peak_items,
+            "mean_depth": round(self._depth_sum / self.puts, 1) if self.puts else 0,
+            "peak_bytes": self.peak_bytes,
+            "producer_blocked_seconds": round(self.put_wait, 3),
+        }
+
+
+# -------------------------
+# Stages
+# -------------------------
+class Stage(threading.Thread):
+    """
+    Runs transform(inputs) -> outputs, where inputs are read from inbox (up
+    to _DONE) and outputs go to outbox with sizeof(output) bytes.
+    busy = wall - waiting for input - waiting for room downstream.
+    """
+
+    def __init__(self, name: str, transform, inbox: BoundedQueue | None, outbox: BoundedQueue | None,
+                 sizeof=None, on_error=None):
+        super().__init__(name=f"pipeline-{name}", daemon=True)
+        self.stage_name = name
+        self.transform = transform
+        self.inbox = inbox
+        self.outbox = outbox
+        self.sizeof = sizeof
+        self.on_error = on_error
+        self.items = 0
+        self.wall = 0.0
+        self.error = None
+
+    def run(self):
+        started = time.perf_counter()
+        inputs = iter(self.inbox.get, _DONE) if self.inbox is not None else None
+        outputs = self.transform(inputs)
+        try:
+            for out in outputs:
+                self.items += 1
+                if self.outbox is not None:
+                    self.outbox.put(out, self.sizeof(out) if self.sizeof else 0)
+            if self.outbox is not None:
+                self.outbox.put(_DONE)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self.error = e
+            if self.on_error:
+                self.on_error()
+        finally:
+            if hasattr(outputs, "close"):
+                outputs.close()  # lets a stage shut its pool / files down
+            self.wall = time.perf_counter() - started
+
+    def stats(self) -> dict:
+        starved = self.inbox.get_wait if self.inbox is not None else 0.0
+        blocked = self.outbox.put_wait if self.outbox is not None else 0.0
+        busy = max(0.0, self.wall - starved - blocked)
+        return {
+            "items": self.items,
+            "busy_seconds": round(busy, 3),
+            "starved_seconds": round(starved, 3),
+            "blocked_seconds": round(blocked, 3),
+            "items_per_busy_sec": round(self.items / busy, 1) if busy else None,
+            "utilization": round(busy / self.wall, 3) if self.wall else None,
+        }
+
+
+def ingest(path: str):
+    """
+    (line number, raw) per input row: the raw bytes line for NDJSON, a row
+    dict for other feed formats (parsed by iter_feed_rows).
+    """
+    def transform(_):
+        if os.path.splitext(path)[1].lower() in (".ndjson", ".jsonl"):
+            with open(path, "rb") as f:
+                for line_no, raw in enumerate(f, 1):
+                    if raw.strip():
+                        yield line_no, raw
+        else:
+            yield from enumerate(iter_feed_rows(path, intern=False), 1)
+    return transform
+
+
+def _raw_size(item) -> int:
+    raw = item[1]
+    if isinstance(raw, bytes):
+        return len(raw)
+    return sum(len(str(k)) + len(str(v)) for k, v in raw.items())
+
+
+def parse(page_type: str | None = None):
+    """
+    Raw rows -> runner jobs. A runner job ({"page_type", "data"|"data_path"})
+    passes through; a flat feed row becomes {"url", "page_type", "data": row}.
+    Bad rows become {"line", "error"} and flow on to the output. Every job
+    carries "bytes", the size of its raw row.
+    """
+    def transform(items):
+        for item in items:
+            line_no, raw = item
+            size = _raw_size(item)
+            try:
+                row = json.loads(raw) if isinstance(raw, bytes) else raw
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+                if "data" in row or "data_path" in row:
+                    job = dict(row)
+                else:
+                    data = {k: v for k, v in row.items() if k != "page_type"}
+                    job = {"url": row.get("url"), "page_type": row.get("page_type") or page_type, "data": data}
+                job["line"] = line_no
+                job["bytes"] = size
+                yield job
+            except Exception as e:
+                yield {"line": line_no, "error": f"{type(e).__name__}: {e}", "bytes": size}
+    return transform
+
+
+def build_page(job: dict) -> dict:
+    """
+    Job -> {"line", "url", "page_type", "key", "schema", "error", "seconds", "bytes"}.
+    Never raises. "bytes" is the schema's compact JSON size (for the built queue).
+    """
+    started = time.perf_counter()
+    schema, error = None, job.get("error")
+    if error is None:
+        try:
+            schema = build_job(job)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return {
+        "line": job.get("line"),
+        "url": job.get("url"),
+        "page_type": job.get("page_type"),
+        "key": job_key(job),
+        "schema": schema,
+        "error": error,
+        "seconds": time.perf_counter() - started,
+        "bytes": len(json.dumps(schema, separators=(",", ":"))) if schema is not None else 0,
+    }
+
+
+def build_chunk(jobs: list) -> list:
+    return [build_page(job) for job in jobs]
+
+
+def _bounded_chunks(pool, chunks, max_chunks: int, max_bytes: int | None):
+    """
+    bounded_map() over build_chunk, with the window also bounded by the input
+    bytes of the chunks in flight (one chunk always goes through).
+    """
+    pending = deque()
+    in_flight = 0
+    for chunk in chunks:
+        size = sum(job.get("bytes", 0) for job in chunk)
+        pending.append((pool.submit(build_chunk, chunk), size))
+        in_flight += size
+        while pending and (len(pending) >= max_chunks or (max_bytes is not None and in_flight > max_bytes)):
+            future, size = pending.popleft()
+            in_flight -= size
+            yield future.result()
+    while pending:
+        yield pending.popleft()[0].result()
+
+
+def build(workers: int = 0, chunk_size: int = 32, max_bytes: int | None = None):
+    """
+    Runs the page builders in-thread (workers=0) or in a process pool, in
+    input order. At most workers * 2 chunks, and max_bytes of job input, are
+    in flight.
+    """
+    def transform(jobs):
+        if not workers:
+            yield from map(build_page, jobs)
+            return
+        with ProcessPoolExecutor(max_workers=workers, initializer=_ignore_sigint) as pool:
+            try:
+                for results in _bounded_chunks(pool, chunked(jobs, chunk_size), workers * 2, max_bytes):
+                    yield from results
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+    return transform
+
+
+def serialize(ndjson: bool):
+    """
+    Adds "text" (the bytes the writer will write) and drops the built tree.
+    """
+    def transform(results):
+        for result in results:
+            schema = result.pop("schema")
+            if ndjson:
+                result["text"] = dumps_ndjson_line({
+                    "line": result["line"], "url": result["url"], "page_type": result["page_type"],
+                    "schema": schema, "error": result["error"],
+                })
+            else:
+                result["text"] = json.dumps(schema, indent=2) if result["error"] is None else None
+            yield result
+    return transform
+
+
+def _text_size(result) -> int:
+    return len(result["text"] or "")
+
+
+def write(out: str, ndjson: bool, stats: ThroughputStats):
+    """
+    One <key>.json per page (atomic replace), or lines appended to one NDJSON file.
+    """
+    def transform(results):
+        if ndjson:
+            directory = os.path.dirname(out)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(out, "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(result.pop("text"))
+                    stats.record(result)
+                    yield result
+        else:
+            os.makedirs(out, exist_ok=True)
+            for result in results:
+                text = result.pop("text")
+                if text is not None:
+                    atomic_write_text(os.path.join(out, f"{result['key']}.json"), text)
+                stats.record(result)
+                yield result
+    return transform
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+def _job_size(job) -> int:
+    return job.get("bytes", 0)
+
+
+def _built_size(result) -> int:
+    return result["bytes"]
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1e6 if sys.platform == "darwin" else peak / 1e3, 1)
+
+
+def run_pipeline(path: str, out: str, page_type: str | None = None, workers: int = 0,
+                 queue_depth: int = 256, max_buffer_mb: float = 64, chunk_size: int = 32) -> dict:
+    """
+    Runs the five stages to completion. Returns ThroughputStats.report()
+    plus "stages", "queues", "bottleneck" and "peak_rss_mb".
+    """
+    ndjson = out.endswith((".ndjson", ".jsonl"))
+    share = int(max_buffer_mb * 1e6 / 5)  # raw, jobs, in flight, built, serialized
+    queues = [
+        BoundedQueue("raw", queue_depth, share),
+        BoundedQueue("jobs", queue_depth, share),
+        BoundedQueue("built", queue_depth, share),
+        BoundedQueue("serialized", queue_depth, share),
+    ]
+    stats = ThroughputStats()
+
+    def abort():
+        for q in queues:
+            q.abort()
+
+    raw, jobs, built, serialized = queues
+    stages = [
+        Stage("ingest", ingest(path), None, raw, _raw_size, abort),
+        Stage("parse", parse(page_type), raw, jobs, _job_size, abort),
+        Stage("build", build(workers, chunk_size, share), jobs, built, _built_size, abort),
+        Stage("serialize", serialize(ndjson), built, serialized, _text_size, abort),
+        Stage("write", write(out, ndjson, stats), serialized, None, None, abort),
+    ]
+    for stage in stages:
+        stage.start()
+    try:
+        for stage in stages:
+            while stage.is_alive():
+                stage.join(0.2)
+    except BaseException:
+        abort()  # Ctrl-C: stop every stage, then let them close pools and files
+        for stage in stages:
+            stage.join()
+        raise
+
+    for stage in stages:
+        if stage.error is not None:
+            raise stage.error
+
+    report = stats.report()
+    stage_stats = {stage.stage_name: stage.stats() for stage in stages}
+    report["stages"] = stage_stats
+    report["queues"] = {q.name: q.stats() for q in queues}
+    report["bottleneck"] = max(stage_stats, key=lambda name: stage_stats[name]["utilization"] or 0)
+    report["peak_rss_mb"] = _peak_rss_mb()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a feed through ingest -> parse -> build -> serialize -> write.")
+    parser.add_argument("feed", help="Runner jobs (.ndjson) or feed rows (.csv / .ndjson / .json)")
+    parser.add_argument("out", help="Output directory, or an .ndjson file")
+    parser.add_argument("--page-type", default=None, help="Page type for feed rows without one")
+    parser.add_argument("--workers", type=int, default=0, help="Build processes (0 = build in-thread)")
+    parser.add_argument("--queue-depth", type=int, default=256, help="Items per queue between stages")
+    parser.add_argument("--max-buffer-mb", type=float, default=64, help="MB buffered between stages, split across the four queues and the build window")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Jobs per task with --workers")
+    args = parser.parse_args(argv)
+
+    report = run_pipeline(args.feed, args.out, args.page_type, args.workers,
+                          args.queue_depth, args.max_buffer_mb, args.chunk_size)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
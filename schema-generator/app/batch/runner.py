@@ -0,0 +1,262 @@
+"""
+Batch generator: runs page jobs through the page builders in parallel.
+
+A job is a dict:
+  {"url": "https://x.com/products/chair", "page_type": "Product Page",
+   "data": {...}}            # builder input, or
+   "data_path": "data/products__chair.json"}   # loaded inside the worker,
+                                                # {"$include": ...} fragments expanded
+
+Each page is written to <out_dir>/<page_key>.json (JSON-LD, indent=2) with an
+atomic replace, and throughput is reported per page type. With a
+Checkpoint (batch.checkpoint), finished pages are journaled and a restarted
+run skips them; a run that gets through every job removes the journal.
+"""
+
+import itertools
+import json
+import os
+import re
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from templates.page_templates import PAGE_BUILDERS
+from batch.checkpoint import Checkpoint
+from batch.ingest import load_page_data
+from batch.output import atomic_write_text
+from utils.frozen import BuildCache, FragmentCache, freeze
+
+
+# Builder input key that holds the page's own URL
+PAGE_URL_FIELDS = {
+    "Homepage": "site_url",
+    "Local Business": "url",
+    "Service Page": "url",
+    "Collection / Category Page": "url",
+    "Product Page": "url",
+    "Product Group": "url",
+    "Organization Policies": "org_url",
+}
+
+
+def url_key(url: str) -> str:
+    """
+    File-system key for a page URL (host is ignored, one site per run):
+      "https://x.com/"                  -> "index"
+      "https://x.com/services/plumbing/" -> "services__plumbing"
+      "https://x.com/shoes?page=2"       -> "shoes__page=2"
+    """
+    parts = urlsplit(url or "")
+    path = parts.path.strip("/")
+    key = path.replace("/", "__") if path else "index"
+    if parts.query:
+        key = f"{key}__{parts.query}"
+    return "".join(c if c.isalnum() or c in "-_.=" else "-" for c in key)
+
+
+def page_type_slug(page_type: str) -> str:
+    """
+    "Collection / Category Page" -> "collection-category-page"
+    """
+    return re.sub(r"[^a-z0-9]+", "-", (page_type or "").lower()).strip("-")
+
+
+def page_key(url: str, page_type: str) -> str:
+    """
+    Output file / journal key for one page. One URL can carry several page
+    types, so both are part of the key (url_key() never emits "@"):
+      ("https://x.com/shoes", "Collection / Category Page") -> "shoes@collection-category-page"
+    """
+    return f"{url_key(url)}@{page_type_slug(page_type)}"
+
+
+def job_key(job: dict) -> str:
+    return page_key(job.get("url") or "", job.get("page_type") or "")
+
+
+def job_input(job: dict, data_root: str | None = None) -> dict:
+    """
+    Builder input for a job, with the page URL filled in when the data omits it.
+    With data_root, data_path is confined to that directory (see load_page_data).
+    """
+    data = job.get("data")
+    if data is None:
+        data, _ = load_page_data(job["data_path"], root=data_root)
+    url_field = PAGE_URL_FIELDS.get(job["page_type"], "url")
+    if job.get("url") and not data.get(url_field):
+        data = {**data, url_field: job["url"]}
+    return data
+
+
+def build_job(job: dict, data_root: str | None = None):
+    """
+    Returns the schema for one job. Raises KeyError for unknown page types.
+    """
+    return PAGE_BUILDERS[job["page_type"]](job_input(job, data_root))
+
+
+def run_job(job: dict, out_dir: str) -> dict:
+    """
+    Build + serialize + write one page. Errors are returned, not raised, so a
+    bad row never stops the batch.
+    """
+    started = time.perf_counter()
+    key = job_key(job)
+    try:
+        schema = build_job(job)
+        atomic_write_text(os.path.join(out_dir, f"{key}.json"), json.dumps(schema, indent=2))
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "url": job.get("url"),
+        "page_type": job.get("page_type"),
+        "key": key,
+        "error": error,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def run_job_chunk(jobs: list, out_dir: str) -> list:
+    return [run_job(job, out_dir) for job in jobs]
+
+
+def chunked(iterable, size: int):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_map(pool, fn, iterable, window: int, *args):
+    """
+    Like pool.map(fn, iterable) but keeps at most `window` tasks in flight, so a
+    generator of millions of jobs is never materialized. Results stay in input order.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(pool.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class ThroughputStats:
+    """
+    Per page type counters:
+      {"Product Page": {"pages": 1200, "errors": 3, "worker_seconds": 4.1, "pages_per_sec": 950.2}}
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.by_type = {}
+        self.errors = []
+
+    def record(self, result: dict):
+        row = self.by_type.setdefault(result["page_type"], {"pages": 0, "errors": 0, "worker_seconds": 0.0})
+        row["pages"] += 1
+        row["worker_seconds"] += result["seconds"]
+        if result["error"]:
+            row["errors"] += 1
+            self.errors.append({"url": result["url"], "error": result["error"]})
+
+    def report(self) -> dict:
+        wall = time.perf_counter() - self.started
+        by_type = {}
+        for page_type, row in self.by_type.items():
+            by_type[page_type] = {
+                **row,
+                "worker_seconds": round(row["worker_seconds"], 4),
+                # pages/sec of worker time, comparable across page types
+                "pages_per_sec": round(row["pages"] / row["worker_seconds"], 1) if row["worker_seconds"] else None,
+            }
+        total = sum(r["pages"] for r in self.by_type.values())
+        return {
+            "pages": total,
+            "wall_seconds": round(wall, 4),
+            "pages_per_sec": round(total / wall, 1) if wall else None,
+            "by_page_type": by_type,
+            "errors": self.errors,
+        }
+
+
+def _ignore_sigint():
+    # Ctrl-C is handled by the parent, which shuts the pool down; a worker
+    # interrupted mid-task would leave the pool hanging instead.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_jobs(jobs, out_dir: str, workers: int | None = None, chunk_size: int = 64,
+             stats: ThroughputStats | None = None, checkpoint: Checkpoint | None = None) -> dict:
+    """
+    Run an iterable of jobs through a process pool (chunk_size jobs per task)
+    and write one file per page. Returns ThroughputStats.report(), plus
+    Checkpoint.report() under "checkpoint" when one is given. Once every job
+    has been run, the journal is removed (Checkpoint.complete()), so the next
+    run with the same journal path starts over instead of skipping pages whose
+    data may have changed since.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    stats = stats or ThroughputStats()
+    if checkpoint is not None:
+        jobs = checkpoint.pending_jobs(jobs, job_key)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_ignore_sigint) as pool:
+            try:
+                for results in bounded_map(pool, run_job_chunk, chunked(jobs, chunk_size), workers * 4, out_dir):
+                    for result in results:
+                        stats.record(result)
+                        if checkpoint is not None and not result["error"]:
+                            checkpoint.mark(result["key"])
+            except BaseException:
+                # Ctrl-C / error: finish the chunks already running, drop the queued ones
+                pool.shutdown(cancel_futures=True)
+                raise
+        if checkpoint is not None:
+            checkpoint.complete()
+    finally:
+        # journal whatever finished, also when the run is interrupted
+        if checkpoint is not None:
+            checkpoint.close()
+
+    report = stats.report()
+    if checkpoint is not None:
+        report["checkpoint"] = checkpoint.report()
+    return report
+
+
+def _build_frozen(job: dict, build_cache: BuildCache | None, fragments: FragmentCache) -> dict:
+    try:
+        page_type = job["page_type"]
+        data = job_input(job)
+        if build_cache is not None:
+            schema = build_cache.get_or_build(page_type, data, PAGE_BUILDERS[page_type])
+        else:
+            schema = freeze(PAGE_BUILDERS[page_type](data), fragments)
+        error = None
+    except Exception as e:
+        schema, error = None, f"{type(e).__name__}: {e}"
+    return {"url": job.get("url"), "page_type": job.get("page_type"), "schema": schema, "error": error}
+
+
+def build_jobs_threaded(jobs, workers: int = 8, build_cache: BuildCache | None = None,
+                        fragments: FragmentCache | None = None):
+    """
+    In-process thread-pool runner. Yields {"url","page_type","schema","error"}
+    in input order, where schema is a frozen tree (see utils.frozen).
+
+    All threads share one FragmentCache (and optionally a BuildCache), so
+    identical subtrees across pages -- brand, seller, shipping, breadcrumbs --
+    are stored once and reused without copies.
+    """
+    fragments = fragments or (build_cache.fragments if build_cache is not None else FragmentCache())
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from bounded_map(pool, _build_frozen, jobs, workers * 4, build_cache, fragments)
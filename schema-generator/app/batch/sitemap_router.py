@@ -0,0 +1,188 @@
+"""
+Sitemap-driven site-wide generation.
+
+Usage (from the app/ directory):
+  python -m batch.sitemap_router sitemap.xml --routes routes.json --data-dir data/ --out-dir out/
+  python -m batch.sitemap_router sitemap.xml --routes routes.json --data-dir data/ --out-dir out/ \
+      --checkpoint out/.checkpoint      # rerun the same command to resume after a crash
+
+routes.json (first match wins, regex searched against the URL path):
+  [
+    {"pattern": "^/$",            "page_type": "Homepage"},
+    {"pattern": "^/locations/",   "page_type": "Local Business"},
+    {"pattern": "^/services/",    "page_type": "Service Page"},
+    {"pattern": "^/collections/", "page_type": "Collection / Category Page"},
+    {"pattern": "^/products/",    "page_type": "Product Page"}
+  ]
+
+Page data is joined from <data-dir>/<url_key>.json (see batch.runner.url_key).
+Sitemap indexes are followed to local files (matched by file name, next to the
+index), and .gz sitemaps are read transparently. Everything is streamed.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
+
+from templates.page_templates import PAGE_BUILDERS
+from batch.ingest import load_json
+from batch.checkpoint import Checkpoint
+from batch.runner import run_jobs, url_key, ThroughputStats
+
+
+def _open_sitemap(path: str):
+    with open(path, "rb") as f:
+        magic = f.read(2)
+    if magic == b"\x1f\x8b":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _resolve_child_sitemap(loc: str, base_dir: str) -> str | None:
+    """
+    <sitemap><loc>https://x.com/sitemaps/products-1.xml.gz</loc></sitemap>
+      -> <base_dir>/products-1.xml.gz  (or the same name without .gz)
+    """
+    name = os.path.basename(urlsplit(loc).path)
+    for candidate in (name, name[:-3] if name.endswith(".gz") else name + ".gz"):
+        path = os.path.join(base_dir, candidate)
+        if candidate and os.path.exists(path):
+            return path
+    return None
+
+
+def iter_sitemap_urls(path: str, missing: list | None = None):
+    """
+    Yields every <url><loc> in a sitemap or sitemap index (recursively),
+    clearing parsed elements as it goes so memory stays flat.
+
+    missing: optional list that collects child sitemaps that aren't available locally.
+    """
+    base_dir = os.path.dirname(path)
+    with _open_sitemap(path) as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            tag = _local_name(elem.tag)
+            if tag == "url" or tag == "sitemap":
+                loc = None
+                for child in elem:
+                    if _local_name(child.tag) == "loc":
+                        loc = (child.text or "").strip()
+                        break
+                root.clear()
+                if not loc:
+                    continue
+                if tag == "url":
+                    yield loc
+                else:
+                    child_path = _resolve_child_sitemap(loc, base_dir)
+                    if child_path:
+                        yield from iter_sitemap_urls(child_path, missing)
+                    elif missing is not None:
+                        missing.append(loc)
+
+
+def compile_routes(routes):
+    """
+    routes: [{"pattern","page_type"}, ...] or {"pattern": "page_type", ...}
+    Returns [(compiled_regex, page_type), ...]
+    """
+    if isinstance(routes, dict):
+        routes = [{"pattern": p, "page_type": t} for p, t in routes.items()]
+    compiled = []
+    for r in routes:
+        if r["page_type"] not in PAGE_BUILDERS:
+            raise ValueError(f"Unknown page type in routes: {r['page_type']!r}")
+        compiled.append((re.compile(r["pattern"]), r["page_type"]))
+    return compiled
+
+
+def route_url(url: str, compiled_routes) -> str | None:
+    path = urlsplit(url).path or "/"
+    for regex, page_type in compiled_routes:
+        if regex.search(path):
+            return page_type
+    return None
+
+
+def iter_sitemap_jobs(sitemap_path: str, routes, data_dir: str, skipped: dict | None = None,
+                      missing: dict | None = None):
+    """
+    Yields runner jobs {"url","page_type","data_path"} for routed URLs that have
+    a data file. skipped (optional dict) counts "unrouted" / "missing_data" and
+    lists child sitemaps not found locally under "missing_sitemaps". missing
+    (optional dict) collects the jobs without a data file yet, by data path.
+    """
+    compiled = compile_routes(routes)
+    skipped = skipped if skipped is not None else {}
+    missing_sitemaps = skipped.setdefault("missing_sitemaps", [])
+    for url in iter_sitemap_urls(sitemap_path, missing_sitemaps):
+        page_type = route_url(url, compiled)
+        if not page_type:
+            skipped["unrouted"] = skipped.get("unrouted", 0) + 1
+            continue
+        data_path = os.path.join(data_dir, f"{url_key(url)}.json")
+        if not os.path.exists(data_path):
+            skipped["missing_data"] = skipped.get("missing_data", 0) + 1
+            if missing is not None:
+                missing[data_path] = {"url": url, "page_type": page_type, "data_path": data_path}
+            continue
+        yield {"url": url, "page_type": page_type, "data_path": data_path}
+
+
+def generate_from_sitemap(sitemap_path: str, routes, data_dir: str, out_dir: str,
+                          workers: int | None = None, chunk_size: int = 64,
+                          checkpoint: Checkpoint | None = None) -> dict:
+    """
+    Returns the runner report plus "skipped" counts. With a checkpoint, pages
+    journaled by an earlier (interrupted) run are skipped.
+    """
+    skipped = {}
+    report = run_jobs(
+        iter_sitemap_jobs(sitemap_path, routes, data_dir, skipped),
+        out_dir,
+        workers=workers,
+        chunk_size=chunk_size,
+        stats=ThroughputStats(),
+        checkpoint=checkpoint,
+    )
+    report["skipped"] = skipped
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate JSON-LD for every URL in a sitemap.")
+    parser.add_argument("sitemap", help="sitemap.xml, sitemap index, or .gz")
+    parser.add_argument("--routes", required=True, help="JSON file with URL pattern -> page type routes")
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--checkpoint", default=None, help="Journal file; a rerun resumes from it")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="Pages per journal flush")
+    parser.add_argument("--restart", action="store_true", help="Ignore (and reset) an existing journal")
+    args = parser.parse_args(argv)
+
+    checkpoint = None
+    if args.checkpoint:
+        checkpoint = Checkpoint(args.checkpoint, flush_every=args.checkpoint_every, resume=not args.restart)
+    report = generate_from_sitemap(
+        args.sitemap, load_json(args.routes), args.data_dir, args.out_dir,
+        workers=args.workers, chunk_size=args.chunk_size, checkpoint=checkpoint,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
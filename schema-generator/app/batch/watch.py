@@ -0,0 +1,228 @@
+"""
+Watch mode for the sitemap-driven batch generator.
+
+Usage (from the app/ directory):
+  python -m batch.watch sitemap.xml --routes routes.json --data-dir data/ --out-dir out/ --debounce 0.5
+
+Watches the data directory and the config files (routes + sitemaps). A
+dependency index maps every file to the pages that read it -- the page's
+own data file plus every {"$include": ...} fragment -- so editing a shared
+FAQ file regenerates exactly the pages that include it. A data file that
+appears for a sitemap URL that had none is added to the index on its own;
+other unknown files (editor temp files, unrelated JSON) are ignored. Bursts of changes
+are debounced into one regeneration, and latency is reported per burst.
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from batch.ingest import load_json, load_page_data
+from batch.runner import run_job, run_jobs
+from batch.sitemap_router import iter_sitemap_jobs
+
+
+# Below this many pages, regenerate in-process instead of starting a pool
+IN_PROCESS_LIMIT = 32
+
+
+class DependencyIndex:
+    """
+    file path -> page URLs that depend on it, and the reverse.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self._deps = {}
+        self._pages = defaultdict(set)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, job: dict):
+        url = job["url"]
+        self.remove(url)
+        try:
+            _, deps = load_page_data(job["data_path"])
+        except (OSError, ValueError):
+            # Broken include: still track the page file so fixing it triggers a rebuild
+            deps = [os.path.abspath(job["data_path"])]
+        self.jobs[url] = job
+        self._deps[url] = set(deps)
+        for path in deps:
+            self._pages[path].add(url)
+
+    def remove(self, url: str):
+        for path in self._deps.pop(url, ()):
+            pages = self._pages.get(path)
+            if pages:
+                pages.discard(url)
+                if not pages:
+                    del self._pages[path]
+        self.jobs.pop(url, None)
+
+    def knows(self, path: str) -> bool:
+        return path in self._pages
+
+    def affected(self, paths) -> set:
+        urls = set()
+        for path in paths:
+            urls |= self._pages.get(path, set())
+        return urls
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, events: queue.Queue):
+        self.events = events
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path and not os.path.basename(path).startswith(".tmp-"):
+                self.events.put((os.path.abspath(path), time.perf_counter()))
+
+
+class BatchWatcher:
+    def __init__(self, sitemap: str, routes_path: str, data_dir: str, out_dir: str,
+                 debounce: float = 0.5, max_wait: float = 5.0, workers: int | None = None, report=print):
+        self.sitemap = os.path.abspath(sitemap)
+        self.routes_path = os.path.abspath(routes_path)
+        self.data_dir = os.path.abspath(data_dir)
+        self.out_dir = out_dir
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.workers = workers
+        self.report = report
+        self.index = DependencyIndex()
+        self.missing = {}  # data path -> job, for sitemap URLs without a data file yet
+        self.events = queue.Queue()
+        self.stop_event = threading.Event()
+
+    # -- index -----------------------------------------------------------
+    def rebuild_index(self):
+        index = DependencyIndex()
+        missing = {}
+        for job in iter_sitemap_jobs(self.sitemap, load_json(self.routes_path), self.data_dir, missing=missing):
+            index.add(job)
+        self.index = index
+        self.missing = missing
+
+    def _is_config(self, path: str) -> bool:
+        if path == self.routes_path:
+            return True
+        sitemap_dir = os.path.dirname(self.sitemap)
+        return os.path.dirname(path) == sitemap_dir and path.endswith((".xml", ".gz"))
+
+    def affected_pages(self, paths) -> set:
+        """
+        Config changes rebuild the index and affect every page. A new data
+        file for a sitemap URL adds just that page; other unknown paths are
+        ignored.
+        """
+        if any(self._is_config(p) for p in paths):
+            self.rebuild_index()
+            return set(self.index.jobs)
+
+        for path in paths:
+            if path in self.missing and os.path.exists(path):
+                self.index.add(self.missing.pop(path))
+
+        urls = self.index.affected(paths)
+        # A page file may have gained or lost includes
+        for url in urls:
+            self.index.add(self.index.jobs[url])
+        return urls
+
+    # -- regeneration ----------------------------------------------------
+    def regenerate(self, paths: set, burst_started: float) -> dict:
+        started = time.perf_counter()
+        urls = self.affected_pages(paths)
+        jobs = [self.index.jobs[u] for u in urls if u in self.index.jobs]
+
+        if len(jobs) <= IN_PROCESS_LIMIT:
+            os.makedirs(self.out_dir, exist_ok=True)
+            results = [run_job(job, self.out_dir) for job in jobs]
+            errors = [{"url": r["url"], "error": r["error"]} for r in results if r["error"]]
+        else:
+            errors = run_jobs(jobs, self.out_dir, workers=self.workers)["errors"]
+
+        finished = time.perf_counter()
+        return {
+            "changed_files": len(paths),
+            "pages": len(jobs),
+            "errors": errors,
+            "regenerate_ms": round((finished - started) * 1000, 1),
+            # from the first change in the burst to fresh output on disk
+            "latency_ms": round((finished - burst_started) * 1000, 1),
+        }
+
+    def _next_burst(self):
+        try:
+            path, first_seen = self.events.get(timeout=0.5)
+        except queue.Empty:
+            return None, None
+        paths = {path}
+        while time.perf_counter() - first_seen < self.max_wait:
+            try:
+                path, _ = self.events.get(timeout=self.debounce)
+            except queue.Empty:
+                break
+            paths.add(path)
+        return paths, first_seen
+
+    def run(self):
+        self.rebuild_index()
+        self.report({"watching": len(self.index), "data_dir": self.data_dir})
+
+        observer = Observer()
+        handler = _ChangeHandler(self.events)
+        observer.schedule(handler, self.data_dir, recursive=True)
+        for config_dir in {os.path.dirname(self.sitemap), os.path.dirname(self.routes_path)}:
+            if not config_dir.startswith(self.data_dir):
+                observer.schedule(handler, config_dir, recursive=False)
+        observer.start()
+        try:
+            while not self.stop_event.is_set():
+                paths, first_seen = self._next_burst()
+                if paths:
+                    self.report(self.regenerate(paths, first_seen))
+        finally:
+            observer.stop()
+            observer.join()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate only the pages affected by changed input files.")
+    parser.add_argument("sitemap")
+    parser.add_argument("--routes", required=True)
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--debounce", type=float, default=0.5, help="Quiet period (seconds) that ends a burst")
+    parser.add_argument("--max-wait", type=float, default=5.0, help="Longest a burst can be held back")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    watcher = BatchWatcher(
+        args.sitemap, args.routes, args.data_dir, args.out_dir,
+        debounce=args.debounce, max_wait=args.max_wait, workers=args.workers,
+        report=lambda r: print(json.dumps(r), flush=True),
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Snapshot / benchmark input corpus for the five page builders.
+
+Each fixture is (page_type, data). "Representative" fixtures mirror what the
+Streamlit forms produce with every optional block switched on; "large"
+fixtures are generated deterministically to stress the builders.
+"""
+
+SITE = "https://example-furniture.com"
+
+
+def _homepage_full():
+    return {
+        "business_type": "FurnitureStore",
+        "site_url": SITE + "/",
+        "name": "Example Furniture",
+        "org_name": "Example Furniture LLC",
+        "description": "Solid wood furniture made to order.",
+        "logo": SITE + "/logo.png",
+        "image": SITE + "/storefront.jpg",
+        "telephone": "+1-555-0100",
+        "email": "hello@example-furniture.com",
+        "price_range": "$$",
+        "same_as": ["https://www.facebook.com/examplefurniture", "https://www.instagram.com/examplefurniture"],
+        "alternate_names": ["Example Furniture Co"],
+        "knows_language": "en-US",
+        "additional_types": ["http://www.productontology.org/id/Furniture"],
+        "knows_about": ["https://en.wikipedia.org/wiki/Furniture"],
+        "street": "1 Main St",
+        "city": "Austin",
+        "state": "TX",
+        "zip": "78701",
+        "country": "US",
+        "lat": "30.2672",
+        "lng": "-97.7431",
+        "has_map": "https://maps.google.com/?cid=123",
+        "opening_hours_spec": [
+            {"@type": "OpeningHoursSpecification", "dayOfWeek": "Monday", "opens": "09:00", "closes": "17:00"},
+        ],
+        "area_served": [{"@type": "City", "name": "Austin"}],
+        "identifier_property_id": "kgmid",
+        "identifier_value": "/g/11abc",
+        "makes_offer": [{"name": "Tables", "description": "Dining tables", "url": SITE + "/tables"}],
+        "offer_catalog_name": "Services",
+        "offer_catalog_mode": "offer_wrapped",
+        "offer_catalog_services": [{"name": "Delivery", "description": "White glove", "url": SITE + "/delivery"}],
+        "main_entity_of_page": {
+            "name": "Home",
+            "url": SITE + "/",
+            "@id": SITE + "/",
+            "about": [{"@type": "Thing", "name": "Furniture", "sameAs": ["https://en.wikipedia.org/wiki/Furniture"]}],
+        },
+        "website_schema": {
+            "name": "Example Furniture",
+            "url": SITE + "/",
+            "potentialAction": {
+                "@type": "SearchAction",
+                "target": SITE + "/search?q={search_term_string}",
+                "query-input": "required name=search_term_string",
+            },
+        },
+        "faqs": [{"question": "Do you deliver?", "answer": "Yes, within 50 miles."}],
+    }
+
+
+def _homepage_minimal():
+    return {"business_type": "Organization", "site_url": SITE, "name": "Example Furniture"}
+
+
+def _local_business_full():
+    return {
+        "business_type": "HVACBusiness",
+        "name": "Cool Air",
+        "legal_name": "Cool Air Inc",
+        "description": "Heating and cooling.",
+        "url": "https://coolair.example/",
+        "telephone": "+1-555-0199",
+        "email": "info@coolair.example",
+        "image": "https://coolair.example/van.jpg",
+        "logo": "https://coolair.example/logo.png",
+        "price_range": "$$",
+        "street": "9 Elm St",
+        "city": "Denver",
+        "state": "CO",
+        "zip": "80202",
+        "country": "US",
+        "lat": "39.7392",
+        "lng": "-104.9903",
+        "rating_enabled": True, "rating_value": "4.9", "review_count": "212",
+        "map_enabled": True, "map_url": "https://maps.google.com/?cid=987",
+        "sameas_enabled": True, "same_as": ["https://www.yelp.com/biz/cool-air"],
+        "additional_type_enabled": True, "additional_types": ["http://www.productontology.org/id/HVAC"],
+        "alternate_name_enabled": True, "alternate_names": ["Cool Air HVAC"],
+        "knows_about_enabled": True, "knows_about": ["https://en.wikipedia.org/wiki/HVAC"],
+        "area_served_enabled": True, "area_name": "Denver, CO",
+        "postal_codes": ["80202", "80203"], "served_cities": ["Denver", "Aurora"],
+        "hours_enabled": True,
+        "opening_hours": [{"dayOfWeek": "Monday", "opens": "08:00", "closes": "18:00"}],
+        "identifier_enabled": True, "identifier_property_id": "mapsCid", "identifier_value": "987",
+        "founder_enabled": True, "founder_name": "Ana Ruiz", "founder_job_title": "Founder",
+        "founder_same_as": ["https://www.linkedin.com/in/anaruiz"],
+        "language_enabled": True, "knows_language": "en-US",
+        "catalog_enabled": True, "catalog_name": "Services",
+        "services": [{"name": "AC Repair", "description": "Same-day repair", "url": "https://coolair.example/ac"}],
+    }
+
+
+def _service_full(n_faqs=3):
+    return {
+        "service_name": "AC Repair",
+        "service_description": "Same-day air conditioner repair.",
+        "url": "https://coolair.example/ac-repair/",
+        "provider_type": "LocalBusiness",
+        "provider_name": "Cool Air",
+        "provider_url": "https://coolair.example/",
+        "site_name": "Cool Air",
+        "site_url": "https://coolair.example/",
+        "area_served": {"@type": "Place", "name": "Denver"},
+        "breadcrumb_enabled": True,
+        "breadcrumbs": [
+            {"name": "Home", "url": "https://coolair.example/"},
+            {"name": "AC Repair", "url": "https://coolair.example/ac-repair/"},
+        ],
+        "faq_enabled": True,
+        "faqs": [
+            {"question": f"Question {i}?", "answer": f"Answer number {i} with some explanatory text."}
+            for i in range(n_faqs)
+        ],
+    }
+
+
+def _collection(n_products):
+    availability = ["https://schema.org/InStock", "https://schema.org/OutOfStock", ""]
+    return {
+        "name": "Dining Tables",
+        "url": SITE + "/collections/dining-tables",
+        "description": "Solid wood dining tables.",
+        "default_currency": "USD",
+        "products": [
+            {
+                "name": f"Table {i}",
+                "url": f"{SITE}/products/table-{i}",
+                "image": f"{SITE}/img/table-{i}.jpg",
+                "price": f"{100 + i % 900}.00" if i % 7 else "",
+                "currency": "EUR" if i % 11 == 0 else "",
+                "availability": availability[i % 3],
+            }
+            for i in range(n_products)
+        ],
+        "breadcrumb_enabled": True,
+        "breadcrumbs": [{"name": "Home", "url": SITE + "/"}, {"name": "Tables", "url": SITE + "/collections/dining-tables"}],
+        "faq_enabled": True,
+        "faqs": [{"question": "Are tables solid wood?", "answer": "Yes."}],
+    }
+
+
+def _product_full():
+    return {
+        "product_name": "Oak Dining Table",
+        "product_description": "Six-seat solid oak table.",
+        "product_images": [SITE + "/img/oak-1.jpg", SITE + "/img/oak-2.jpg"],
+        "sku": "OAK-6",
+        "brand": "Example Furniture",
+        "url": SITE + "/products/oak-dining-table",
+        "currency": "USD",
+        "price": "1299.00",
+        "availability": "https://schema.org/InStock",
+        "breadcrumb_enabled": True,
+        "breadcrumbs": [{"name": "Home", "url": SITE + "/"}, {"name": "Oak Table", "url": SITE + "/products/oak-dining-table"}],
+        "main_entity_enabled": True,
+        "page_name": "Oak Dining Table",
+        "page_description": "Buy the oak dining table.",
+        "site_url": SITE + "/",
+        "site_name": "Example Furniture",
+        "product_rating_enabled": True,
+        "product_rating_value": "4.7",
+        "product_review_count": "150",
+        "product_best_rating": "5",
+        "seller_enabled": True,
+        "seller_name": "Example Furniture",
+        "seller_url": SITE + "/",
+        "shipping_enabled": True,
+        "shipping_country": "US",
+        "handling_min_days": "1", "handling_max_days": "2",
+        "transit_min_days": "2", "transit_max_days": "5",
+        "return_policy_enabled": True,
+        "return_policy_category": "https://schema.org/MerchantReturnFiniteReturnWindow",
+        "return_days": "30",
+        "return_method": "https://schema.org/ReturnByMail",
+        "return_fees": "https://schema.org/FreeReturn",
+        "item_condition": "https://schema.org/NewCondition",
+        "price_valid_until": "2026-12-31",
+        "gtin": "0123456789012",
+        "mpn": "OAK6",
+    }
+
+
+def _product_minimal():
+    return {"product_name": "Stool", "price": "49", "currency": "USD", "availability": "https://schema.org/InStock"}
+
+
+def _local_business_large_catalog(n_services):
+    data = _local_business_full()
+    data["services"] = [
+        {"name": f"Service {i}", "description": f"Description of service {i}.", "url": f"https://coolair.example/s/{i}"}
+        for i in range(n_services)
+    ]
+    data["postal_codes"] = [f"{80000 + i}" for i in range(n_services)]
+    return data
+
+
+def _product_group(colors, sizes):
+    data = {k: v for k, v in _product_full().items() if k not in ("sku", "price", "gtin", "mpn", "breadcrumb_enabled", "breadcrumbs")}
+    data["group_id"] = "OAK-CHAIR"
+    data["varies_by"] = ["color", "size"]
+    data["variants"] = [
+        {"sku": f"OAK-CHAIR-{c}-{s}", "color": c, "size": s, "price": f"{199 + i}.00",
+         "url": f"{SITE}/products/oak-chair?color={c}&size={s}"}
+        for i, (c, s) in enumerate((c, s) for c in colors for s in sizes)
+    ]
+    return data
+
+
+def _organization_policies():
+    shipping = {k: v for k, v in _product_full().items() if k.startswith(("shipping_", "handling_", "transit_"))}
+    returns = {k: v for k, v in _product_full().items() if k.startswith("return_")}
+    return {
+        "org_url": SITE + "/",
+        "org_name": "Example Furniture",
+        "shipping_profiles": {
+            "standard": shipping,
+            "express": {**shipping, "handling_max_days": "1", "transit_min_days": "1", "transit_max_days": "2"},
+            "freight": {**shipping, "handling_min_days": "3", "handling_max_days": "5", "transit_max_days": "14"},
+        },
+        "return_policies": {"default": returns},
+    }
+
+
+def _product_with_profiles():
+    data = _product_full()
+    data.update({"shipping_profile": "freight", "return_policy_profile": "default",
+                 "policy_profiles": _organization_policies()})
+    return data
+
+
+FIXTURES = {
+    "homepage_full": ("Homepage", _homepage_full),
+    "homepage_minimal": ("Homepage", _homepage_minimal),
+    "homepage_missing_required": ("Homepage", lambda: {"name": "No URL"}),
+    "local_business_full": ("Local Business", _local_business_full),
+    "service_page_full": ("Service Page", _service_full),
+    "collection_small": ("Collection / Category Page", lambda: _collection(12)),
+    "product_full": ("Product Page", _product_full),
+    "product_minimal": ("Product Page", _product_minimal),
+    "product_with_profiles": ("Product Page", _product_with_profiles),
+    "organization_policies": ("Organization Policies", _organization_policies),
+    "product_group_apparel": ("Product Group", lambda: _product_group(["Natural", "Walnut", "Black"], ["S", "M", "L", "XL"])),
+    # Large inputs
+    "local_business_large_catalog": ("Local Business", lambda: _local_business_large_catalog(2_000)),
+    "service_page_large_faq": ("Service Page", lambda: _service_full(2_000)),
+    "collection_large": ("Collection / Category Page", lambda: _collection(20_000)),
+    "product_group_large": ("Product Group", lambda: _product_group([f"Color {i}" for i in range(50)], [str(s) for s in range(30, 70)])),
+}
+
+
+def load_fixtures(names=None):
+    """
+    Returns {name: (page_type, data)}; data is built fresh on every call.
+    """
+    selected = names or list(FIXTURES)
+    return {name: (FIXTURES[name][0], FIXTURES[name][1]()) for name in selected}
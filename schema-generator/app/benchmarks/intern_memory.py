@@ -0,0 +1,81 @@
+"""
+Memory of a large in-memory product batch with and without string pooling.
+
+Usage (from the app/ directory):
+  python -m benchmarks.intern_memory --products 100000
+
+Writes a temporary NDJSON feed, then twice ingests it and keeps every
+product_schema() result in memory: once with pooling disabled (ingest and
+builders), once with a fresh InternPool. Reports tracemalloc's retained bytes.
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+from templates.page_templates import product_schema
+from batch.ingest import iter_feed_rows
+from utils.interning import InternPool, use_pool
+
+
+def _write_feed(path: str, n: int):
+    brands = [f"Brand {i}" for i in range(50)]
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({
+                "product_name": f"Product {i}",
+                "sku": f"SKU-{i}",
+                "url": f"https://shop.example/p/{i}",
+                "price": f"{10 + i % 500}.99",
+                "currency": "USD",
+                "availability": "https://schema.org/InStock" if i % 5 else "https://schema.org/OutOfStock",
+                "brand": brands[i % len(brands)],
+                "item_condition": "https://schema.org/NewCondition",
+                "seller_enabled": True,
+                "seller_name": "Example Shop",
+                "seller_url": "https://shop.example/",
+            }) + "\n")
+
+
+def measure(feed_path: str, pooling: bool) -> dict:
+    pool = InternPool() if pooling else None
+    previous = use_pool(pool)
+    try:
+        gc.collect()
+        tracemalloc.start()
+        batch = [product_schema(row) for row in iter_feed_rows(feed_path, intern=pooling)]
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "pooling": pooling,
+            "products": len(batch),
+            "retained_mb": round(current / 1e6, 2),
+            "peak_mb": round(peak / 1e6, 2),
+            "pool": pool.stats() if pool is not None else None,
+        }
+    finally:
+        use_pool(previous)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure interning savings on a bulk product batch.")
+    parser.add_argument("--products", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = os.path.join(tmp, "feed.ndjson")
+        _write_feed(feed, args.products)
+        before = measure(feed, pooling=False)
+        after = measure(feed, pooling=True)
+
+    print(json.dumps({"before": before, "after": after}, indent=2))
+    saved = before["retained_mb"] - after["retained_mb"]
+    print(f"Pooling saves {saved:.2f} MB ({saved / before['retained_mb']:.0%}) on {args.products} products")
+
+
+if __name__ == "__main__":
+    main()
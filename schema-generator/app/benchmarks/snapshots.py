@@ -0,0 +1,138 @@
+"""
+Golden-snapshot regression harness with timing capture.
+
+Usage (from the app/ directory):
+  python -m benchmarks.snapshots check            # byte-compare + time every fixture
+  python -m benchmarks.snapshots update           # accept current output as golden
+  python -m benchmarks.snapshots check --repeat 20 --only collection_large
+
+Golden data lives in benchmarks/golden/:
+  manifest.json      {fixture: {"page_type", "sha256", "bytes"}} for every fixture
+  <fixture>.json     full serialized output for the small fixtures (readable diffs)
+
+Timings are written to benchmarks/timings.json (machine-specific, not committed)
+and compared with the previous run, so a refactor shows both "identical" and
+"faster / slower" per fixture.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+
+from templates.page_templates import PAGE_BUILDERS
+from benchmarks.fixtures import load_fixtures
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(HERE, "golden")
+MANIFEST_PATH = os.path.join(GOLDEN_DIR, "manifest.json")
+TIMINGS_PATH = os.path.join(HERE, "timings.json")
+
+# Outputs up to this size are also stored in full for readable diffs
+FULL_TEXT_LIMIT = 64 * 1024
+
+
+def serialize(schema) -> bytes:
+    """
+    The exact bytes the app shows / downloads for JSON-LD mode.
+    """
+    return json.dumps(schema, indent=2).encode("utf-8")
+
+
+def _time_fixture(page_type: str, data: dict, repeat: int):
+    builder = PAGE_BUILDERS[page_type]
+    samples = []
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = serialize(builder(data))
+        samples.append(time.perf_counter() - started)
+    return output, samples
+
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, obj):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def run(mode: str, names=None, repeat: int = 5, out=sys.stdout) -> bool:
+    """
+    mode: "check" or "update". Returns True when every fixture matches (or was updated).
+    """
+    manifest = _load_json(MANIFEST_PATH, {})
+    previous = _load_json(TIMINGS_PATH, {})
+    timings = dict(previous)
+    ok = True
+
+    for name, (page_type, data) in load_fixtures(names).items():
+        output, samples = _time_fixture(page_type, data, repeat)
+        digest = hashlib.sha256(output).hexdigest()
+        best = min(samples)
+        median = statistics.median(samples)
+        timings[name] = {"min_ms": round(best * 1000, 3), "median_ms": round(median * 1000, 3), "repeat": repeat}
+
+        before = previous.get(name, {}).get("min_ms")
+        trend = f"  ({before / (best * 1000):.2f}x vs previous)" if before else ""
+        line = f"{name:<32} {len(output):>10} B  min {best * 1000:9.3f} ms  median {median * 1000:9.3f} ms{trend}"
+
+        if mode == "update":
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            manifest[name] = {"page_type": page_type, "sha256": digest, "bytes": len(output)}
+            full_path = os.path.join(GOLDEN_DIR, f"{name}.json")
+            if len(output) <= FULL_TEXT_LIMIT:
+                with open(full_path, "wb") as f:
+                    f.write(output)
+            elif os.path.exists(full_path):
+                os.remove(full_path)
+            print(f"UPDATED  {line}", file=out)
+            continue
+
+        golden = manifest.get(name)
+        if golden is None:
+            ok = False
+            print(f"MISSING  {line}  (run 'update' to record it)", file=out)
+        elif golden["sha256"] == digest:
+            print(f"OK       {line}", file=out)
+        else:
+            ok = False
+            print(f"CHANGED  {line}  (golden {golden['bytes']} B)", file=out)
+            full_path = os.path.join(GOLDEN_DIR, f"{name}.json")
+            if os.path.exists(full_path):
+                with open(full_path, encoding="utf-8") as f:
+                    expected = f.read().splitlines()
+                diff = difflib.unified_diff(expected, output.decode("utf-8").splitlines(), "golden", "actual", lineterm="", n=2)
+                for diff_line in list(diff)[:40]:
+                    print(f"    {diff_line}", file=out)
+
+    if mode == "update":
+        _write_json(MANIFEST_PATH, manifest)
+    _write_json(TIMINGS_PATH, timings)
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Golden-snapshot + timing harness for the page builders.")
+    parser.add_argument("mode", choices=["check", "update"])
+    parser.add_argument("--only", nargs="*", help="Fixture names (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    ok = run(args.mode, args.only, args.repeat)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
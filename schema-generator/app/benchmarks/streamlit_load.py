@@ -0,0 +1,301 @@
+"""
+Concurrent-session load test for the Streamlit app (main.py).
+
+Usage (from the app/ directory):
+  python -m benchmarks.streamlit_load --sessions 8 --rounds 3
+  python -m benchmarks.streamlit_load --sessions 20 --rounds 5 --out load.json --fail-p95-ms 1500
+
+Each session is an in-process streamlit.testing.v1.AppTest running in its
+own thread, like one editor's browser tab. A session cycles through every
+page type, filling the form field by field (one rerun per edit, as in the
+browser) with either realistic or oversized inputs (thousands of products,
+FAQs, services). Every rerun is timed.
+
+AppTest swaps process-wide state on every run (the Runtime instance, config
+options), so reruns from different sessions take turns; only the rerun
+itself is timed, not the wait for another session's to finish.
+
+Report:
+  latency_ms  p50 / p90 / p95 / p99 / max, overall and per scenario
+  memory_mb   process RSS at start, after the first round and at the end,
+              per live session, and growth per session per extra round
+              (steady growth across rounds points at a leak)
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# AppTest.run() isn't safe to call from two threads at once
+_RUN_LOCK = threading.Lock()
+
+
+# -------------------------
+# Scenarios
+# -------------------------
+# (widget kind, label, value) in the order an editor fills the form;
+# checkboxes come before the fields they reveal.
+def _lines(n: int, make) -> str:
+    return "\n".join(make(i) for i in range(n))
+
+
+def _faqs(n: int) -> str:
+    return _lines(n, lambda i: f"How does option {i} work? | Option {i} works like this, with enough detail to be useful.")
+
+
+def _breadcrumbs(n: int) -> str:
+    return _lines(n, lambda i: f"Level {i} | https://shop.example/level-{i}/")
+
+
+def homepage_steps(size: int) -> list:
+    return [
+        ("text_input", "Website URL (required)", "https://shop.example/"),
+        ("text_input", "Business / Brand Name (required)", "Example Shop"),
+        ("text_area", "Description (optional)", "Handmade furniture since 1990. " * max(1, size // 50)),
+        ("text_area", "sameAs Links (one per line)", _lines(min(size, 50), lambda i: f"https://social{i}.example/shop")),
+        ("checkbox", "Add FAQPage (recommended if you have FAQs)", True),
+        ("text_area", "FAQs", _faqs(size)),
+    ]
+
+
+def local_business_steps(size: int) -> list:
+    return [
+        ("text_input", "Business Name", "Example Plumbing"),
+        ("text_input", "Website URL", "https://plumbing.example/"),
+        ("text_input", "Telephone", "+1-555-0100"),
+        ("text_input", "City", "Austin"),
+        ("text_input", "State", "TX"),
+        ("checkbox", "Add hasOfferCatalog (Services list)", True),
+        ("text_area", "Services", _lines(size, lambda i: f"Service {i} | Fixes problem {i} | https://plumbing.example/s/{i}")),
+    ]
+
+
+def service_page_steps(size: int) -> list:
+    return [
+        ("text_input", "Service Name", "Drain Cleaning"),
+        ("text_area", "Service Description", "Fast, clean drain service."),
+        ("text_input", "Service Page URL", "https://plumbing.example/drain-cleaning/"),
+        ("text_input", "Provider Name", "Example Plumbing"),
+        ("checkbox", "Add BreadcrumbList (recommended)", True),
+        ("text_area", "Breadcrumbs", _breadcrumbs(3)),
+        ("checkbox", "Add FAQPage (recommended)", True),
+        ("text_area", "FAQ", _faqs(size)),
+    ]
+
+
+def collection_steps(size: int) -> list:
+    return [
+        ("text_input", "Collection Name", "Chairs"),
+        ("text_input", "Collection URL", "https://shop.example/chairs/"),
+        ("text_area", "Products", _lines(size, lambda i: (
+            f"Chair {i} | https://shop.example/p/chair-{i} | https://cdn.shop.example/chair-{i}.jpg"
+            f" | {49 + i % 300}.00 | USD | https://schema.org/InStock"
+        ))),
+        ("checkbox", "Add FAQPage (recommended)", True),
+        ("text_area", "FAQ", _faqs(max(3, size // 100))),
+    ]
+
+
+def product_steps(size: int) -> list:
+    return [
+        ("text_input", "Product Name", "Oak Chair"),
+        ("text_area", "Description", "Solid oak dining chair. " * max(1, size // 50)),
+        ("text_area", "Product Images (one per line)", _lines(min(size, 200), lambda i: f"https://cdn.shop.example/oak-{i}.jpg")),
+        ("text_input", "SKU", "OAK-CH-1"),
+        ("text_input", "Brand", "Example"),
+        ("text_input", "Product URL", "https://shop.example/p/oak-chair"),
+        ("text_input", "Price", "149.00"),
+        ("checkbox", "Add Breadcrumbs", True),
+        ("text_area", "Breadcrumbs", _breadcrumbs(4)),
+    ]
+
+
+PAGE_STEPS = {
+    "Homepage": homepage_steps,
+    "Local Business": local_business_steps,
+    "Service Page": service_page_steps,
+    "Collection / Category Page": collection_steps,
+    "Product Page": product_steps,
+}
+
+# input size -> list lengths (FAQs, services, products ...)
+SIZES = {"realistic": 10, "oversized": 5000}
+
+
+def scenarios(sizes=SIZES):
+    """
+    [(name, page_type, steps)], built once and shared by every session.
+    """
+    return [
+        (f"{page_type} / {size_name}", page_type, make_steps(size))
+        for page_type, make_steps in PAGE_STEPS.items()
+        for size_name, size in sizes.items()
+    ]
+
+
+# -------------------------
+# Sessions
+# -------------------------
+def _widget(elements, label: str):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"widget not found: {label!r}")
+
+
+def _apply(at: AppTest, kind: str, label: str, value):
+    widget = _widget(getattr(at, kind), label)
+    if kind == "checkbox" and value:
+        widget.check()
+    elif kind == "checkbox":
+        widget.uncheck()
+    elif kind == "selectbox":
+        widget.select(value)
+    else:
+        widget.input(value)
+
+
+class Session:
+    """
+    One simulated editor. Timings go to `latencies` as (scenario, ms).
+    """
+
+    def __init__(self, timeout: float):
+        self.at = AppTest.from_file(MAIN_SCRIPT, default_timeout=timeout)
+        self.latencies = []
+        self.errors = []
+
+    def _run(self, scenario: str):
+        with _RUN_LOCK:
+            started = time.perf_counter()
+            self.at.run()
+            self.latencies.append((scenario, (time.perf_counter() - started) * 1000))
+        if self.at.exception:
+            self.errors.append({"scenario": scenario, "error": str(self.at.exception[0].value)})
+
+    def play(self, scenario: str, page_type: str, steps: list):
+        _widget(self.at.sidebar.selectbox, "Select Page Type").select(page_type)
+        self._run(scenario)
+        for kind, label, value in steps:
+            try:
+                _apply(self.at, kind, label, value)
+            except LookupError as e:
+                self.errors.append({"scenario": scenario, "error": str(e)})
+                return
+            self._run(scenario)
+
+    def round(self, plays: list):
+        if not self.latencies:
+            self._run("initial load")
+        for scenario, page_type, steps in plays:
+            self.play(scenario, page_type, steps)
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def _rss_mb() -> float:
+    """
+    Current RSS on Linux; peak RSS elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def percentiles(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+
+    def pick(p):
+        return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 2)
+
+    return {"count": len(values), "p50": pick(50), "p90": pick(90), "p95": pick(95), "p99": pick(99),
+            "max": round(values[-1], 2)}
+
+
+def _run_round(sessions: list, plays: list):
+    threads = [threading.Thread(target=s.round, args=(plays,)) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_load_test(n_sessions: int = 8, rounds: int = 3, timeout: float = 60.0, sizes=SIZES) -> dict:
+    plays = scenarios(sizes)
+    rss_start = _rss_mb()
+    started = time.perf_counter()
+
+    sessions = [Session(timeout) for _ in range(n_sessions)]
+    _run_round(sessions, plays)
+    rss_first = _rss_mb()
+    for _ in range(rounds - 1):
+        _run_round(sessions, plays)
+    rss_end = _rss_mb()
+
+    all_latencies = [(name, ms) for s in sessions for name, ms in s.latencies]
+    by_scenario = {}
+    for name, ms in all_latencies:
+        by_scenario.setdefault(name, []).append(ms)
+
+    return {
+        "sessions": n_sessions,
+        "rounds": rounds,
+        "reruns": len(all_latencies),
+        "wall_seconds": round(time.perf_counter() - started, 2),
+        "latency_ms": {
+            "overall": percentiles(ms for _, ms in all_latencies),
+            "by_scenario": {name: percentiles(values) for name, values in by_scenario.items()},
+        },
+        "memory_mb": {
+            "start": round(rss_start, 1),
+            "after_first_round": round(rss_first, 1),
+            "end": round(rss_end, 1),
+            "per_session": round((rss_first - rss_start) / n_sessions, 2),
+            "growth_per_session_per_round": (
+                round((rss_end - rss_first) / n_sessions / (rounds - 1), 3) if rounds > 1 else None
+            ),
+        },
+        "errors": [e for s in sessions for e in s.errors],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent editor sessions against main.py.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over every scenario per session")
+    parser.add_argument("--oversized", type=int, default=SIZES["oversized"], help="List length for oversized inputs")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-rerun AppTest timeout (seconds)")
+    parser.add_argument("--out", default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--fail-p95-ms", type=float, default=None, help="Exit 1 if overall p95 exceeds this")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.sessions, args.rounds, args.timeout,
+                           sizes={"realistic": SIZES["realistic"], "oversized": args.oversized})
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    p95 = report["latency_ms"]["overall"].get("p95")
+    if report["errors"] or (args.fail_p95_ms is not None and p95 is not None and p95 > args.fail_p95_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
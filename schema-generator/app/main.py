@@ -7,10 +7,20 @@ from templates.page_templates import (
     homepage_schema,
     service_page_schema,
     collection_schema,
-    entity_recommendations
+    entity_recommendations,
+    merge_schema_graph
 )
 
 from utils.schema_helpers import clean_list, to_script_tag
+from utils.about_tree import iter_about_things
+from utils.preview import schema_stats, resolve_path, preview_rows
+from utils.perf import PerfRecorder, use_recorder, lap, timed
+from utils.frozen import BuildCache
+
+
+# Outputs up to this size are shown in full; larger ones get a summary + tree preview
+INLINE_PREVIEW_BYTES = 50_000
+PREVIEW_PAGE_SIZE = 50
 
 
 st.set_page_config(page_title="Schema Generator", layout="wide")
@@ -20,58 +30,6 @@ st.sidebar.title("Schema Generator")
 # -----------------------------------
 # Helpers
 # -----------------------------------
-def parse_about_nested(lines):
-    """
-    Input format:
-      ParentName | url1, url2
-        - ChildName | url1, url2
-
-    Output:
-      [
-        {
-          "name": "ParentName",
-          "same_as": ["url1","url2"],
-          "has_part": [
-            {"name":"ChildName","same_as":["url1","url2"]}
-          ]
-        }
-      ]
-    """
-    result = []
-    current_parent = None
-
-    for raw in lines or []:
-        line = (raw or "").strip()
-        if not line:
-            continue
-
-        is_child = line.startswith("-") or line.startswith("•") or line.startswith("—") or line.startswith("–")
-        if is_child:
-            if not current_parent:
-                continue
-            line = line.lstrip("-•—–").strip()
-
-        if "|" in line:
-            name, urls = line.split("|", 1)
-            name = name.strip()
-            urls_list = [u.strip() for u in urls.split(",") if u.strip()]
-        else:
-            name = line.strip()
-            urls_list = []
-
-        if not is_child:
-            current_parent = {"name": name, "same_as": urls_list, "has_part": []}
-            result.append(current_parent)
-        else:
-            current_parent["has_part"].append({"name": name, "same_as": urls_list})
-
-    for p in result:
-        if not p.get("has_part"):
-            p.pop("has_part", None)
-
-    return result
-
-
 def google_gtag_script(gtag_id: str) -> str:
     """
     Return a Google Analytics gtag.js snippet for the given Measurement ID.
@@ -88,6 +46,101 @@ def google_gtag_script(gtag_id: str) -> str:
 </script>"""
 
 
+@st.cache_resource
+def get_build_cache():
+    """
+    One BuildCache per server process, shared by all sessions (results are frozen).
+    """
+    return BuildCache(max_entries=256)
+
+
+def build_schema(page_type: str, builder, data: dict, cache: BuildCache | None = None):
+    """
+    Runs the builder for the current form. Times the form + input parsing
+    before it as "inputs" and the call itself as "build".
+    """
+    lap("inputs")
+    with timed("build"):
+        if cache is None:
+            return builder(data)
+        schema = cache.get_or_build(page_type, data, builder)
+    # multi-block results come back as a tuple of frozen blocks
+    return list(schema) if isinstance(schema, tuple) else schema
+
+
+def _open_preview_node(key: str, path: list):
+    st.session_state[f"{key}_path"] = path
+    st.session_state[f"{key}_page"] = 1
+
+
+def render_tree_preview(schema, key: str):
+    """
+    Collapsible, on-demand view of a large schema. Only the selected node is
+    rendered: its children are listed one page at a time, and containers can
+    be opened. The node itself is shown as JSON once it is small enough.
+    """
+    if not st.checkbox("Browse output as a tree", key=f"{key}_open"):
+        return
+
+    path = st.session_state.setdefault(f"{key}_path", [])
+    try:
+        node = resolve_path(schema, path)
+    except (KeyError, IndexError, TypeError):
+        path = st.session_state[f"{key}_path"] = []
+        node = schema
+
+    st.caption(" / ".join(["root"] + [str(step) for step in path]))
+    if path:
+        st.button("⬆ Up", key=f"{key}_up", on_click=_open_preview_node, args=(key, path[:-1]))
+
+    total = len(node) if isinstance(node, (dict, list, tuple)) else 0
+    offset = 0
+    if total > PREVIEW_PAGE_SIZE:
+        pages = -(-total // PREVIEW_PAGE_SIZE)
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{key}_page")
+        offset = (page - 1) * PREVIEW_PAGE_SIZE
+
+    rows, total = preview_rows(node, offset, PREVIEW_PAGE_SIZE)
+    for row in rows:
+        label = f"{row['key']}: {row['summary']}"
+        if row["is_container"]:
+            st.button(label, key=f"{key}_child_{row['key']}",
+                      on_click=_open_preview_node, args=(key, path + [row["key"]]))
+        else:
+            st.text(label)
+
+    if path and schema_stats(node)["bytes"] <= INLINE_PREVIEW_BYTES:
+        st.code(json.dumps(node, indent=2), language="json")
+
+
+def _clear_download(key: str):
+    st.session_state.pop(key, None)
+
+
+def deferred_download(label: str, build, file_name: str, mime: str, key: str, signature):
+    """
+    Download button whose payload is only built after "Prepare download" is
+    clicked. The prepared state is dropped once the file is downloaded or the
+    output changes (signature differs), so later reruns don't rebuild it.
+    """
+    if st.session_state.get(key) != signature:
+        if not st.button("Prepare download", key=f"{key}_prepare"):
+            return
+        st.session_state[key] = signature
+
+    with timed("serialize"):
+        data = build()
+    st.download_button(
+        label=label,
+        data=data,
+        file_name=file_name,
+        mime=mime,
+        key=f"{key}_button",
+        on_click=_clear_download,
+        args=(key,),
+    )
+
+
 # -----------------------------------
 # Sidebar Controls
 # -----------------------------------
@@ -103,6 +156,23 @@ page_type = st.sidebar.selectbox(
 )
 
 output_mode = st.sidebar.radio("Output Mode", ["JSON-LD", "Script Tag"])
+graph_output = st.sidebar.checkbox(
+    "Merge blocks into one @graph",
+    value=False,
+    help="One @context and one script tag; nodes repeated by @id are referenced instead of copied.",
+)
+
+st.sidebar.markdown("---")
+cache_enabled = st.sidebar.checkbox(
+    "Cache builder results",
+    value=False,
+    help="Reuse the built schema when the same inputs come up again (shared across sessions).",
+)
+perf_enabled = st.sidebar.checkbox("Show performance panel", value=False)
+build_cache = get_build_cache() if cache_enabled else None
+perf = PerfRecorder() if perf_enabled else None
+use_recorder(perf)
+
 st.title("Schema Generator (Streamlit)")
 
 # -----------------------------------
@@ -119,6 +189,7 @@ if recs:
         st.write(", ".join(recs.get("optional", [])))
 
 schema = {}  # will hold final schema object
+lap("setup")
 
 
 # -----------------------------------
@@ -324,12 +395,14 @@ if page_type == "Homepage":
                 "Format:\n"
                 "ParentName | wikiURL, wikidataURL\n"
                 "  - ChildName | wikiURL, wikidataURL\n"
+                "    - GrandChildName | wikiURL (indent further for deeper levels)\n"
                 "Example:\n"
                 "Furniture | https://en.wikipedia.org/wiki/Furniture, https://www.wikidata.org/wiki/Q14745\n"
                 "  - Bed | https://en.wikipedia.org/wiki/Bed, https://www.wikidata.org/wiki/Q1262753\n"
                 "  - Sofa | https://en.wikipedia.org/wiki/Couch, https://www.wikidata.org/wiki/Q215380"
             )
-            about_nested_lines = clean_list(st.text_area("About (parent + hasPart)"))
+            # Keep raw lines: indentation decides nesting depth
+            about_nested_lines = st.text_area("About (parent + hasPart)").splitlines()
             mentions_urls = clean_list(st.text_area("WebPage mentions URLs (one per line)"))
 
             main_entity_of_page = {
@@ -337,7 +410,7 @@ if page_type == "Homepage":
                 "url": meop_url,
                 "@id": meop_id,
                 "additionalType": add_types,
-                "about": parse_about_nested(about_nested_lines),
+                "about": list(iter_about_things(about_nested_lines)),
                 "mentions": [{"@type": "Thing", "name": u, "sameAs": u} for u in mentions_urls],
             }
         elif meop_mode == "String URL":
@@ -392,7 +465,7 @@ if page_type == "Homepage":
     }
 
     # homepage_schema now returns {} if required fields missing
-    schema = homepage_schema(data)
+    schema = build_schema(page_type, homepage_schema, data, build_cache)
 
 # -----------------------------------
 # LOCAL BUSINESS
@@ -570,7 +643,7 @@ elif page_type == "Local Business":
         "services": services
     }
 
-    schema = local_business_schema(data)
+    schema = build_schema(page_type, local_business_schema, data, build_cache)
 
 # -----------------------------------
 # SERVICE PAGE
@@ -629,7 +702,7 @@ elif page_type == "Service Page":
         "faqs": faqs
     }
 
-    schema = service_page_schema(data)
+    schema = build_schema(page_type, service_page_schema, data, build_cache)
 
 # -----------------------------------
 # COLLECTION / CATEGORY PAGE
@@ -689,7 +762,7 @@ elif page_type == "Collection / Category Page":
         "faqs": faqs
     }
 
-    schema = collection_schema(data)
+    schema = build_schema(page_type, collection_schema, data, build_cache)
 
 # -----------------------------------
 # PRODUCT PAGE
@@ -829,7 +902,7 @@ elif page_type == "Product Page":
         "mpn": mpn
     }
 
-    schema = product_schema(data)
+    schema = build_schema(page_type, product_schema, data, build_cache)
 
 
 # -----------------------------------
@@ -846,21 +919,46 @@ if gtag_enabled:
 # Output + Download
 # -----------------------------------
 st.markdown("## Output")
+stats = None
 
 if not schema and not (gtag_enabled and gtag_id):
     st.info("Fill in the required fields above to generate schema, or add a Google tag.")
 else:
+    if schema and graph_output:
+        with timed("graph merge"):
+            schema = merge_schema_graph(schema)
+
+    with timed("size + node count"):
+        stats = schema_stats(schema) if schema else None
+    large = stats is not None and stats["bytes"] > INLINE_PREVIEW_BYTES
+    signature = (page_type, output_mode, graph_output, stats and stats["bytes"], stats and stats["nodes"])
+
     if output_mode == "JSON-LD":
         # 1) JSON-LD schema (pure JSON)
-        json_str = json.dumps(schema, indent=2) if schema else "{}"
         st.markdown("### JSON-LD schema")
-        st.code(json_str, language="json")
-        st.download_button(
-            label="Download JSON-LD",
-            data=json_str,
-            file_name="schema.json",
-            mime="application/json",
-        )
+        if stats:
+            st.caption(f"{stats['bytes']:,} bytes · {stats['nodes']:,} nodes · depth {stats['depth']}")
+
+        if large:
+            render_tree_preview(schema, "json_preview")
+            deferred_download(
+                "Download JSON-LD",
+                lambda: json.dumps(schema, indent=2),
+                file_name="schema.json",
+                mime="application/json",
+                key="json_download",
+                signature=signature,
+            )
+        else:
+            with timed("serialize"):
+                json_str = json.dumps(schema, indent=2) if schema else "{}"
+            st.code(json_str, language="json")
+            st.download_button(
+                label="Download JSON-LD",
+                data=json_str,
+                file_name="schema.json",
+                mime="application/json",
+            )
 
         # 2) Optional: Google tag snippet (HTML)
         if gtag_enabled and gtag_id:
@@ -875,22 +973,59 @@ else:
             )
 
     else:  # Script Tag
-        html_blocks = []
+        def build_html() -> str:
+            html_blocks = []
+
+            with timed("serialize"):
+                if schema:
+                    if isinstance(schema, list):
+                        html_blocks.extend(to_script_tag(block) for block in schema)
+                    else:
+                        html_blocks.append(to_script_tag(schema))
+
+            if gtag_enabled and gtag_id:
+                html_blocks.append(google_gtag_script(gtag_id))
+
+            return "\n\n".join(html_blocks)
+
+        if large:
+            st.caption(f"{stats['bytes']:,} bytes of JSON-LD · {stats['nodes']:,} nodes · depth {stats['depth']}")
+            render_tree_preview(schema, "html_preview")
+            deferred_download(
+                "Download HTML snippet",
+                build_html,
+                file_name="schema-snippet.html",
+                mime="text/html",
+                key="html_download",
+                signature=signature,
+            )
+        else:
+            final_html = build_html()
+            st.code(final_html, language="html")
+            st.download_button(
+                label="Download HTML snippet",
+                data=final_html,
+                file_name="schema-snippet.html",
+                mime="text/html",
+            )
 
-        if schema:
-            if isinstance(schema, list):
-                html_blocks.extend(to_script_tag(block) for block in schema)
-            else:
-                html_blocks.append(to_script_tag(schema))
 
-        if gtag_enabled and gtag_id:
-            html_blocks.append(google_gtag_script(gtag_id))
-
-        final_html = "\n\n".join(html_blocks)
-        st.code(final_html, language="html")
-        st.download_button(
-            label="Download HTML snippet",
-            data=final_html,
-            file_name="schema-snippet.html",
-            mime="text/html",
-        )
\ No newline at end of file
+# -----------------------------------
+# Performance panel (optional)
+# -----------------------------------
+if perf is not None:
+    report = perf.report()
+    with st.sidebar.expander("⏱ Performance (this rerun)", expanded=True):
+        st.table([
+            {"phase": name, "ms": row["ms"], "calls": row["calls"]}
+            for name, row in report["spans"].items()
+        ])
+        st.caption("build includes clean; total covers the whole script run.")
+        st.write(f"Total: {report['total_ms']} ms")
+        if stats:
+            st.write(f"Output: {stats['bytes']:,} bytes · {stats['nodes']:,} nodes")
+        if build_cache is not None:
+            cache_stats = build_cache.stats()
+            st.write(f"Build cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                     f"({cache_stats['results']} results, {cache_stats['fragment_fragments']} shared fragments)")
+    use_recorder(None)
@@ -0,0 +1,295 @@
+"""
+Locale fan-out on top of the page builders.
+
+  for locale, schema in locale_fanout("Product Page", data, {
+      "de-DE": {"product_name": "Eichentisch", "breadcrumbs": [{"name": "Start"}, {"name": "Eichentisch"}]},
+      "fr-FR": {"product_name": "Table en chêne"},
+  }):
+      ...
+
+Only text changes between locales; IDs, prices, geo, hours and identifiers
+don't. So the builder runs ONCE, on a copy of the input whose translatable
+strings are replaced by placeholder tokens. Every place a token lands in
+the output is recorded. Each locale is then produced by copying only the
+containers along those paths and writing the locale's strings in; all
+other subtrees are shared with the skeleton (treat results as read-only).
+
+Overrides mirror the builder input: any string in a locale's override
+marks that input path as translatable; missing strings fall back to the
+base data. Creative-work nodes (WebPage, WebSite, FAQPage, ...) get
+inLanguage. A locale whose overrides don't fit the skeleton is built in
+full instead; the other locales still use the skeleton. Overrides don't
+fit when they add structure (more FAQs than the base has), hold a string
+the builder would strip, or touch a string the builder doesn't copy
+through as-is (URLs that become "@id"s, profile keys, varies_by names).
+"""
+
+import re
+
+from templates.page_templates import PAGE_BUILDERS
+
+
+# Node types that take inLanguage
+CREATIVE_WORK_TYPES = frozenset({
+    "WebPage", "WebSite", "FAQPage", "CollectionPage", "ItemPage",
+    "AboutPage", "ContactPage", "Article", "BlogPosting",
+})
+
+_TOKEN = re.compile(r"⟦LOC(\d+)⟧")
+_MISSING = object()
+
+
+def _token(i: int) -> str:
+    return f"⟦LOC{i}⟧"
+
+
+def _text_paths(override, path=()):
+    if isinstance(override, dict):
+        for k, v in override.items():
+            yield from _text_paths(v, path + (k,))
+    elif isinstance(override, list):
+        for i, v in enumerate(override):
+            yield from _text_paths(v, path + (i,))
+    elif isinstance(override, str):
+        yield path
+
+
+def _get(obj, path):
+    for step in path:
+        try:
+            obj = obj[step]
+        except (KeyError, IndexError, TypeError):
+            return _MISSING
+    return obj
+
+
+def _copy(obj):
+    return dict(obj) if isinstance(obj, dict) else list(obj)
+
+
+def _set_cow(root, path, value, copies: dict):
+    """
+    Sets root[path] = value, copying each container on the way exactly once
+    (copies is keyed by path prefix). root itself must already be a copy.
+    """
+    node = root
+    for depth in range(len(path) - 1):
+        prefix = path[: depth + 1]
+        child = copies.get(prefix)
+        if child is None:
+            child = copies[prefix] = _copy(node[path[depth]])
+            node[path[depth]] = child
+        node = child
+    node[path[-1]] = value
+
+
+# Overlay trie leaves
+_LANGUAGE = object()
+
+
+def _build_trie(slots, language_paths) -> dict:
+    """
+    Output paths -> nested {step: subtrie | leaf}. Text leaves are token indexes.
+    """
+    trie = {}
+    for path, leaf in list(slots) + [(p + ("inLanguage",), _LANGUAGE) for p in language_paths]:
+        node = trie
+        for step in path[:-1]:
+            node = node.setdefault(step, {})
+        node[path[-1]] = leaf
+    return trie
+
+
+def _overlay(node, trie: dict, values: list, locale: str):
+    """
+    Copy of node with the trie's leaves written in. Only containers on a
+    trie path are copied; everything else is shared.
+    """
+    out = _copy(node)
+    for step, sub in trie.items():
+        if sub is _LANGUAGE:
+            out[step] = locale
+        elif isinstance(sub, int):
+            out[step] = values[sub]
+        else:
+            out[step] = _overlay(node[step], sub, values, locale)
+    return out
+
+
+def merge_locale(data, override):
+    """
+    Full locale input: override strings laid over the base data (lists merged by index).
+    """
+    if isinstance(data, dict) and isinstance(override, dict):
+        return {**data, **{k: merge_locale(data.get(k), v) for k, v in override.items()}}
+    if isinstance(data, list) and isinstance(override, list):
+        merged = [merge_locale(d, o) for d, o in zip(data, override)]
+        return merged + data[len(override):] + override[len(data):]
+    return override
+
+
+def _substitutable(value) -> bool:
+    """
+    True when the builders pass the string through unchanged. Builders strip
+    some fields and treat "" as missing, so such values can't be written in
+    place of a token; they go through a full build instead.
+    """
+    return isinstance(value, str) and value != "" and value == value.strip()
+
+
+def _tokenize(data, paths):
+    """
+    Copy of data with a token at every path whose base value is substitutable.
+    Returns (tokenized, tokenized paths, base values); other paths are left
+    alone, and locales that override them are built in full.
+    """
+    tokenized = _copy(data)
+    copies = {}
+    kept, base_values = [], []
+    for path in paths:
+        value = _get(data, path)
+        if not _substitutable(value):
+            continue
+        _set_cow(tokenized, path, _token(len(kept)), copies)
+        kept.append(path)
+        base_values.append(value)
+    return tokenized, kept, base_values
+
+
+def _find_slots(node, path, slots: list, language_paths: list, embedded: set):
+    """
+    slots: (output path, token index) for every string that is exactly one token.
+    language_paths: paths of creative-work nodes.
+    embedded: indexes of tokens the builder changed or combined with other text.
+    """
+    if isinstance(node, dict):
+        node_type = node.get("@type")
+        types = node_type if isinstance(node_type, list) else [node_type]
+        if any(isinstance(t, str) and t in CREATIVE_WORK_TYPES for t in types):
+            language_paths.append(path)
+        for k, v in node.items():
+            _find_slots(v, path + (k,), slots, language_paths, embedded)
+    elif isinstance(node, (list, tuple)):
+        for i, v in enumerate(node):
+            _find_slots(v, path + (i,), slots, language_paths, embedded)
+    elif isinstance(node, str) and "⟦" in node:
+        whole = _TOKEN.fullmatch(node)
+        if whole:
+            slots.append((path, int(whole.group(1))))
+        else:
+            found = _TOKEN.findall(node)
+            embedded.update(int(i) for i in found)
+            if not found:
+                embedded.add(-1)  # a token the builder rewrote beyond recognition
+
+
+class LocaleSkeleton:
+    """
+    One builder run, reusable for any number of locales.
+
+    A path keeps its token slot only when every place the token lands in
+    the output is the token itself: the builder copied the string through
+    untouched. Tokens that were combined with other text (URLs turned into
+    "@id"s), rewritten or consumed (lookup keys, varies_by names) make the
+    path unsafe, and locales overriding it are built in full. The skeleton
+    with the base values written back must also equal a plain build of the
+    base data, or every locale is built in full.
+    """
+
+    def __init__(self, page_type: str, data: dict, paths):
+        self.builder = PAGE_BUILDERS[page_type]
+        self.data = data
+        self.full_builds = 0
+
+        self.paths = _tokenize(data, list(dict.fromkeys(paths)))[1]
+        self.schema, self.slots, self.language_paths = self._build_skeleton()
+        self._path_set = set(self.paths)
+        self.trie = _build_trie(self.slots, self.language_paths)
+
+    def _try_build(self, paths):
+        """
+        (schema, slots, language paths, unsafe paths) for data tokenized at
+        paths, or None if the builder rejects a token.
+        """
+        tokenized, kept, _ = _tokenize(self.data, paths)
+        try:
+            schema = self.builder(tokenized)
+        except Exception:
+            if not kept:
+                raise  # the base data itself doesn't build
+            return None
+        slots, language_paths, embedded = [], [], set()
+        _find_slots(schema, (), slots, language_paths, embedded)
+        landed = {i for _, i in slots}
+        unsafe = [p for i, p in enumerate(kept) if i in embedded or i not in landed]
+        if -1 in embedded:
+            unsafe = kept
+        return schema, slots, language_paths, unsafe
+
+    def _build_skeleton(self):
+        paths = self.paths
+        built = self._try_build(paths)
+        if built is None:
+            # a builder validates one of the strings (e.g. a profile key): keep the paths it accepts
+            paths = [p for p in paths if self._try_build([p]) is not None]
+            built = self._try_build(paths)
+        while built is not None and built[3]:
+            paths = [p for p in paths if p not in built[3]]
+            built = self._try_build(paths)
+        if built is None:
+            paths = []
+            built = self._try_build(paths)
+
+        schema, slots, language_paths, _ = built
+        self.paths = paths
+        self.base_values = [_get(self.data, p) for p in paths]
+        if paths:
+            trie = _build_trie(slots, [])
+            if _thawed(_apply(schema, trie, self.base_values, None)) != _thawed(self.builder(self.data)):
+                # the builder's output depends on the strings beyond copying them
+                self.paths, self.base_values = [], []
+                schema, slots, language_paths, _ = self._try_build([])
+        return schema, slots, language_paths
+
+    def render(self, locale: str, override: dict | None = None):
+        override = override or {}
+        values = []
+        for path, base in zip(self.paths, self.base_values):
+            value = _get(override, path)
+            values.append(value if isinstance(value, str) else base)
+
+        fits = all(p in self._path_set and _substitutable(_get(override, p)) for p in _text_paths(override))
+        if not fits:
+            # structure differs from the skeleton: build this locale in full
+            self.full_builds += 1
+            schema = self.builder(merge_locale(self.data, override))
+            slots, language_paths = [], []
+            _find_slots(schema, (), slots, language_paths, set())
+            return _apply(schema, _build_trie([], language_paths), [], locale)
+
+        return _apply(self.schema, self.trie, values, locale)
+
+
+def _thawed(schema):
+    if isinstance(schema, dict):
+        return {k: _thawed(v) for k, v in schema.items()}
+    if isinstance(schema, (list, tuple)):
+        return [_thawed(v) for v in schema]
+    return schema
+
+
+def _apply(schema, trie: dict, values: list, locale: str):
+    if not isinstance(schema, (dict, list, tuple)) or not schema:
+        return schema
+    return _overlay(schema, trie, values, locale)
+
+
+def locale_fanout(page_type: str, data: dict, locales: dict):
+    """
+    Yields (locale, schema) for every locale in `locales` ({locale: override}).
+    The builder runs once for all locales that fit the base structure.
+    """
+    paths = [p for override in locales.values() for p in _text_paths(override or {})]
+    skeleton = LocaleSkeleton(page_type, data, paths)
+    for locale, override in locales.items():
+        yield locale, skeleton.render(locale, override)
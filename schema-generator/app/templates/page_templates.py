@@ -1,6 +1,11 @@
 from utils.schema_helpers import to_script_tag
+from utils.interning import pooled
+from utils.perf import active_recorder, timed
 
+import functools
+import itertools
 import re
+import warnings
 
 
 def _clean_schema(obj):
@@ -10,17 +15,26 @@ def _clean_schema(obj):
     - ""
     - []
     - {}
+    Time spent here is reported to the active perf recorder as "clean";
+    with no recorder (batch runs) this is a plain _clean_value() call.
     """
+    if active_recorder() is None:
+        return _clean_value(obj)
+    with timed("clean"):
+        return _clean_value(obj)
+
+
+def _clean_value(obj):
     if isinstance(obj, dict):
         cleaned = {}
         for k, v in obj.items():
-            v_clean = _clean_schema(v)
+            v_clean = _clean_value(v)
             if v_clean in (None, "", [], {}):
                 continue
             cleaned[k] = v_clean
         return cleaned
     elif isinstance(obj, list):
-        cleaned_list = [_clean_schema(v) for v in obj]
+        cleaned_list = [_clean_value(v) for v in obj]
         cleaned_list = [v for v in cleaned_list if v not in (None, "", [], {})]
         return cleaned_list
     else:
@@ -140,6 +154,10 @@ def _build_founders(founders_in, works_for_id: str | None):
     return founders
 
 
+def _is_schema_thing(t: dict) -> bool:
+    return "@type" in t and not any(k in t for k in ("type", "same_as", "has_part"))
+
+
 # ✅ NEW: build nested about = Thing + sameAs[] + hasPart[]
 def _build_about_nested(about_in):
     """
@@ -149,13 +167,13 @@ def _build_about_nested(about_in):
           "name": "Furniture",
           "same_as": ["wiki", "wikidata"],
           "has_part": [
-            {"name":"Bed","same_as":["wiki","wikidata"]},
+            {"name":"Bed","same_as":["wiki","wikidata"],"has_part":[...]},
             ...
           ]
         }
       ]
 
-    Returns schema-ready:
+    Returns schema-ready (hasPart is followed to any depth):
       about: [
         {
           "@type":"Thing",
@@ -164,29 +182,27 @@ def _build_about_nested(about_in):
           "hasPart":[{"@type":"Thing","name":"Bed","sameAs":[...]}]
         }
       ]
+
+    Entries that are already schema-ready (e.g. from
+    utils.about_tree.iter_about_things) are used as they are, subtree and all.
     """
-    about_in = about_in or []
     about_list = []
 
-    for t in about_in:
-        parent = {
+    for t in (about_in or []):
+        if _is_schema_thing(t):
+            about_list.append(t)
+            continue
+        thing = {
             "@type": t.get("@type") or t.get("type") or "Thing",
             "name": t.get("name"),
             "sameAs": t.get("same_as") if t.get("same_as") is not None else t.get("sameAs", []),
         }
 
-        parts = []
-        for p in (t.get("has_part") or t.get("hasPart") or []):
-            parts.append({
-                "@type": p.get("@type") or p.get("type") or "Thing",
-                "name": p.get("name"),
-                "sameAs": p.get("same_as") if p.get("same_as") is not None else p.get("sameAs", []),
-            })
-
+        parts = _build_about_nested(t.get("has_part") or t.get("hasPart"))
         if parts:
-            parent["hasPart"] = parts
+            thing["hasPart"] = parts
 
-        about_list.append(parent)
+        about_list.append(thing)
 
     return about_list
 
@@ -628,33 +644,10 @@ def service_page_schema(data: dict):
     ]
 
     if data.get("breadcrumb_enabled"):
-        graph.append({
-            "@type": "BreadcrumbList",
-            "@id": f"{url}/#breadcrumb" if url else None,
-            "itemListElement": [
-                {
-                    "@type": "ListItem",
-                    "position": i + 1,
-                    "name": b["name"],
-                    "item": b["url"]
-                }
-                for i, b in enumerate(data.get("breadcrumbs", []))
-            ]
-        })
+        graph.append(_build_breadcrumb_list(data.get("breadcrumbs", []), f"{url}/#breadcrumb" if url else None))
 
     if data.get("faq_enabled"):
-        graph.append({
-            "@type": "FAQPage",
-            "@id": f"{url}/#faq" if url else None,
-            "mainEntity": [
-                {
-                    "@type": "Question",
-                    "name": f["question"],
-                    "acceptedAnswer": {"@type": "Answer", "text": f["answer"]}
-                }
-                for f in data.get("faqs", [])
-            ]
-        })
+        graph.append(_build_faq_node(data.get("faqs", []), f"{url}/#faq" if url else None))
 
     return _clean_schema({
         "@context": "https://schema.org",
@@ -665,41 +658,77 @@ def service_page_schema(data: dict):
 # -------------------------
 # Collection / Category Schema
 # -------------------------
+def _build_collection_list_item(p: dict, position: int, default_currency: str | None):
+    product_obj = {
+        "@type": "Product",
+        "name": p.get("name"),
+        "url": p.get("url"),
+        "image": p.get("image"),
+    }
+    if p.get("price"):
+        product_obj["offers"] = {
+            "@type": "Offer",
+            "url": p.get("url"),
+            "price": p.get("price"),
+            "priceCurrency": pooled(p.get("currency") or default_currency or "USD"),
+            "availability": pooled(p.get("availability") or "https://schema.org/InStock")
+        }
+
+    return {
+        "@type": "ListItem",
+        "position": position,
+        "url": p.get("url"),
+        "item": product_obj
+    }
+
+
+def _build_breadcrumb_list(breadcrumbs, breadcrumb_id: str | None):
+    return {
+        "@type": "BreadcrumbList",
+        "@id": breadcrumb_id,
+        "itemListElement": [
+            {
+                "@type": "ListItem",
+                "position": i + 1,
+                "name": b["name"],
+                "item": b["url"]
+            }
+            for i, b in enumerate(breadcrumbs or [])
+        ]
+    }
+
+
+def _build_faq_node(faqs, faq_id: str | None):
+    return {
+        "@type": "FAQPage",
+        "@id": faq_id,
+        "mainEntity": [
+            {
+                "@type": "Question",
+                "name": f["question"],
+                "acceptedAnswer": {"@type": "Answer", "text": f["answer"]}
+            }
+            for f in (faqs or [])
+        ]
+    }
+
+
 def collection_schema(data: dict):
     url = (data.get("url") or "").rstrip("/")
     page_id = f"{url}/#collectionpage" if url else None
     itemlist_id = f"{url}/#itemlist" if url else None
 
     products = data.get("products", [])
+    default_currency = data.get("default_currency")
     item_list = {
         "@type": "ItemList",
         "@id": itemlist_id,
-        "itemListElement": []
+        "itemListElement": [
+            _build_collection_list_item(p, i + 1, default_currency)
+            for i, p in enumerate(products)
+        ]
     }
 
-    for i, p in enumerate(products):
-        product_obj = {
-            "@type": "Product",
-            "name": p.get("name"),
-            "url": p.get("url"),
-            "image": p.get("image"),
-        }
-        if p.get("price"):
-            product_obj["offers"] = {
-                "@type": "Offer",
-                "url": p.get("url"),
-                "price": p.get("price"),
-                "priceCurrency": p.get("currency") or data.get("default_currency") or "USD",
-                "availability": p.get("availability") or "https://schema.org/InStock"
-            }
-
-        item_list["itemListElement"].append({
-            "@type": "ListItem",
-            "position": i + 1,
-            "url": p.get("url"),
-            "item": product_obj
-        })
-
     graph = [
         {
             "@type": "CollectionPage",
@@ -713,33 +742,10 @@ def collection_schema(data: dict):
     ]
 
     if data.get("breadcrumb_enabled"):
-        graph.append({
-            "@type": "BreadcrumbList",
-            "@id": f"{url}/#breadcrumb" if url else None,
-            "itemListElement": [
-                {
-                    "@type": "ListItem",
-                    "position": i + 1,
-                    "name": b["name"],
-                    "item": b["url"]
-                }
-                for i, b in enumerate(data.get("breadcrumbs", []))
-            ]
-        })
+        graph.append(_build_breadcrumb_list(data.get("breadcrumbs", []), f"{url}/#breadcrumb" if url else None))
 
     if data.get("faq_enabled"):
-        graph.append({
-            "@type": "FAQPage",
-            "@id": f"{url}/#faq" if url else None,
-            "mainEntity": [
-                {
-                    "@type": "Question",
-                    "name": f["question"],
-                    "acceptedAnswer": {"@type": "Answer", "text": f["answer"]}
-                }
-                for f in data.get("faqs", [])
-            ]
-        })
+        graph.append(_build_faq_node(data.get("faqs", []), f"{url}/#faq" if url else None))
 
     return _clean_schema({
         "@context": "https://schema.org",
@@ -747,6 +753,108 @@ def collection_schema(data: dict):
     })
 
 
+def _page_fragment_id(page_url: str, fragment: str) -> str | None:
+    """
+    "https://x.com/shoes"         -> "https://x.com/shoes/#itemlist"  (same as collection_schema)
+    "https://x.com/shoes?page=2"  -> "https://x.com/shoes?page=2#itemlist"
+    """
+    if not page_url:
+        return None
+    if "?" in page_url:
+        return f"{page_url}#{fragment}"
+    return f"{page_url.rstrip('/')}/#{fragment}"
+
+
+def _normalize_page_url(url: str | None) -> str:
+    """
+    "https://x.com/shoes/ " -> "https://x.com/shoes"; URLs with a query are left as they are.
+    """
+    url = (url or "").strip()
+    return url if "?" in url else url.rstrip("/")
+
+
+def collection_pages(data: dict, products=None, page_size: int = 100, url_pattern: str | None = None):
+    """
+    Paginated collection_schema(): yields one CollectionPage + ItemList document per page.
+
+    products:    any iterable (defaults to data["products"]); consumed lazily,
+                 page_size items at a time.
+    url_pattern: e.g. "https://x.com/shoes?page={page}". Page 1 uses data["url"]
+                 when set, so it keeps the canonical @ids of collection_schema().
+                 Every page URL goes through _normalize_page_url(), so page 1
+                 and pages 2+ agree on trailing slashes.
+
+    - ListItem positions are global (page 2 starts at page_size + 1)
+    - Pages 2+ point back to page 1 with isPartOf
+    - BreadcrumbList is repeated on every page, FAQPage only on page 1
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be >= 1")
+
+    base_url = _normalize_page_url(data.get("url"))
+    products = iter(data.get("products", []) if products is None else products)
+    default_currency = data.get("default_currency")
+    first_page_id = None
+
+    page = 1
+    while True:
+        chunk = list(itertools.islice(products, page_size))
+        if not chunk and page > 1:
+            return
+
+        if page == 1 and base_url:
+            page_url = base_url
+        elif url_pattern:
+            page_url = _normalize_page_url(url_pattern.format(page=page))
+        else:
+            raise ValueError("url_pattern is required for pages after the first")
+
+        page_id = _page_fragment_id(page_url, "collectionpage")
+        itemlist_id = _page_fragment_id(page_url, "itemlist")
+        offset = (page - 1) * page_size
+
+        collection_page = {
+            "@type": "CollectionPage",
+            "@id": page_id,
+            "url": page_url,
+            "name": data.get("name"),
+            "description": data.get("description"),
+            "mainEntity": {"@id": itemlist_id},
+        }
+        if page == 1:
+            first_page_id = page_id
+        else:
+            collection_page["isPartOf"] = {"@id": first_page_id}
+
+        graph = [
+            collection_page,
+            {
+                "@type": "ItemList",
+                "@id": itemlist_id,
+                "numberOfItems": len(chunk),
+                "itemListElement": [
+                    _build_collection_list_item(p, offset + i + 1, default_currency)
+                    for i, p in enumerate(chunk)
+                ],
+            },
+        ]
+
+        if data.get("breadcrumb_enabled"):
+            graph.append(_build_breadcrumb_list(data.get("breadcrumbs", []), _page_fragment_id(page_url, "breadcrumb")))
+
+        if page == 1 and data.get("faq_enabled"):
+            graph.append(_build_faq_node(data.get("faqs", []), _page_fragment_id(page_url, "faq")))
+
+        yield _clean_schema({
+            "@context": "https://schema.org",
+            "@graph": graph
+        })
+
+        if len(chunk) < page_size:
+            return
+        page += 1
+
+
 # -------------------------
 # Local Business Schema
 # -------------------------
@@ -847,7 +955,9 @@ def local_business_schema(data: dict):
     else:
         entity = base
 
-    # Local-business-only extras that homepage_schema doesn't handle:
+    # Local-business-only extras that homepage_schema doesn't handle.
+    # Collected separately so the homepage_schema() result is never mutated.
+    extras = {}
     if data.get("rating_enabled"):
         rating_cfg = {
             "rating_value": data.get("rating_value"),
@@ -855,7 +965,7 @@ def local_business_schema(data: dict):
         }
         rating = _build_aggregate_rating(rating_cfg)
         if rating:
-            entity["aggregateRating"] = _clean_schema(rating)
+            extras["aggregateRating"] = _clean_schema(rating)
 
     if data.get("founder_enabled") and data.get("founder_name"):
         founders = _build_founders(
@@ -867,30 +977,299 @@ def local_business_schema(data: dict):
             works_for_id=entity.get("@id")
         )
         if founders:
-            entity["founder"] = founders[0] if len(founders) == 1 else founders
+            extras["founder"] = founders[0] if len(founders) == 1 else founders
 
-    return _clean_schema(entity)
+    return _clean_schema({**entity, **extras})
+
+
+# -------------------------
+# Multi-location Local Business fan-out
+# -------------------------
+# Properties that differ per store; everything else on the template entity
+# is shared by every location.
+_LOCATION_KEYS = {
+    "@context", "@type", "@id", "url", "name", "telephone", "address", "geo",
+    "openingHoursSpecification", "hasMap", "aggregateRating", "founder",
+}
+
+
+def _parse_hours(hours_in):
+    """
+    Accepts:
+      - list of {dayOfWeek, opens, closes}
+      - str: "Monday | 09:00 | 17:00; Tuesday | 09:00 | 17:00"  (CSV cell)
+    """
+    if isinstance(hours_in, list):
+        rows = hours_in
+    else:
+        rows = []
+        for chunk in (hours_in or "").split(";"):
+            parts = [p.strip() for p in chunk.split("|")]
+            if len(parts) == 3:
+                rows.append({"dayOfWeek": parts[0], "opens": parts[1], "closes": parts[2]})
+
+    return [
+        {
+            "@type": "OpeningHoursSpecification",
+            "dayOfWeek": h.get("dayOfWeek"),
+            "opens": h.get("opens"),
+            "closes": h.get("closes"),
+        }
+        for h in rows
+    ]
+
+
+def local_business_fanout_base(template: dict):
+    """
+    Build everything shared by all locations ONCE.
+
+    template: same shape as local_business_schema() input, describing the brand
+    (name, url, logo, sameAs, catalog, founder, ...).
+
+    Returns:
+      {
+        "parent": Organization entity (emitted once, referenced by @id),
+        "shared": shared LocalBusiness properties (read-only, reused by every location),
+        "business_type": default @type for locations,
+        "org_url": "...",
+        "org_name": "...",
+      }
+    Returns {} if the template has no url/name.
+    """
+    template = template or {}
+    org_url = (template.get("url") or "").strip()
+    org_name = (template.get("name") or "").strip()
+    if not org_url or not org_name:
+        return {}
+
+    parent_id = org_url.rstrip("/") + "#organization"
+
+    parent = homepage_schema({
+        "business_type": template.get("organization_type") or "Organization",
+        "site_url": org_url,
+        "name": org_name,
+        "org_name": template.get("legal_name"),
+        "logo": template.get("logo"),
+        "same_as": template.get("same_as", []) if template.get("sameas_enabled") else [],
+    })
+    parent["@id"] = parent_id
+
+    if template.get("founder_enabled") and template.get("founder_name"):
+        founders = _build_founders(
+            [{
+                "name": template.get("founder_name"),
+                "job_title": template.get("founder_job_title"),
+                "same_as": template.get("founder_same_as", []),
+            }],
+            works_for_id=parent_id
+        )
+        parent["founder"] = founders[0] if len(founders) == 1 else founders
+
+    # Location-specific toggles are filled per row, not from the template
+    template_entity = local_business_schema({
+        **template,
+        "rating_enabled": False,
+        "founder_enabled": False,
+        "hours_enabled": False,
+        "map_enabled": False,
+    })
+    shared = {k: v for k, v in template_entity.items() if k not in _LOCATION_KEYS}
+
+    return {
+        "parent": _clean_schema(parent),
+        "shared": shared,
+        "business_type": (template.get("business_type") or "LocalBusiness").strip(),
+        "org_url": org_url,
+        "org_name": org_name,
+    }
+
+
+_ADDRESS_FIELDS = ("street", "city", "state", "zip", "country")
+
+
+def location_entity_id(base: dict, location: dict) -> str:
+    """
+    @id of one location. A location with its own url gets "<url>#entity";
+    locations on the organization's url are told apart by their id column
+    or, without one, by their full street address.
+    """
+    loc_url = (location.get("url") or "").strip() or base["org_url"]
+    if loc_url.rstrip("/") != base["org_url"].rstrip("/"):
+        return loc_url.rstrip("/") + "#entity"
+
+    if location.get("id"):
+        loc_key = _slugify_type(str(location["id"]))
+    elif location.get("street"):
+        address = " ".join(str(location.get(k) or "") for k in _ADDRESS_FIELDS)
+        loc_key = re.sub(r"[^a-z0-9]+", "-", address.lower()).strip("-")
+    else:
+        raise ValueError(f"Location {location.get('name') or location!r} shares the organization url; it needs an id or a street address")
+    return f"{base['org_url'].rstrip('/')}#location-{loc_key}"
+
+
+def unique_locations(base: dict, locations):
+    """
+    Passes locations through, raising ValueError when two of them get the same @id.
+    """
+    seen = set()
+    for location in locations:
+        entity_id = location_entity_id(base, location)
+        if entity_id in seen:
+            raise ValueError(f"Duplicate location @id {entity_id}; give each location a distinct id column")
+        seen.add(entity_id)
+        yield location
+
+
+def local_business_location_schema(base: dict, location: dict):
+    """
+    One store location on top of local_business_fanout_base().
+
+    location: {id, url, name, business_type, telephone,
+               street, city, state, zip, country, lat, lng,
+               opening_hours, map_url, rating_value, review_count}
+
+    Only the per-location properties are built here; shared subtrees are
+    referenced from base["shared"], not copied.
+    """
+    if not base:
+        return {}
+
+    loc_url = (location.get("url") or "").strip() or base["org_url"]
+
+    entity = {
+        "@context": "https://schema.org",
+        "@type": (location.get("business_type") or base["business_type"]).strip(),
+        "@id": location_entity_id(base, location),
+        "url": loc_url,
+        "name": location.get("name") or base["org_name"],
+    }
+    entity.update(base["shared"])
+
+    own = {
+        "telephone": location.get("telephone"),
+        "address": {
+            "@type": "PostalAddress",
+            "streetAddress": location.get("street"),
+            "addressLocality": location.get("city"),
+            "addressRegion": location.get("state"),
+            "postalCode": location.get("zip"),
+            "addressCountry": location.get("country"),
+        } if location.get("street") else None,
+        "geo": {
+            "@type": "GeoCoordinates",
+            "latitude": location.get("lat"),
+            "longitude": location.get("lng"),
+        } if location.get("lat") and location.get("lng") else None,
+        "openingHoursSpecification": _parse_hours(location.get("opening_hours")),
+        "hasMap": _build_has_map(location.get("map_url")),
+        "aggregateRating": _build_aggregate_rating({
+            "rating_value": location.get("rating_value"),
+            "review_count": location.get("review_count"),
+        }) if location.get("rating_value") else None,
+        "parentOrganization": {"@id": base["parent"]["@id"]},
+    }
+    entity.update(_clean_schema(own))
+    return entity
+
+
+def local_business_fanout(template: dict, locations):
+    """
+    Yields the parent Organization first, then one LocalBusiness per location.
+    locations can be any iterable (e.g. rows streamed from a CSV). Raises
+    ValueError when two locations would share an @id.
+    """
+    base = local_business_fanout_base(template)
+    if not base:
+        return
+    yield base["parent"]
+    for location in unique_locations(base, locations):
+        yield local_business_location_schema(base, location)
 
 
 # -------------------------
 # Product Schema
 # -------------------------
+def _build_shipping_details(data: dict):
+    return {
+        "@type": "OfferShippingDetails",
+        "shippingDestination": {
+            "@type": "DefinedRegion",
+            "addressCountry": pooled(data.get("shipping_country"))
+        },
+        "deliveryTime": {
+            "@type": "ShippingDeliveryTime",
+            "handlingTime": {
+                "@type": "QuantitativeValue",
+                "minValue": data.get("handling_min_days"),
+                "maxValue": data.get("handling_max_days"),
+                "unitCode": "d"
+            },
+            "transitTime": {
+                "@type": "QuantitativeValue",
+                "minValue": data.get("transit_min_days"),
+                "maxValue": data.get("transit_max_days"),
+                "unitCode": "d"
+            }
+        }
+    }
+
+
+def _build_return_policy(data: dict):
+    return {
+        "@type": "MerchantReturnPolicy",
+        "returnPolicyCategory": pooled(data.get("return_policy_category")),
+        "merchantReturnDays": data.get("return_days"),
+        "returnMethod": pooled(data.get("return_method")),
+        "returnFees": pooled(data.get("return_fees"))
+    }
+
+
 def product_schema(data: dict):
+    # The Offer is completed before it is attached, so nothing mutates the
+    # output tree after it has been assembled.
+    # "shipping_profile" / "return_policy_profile" (see organization_policies_schema)
+    # replace the inline shipping / return blocks with {"@id"} references.
+    offer = {
+        "@type": "Offer",
+        "url": data.get("url"),
+        "priceCurrency": pooled(data.get("currency")),
+        "price": data.get("price"),
+        "availability": pooled(data.get("availability"))
+    }
+
+    if data.get("item_condition"):
+        offer["itemCondition"] = pooled(data.get("item_condition"))
+
+    if data.get("price_valid_until"):
+        offer["priceValidUntil"] = data.get("price_valid_until")
+
+    if data.get("seller_enabled"):
+        offer["seller"] = {
+            "@type": "Organization",
+            "name": pooled(data.get("seller_name")),
+            "url": pooled(data.get("seller_url"))
+        }
+
+    shipping_ref, return_ref = _policy_refs(data)
+    if shipping_ref:
+        offer["shippingDetails"] = shipping_ref
+    elif data.get("shipping_enabled"):
+        offer["shippingDetails"] = _build_shipping_details(data)
+
+    if return_ref:
+        offer["hasMerchantReturnPolicy"] = return_ref
+    elif data.get("return_policy_enabled"):
+        offer["hasMerchantReturnPolicy"] = _build_return_policy(data)
+
     schema = {
         "@context": "https://schema.org",
         "@type": "Product",
         "name": data.get("product_name"),
         "description": data.get("product_description"),
         "sku": data.get("sku"),
-        "brand": {"@type": "Brand", "name": data.get("brand")},
+        "brand": {"@type": "Brand", "name": pooled(data.get("brand"))},
         "image": data.get("product_images", []),
-        "offers": {
-            "@type": "Offer",
-            "url": data.get("url"),
-            "priceCurrency": data.get("currency"),
-            "price": data.get("price"),
-            "availability": data.get("availability")
-        }
+        "offers": offer
     }
 
     if data.get("main_entity_enabled"):
@@ -901,8 +1280,8 @@ def product_schema(data: dict):
             "description": data.get("page_description") or data.get("product_description"),
             "isPartOf": {
                 "@type": "WebSite",
-                "url": data.get("site_url"),
-                "name": data.get("site_name")
+                "url": pooled(data.get("site_url")),
+                "name": pooled(data.get("site_name"))
             }
         }
 
@@ -919,54 +1298,6 @@ def product_schema(data: dict):
             "bestRating": data.get("product_best_rating") or "5"
         }
 
-    offer = schema["offers"]
-
-    if data.get("item_condition"):
-        offer["itemCondition"] = data.get("item_condition")
-
-    if data.get("price_valid_until"):
-        offer["priceValidUntil"] = data.get("price_valid_until")
-
-    if data.get("seller_enabled"):
-        offer["seller"] = {
-            "@type": "Organization",
-            "name": data.get("seller_name"),
-            "url": data.get("seller_url")
-        }
-
-    if data.get("shipping_enabled"):
-        offer["shippingDetails"] = {
-            "@type": "OfferShippingDetails",
-            "shippingDestination": {
-                "@type": "DefinedRegion",
-                "addressCountry": data.get("shipping_country")
-            },
-            "deliveryTime": {
-                "@type": "ShippingDeliveryTime",
-                "handlingTime": {
-                    "@type": "QuantitativeValue",
-                    "minValue": data.get("handling_min_days"),
-                    "maxValue": data.get("handling_max_days"),
-                    "unitCode": "d"
-                },
-                "transitTime": {
-                    "@type": "QuantitativeValue",
-                    "minValue": data.get("transit_min_days"),
-                    "maxValue": data.get("transit_max_days"),
-                    "unitCode": "d"
-                }
-            }
-        }
-
-    if data.get("return_policy_enabled"):
-        offer["hasMerchantReturnPolicy"] = {
-            "@type": "MerchantReturnPolicy",
-            "returnPolicyCategory": data.get("return_policy_category"),
-            "merchantReturnDays": data.get("return_days"),
-            "returnMethod": data.get("return_method"),
-            "returnFees": data.get("return_fees")
-        }
-
     if data.get("breadcrumb_enabled"):
         schema["breadcrumb"] = {
             "@type": "BreadcrumbList",
@@ -978,20 +1309,482 @@ def product_schema(data: dict):
 
     return _clean_schema(schema)
 
-def render_schema_blocks(schema) -> str:
+
+# -------------------------
+# Organization-level shipping / return policies
+# -------------------------
+def _profile_slug(name) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(name or "").strip().lower()).strip("-")
+
+
+def policy_profile_id(org_url: str, kind: str, name) -> str:
+    """
+    ("https://x.com/", "shipping", "Express 2-Day") -> "https://x.com/#shipping-express-2-day"
+    ("https://x.com", "return-policy", "default")   -> "https://x.com/#return-policy-default"
+    """
+    return f"{org_url.rstrip('/')}/#{kind}-{_profile_slug(name)}"
+
+
+# organization_policies_schema() input key -> @id kind
+_POLICY_KINDS = {"shipping_profiles": "shipping", "return_policies": "return-policy"}
+
+
+@functools.lru_cache(maxsize=64)
+def _profile_table(org_url: str | None, names: tuple) -> dict:
+    if not org_url:
+        raise ValueError("Organization policies need org_url (the profile @ids are built from it)")
+    table = {}
+    for key, kind in _POLICY_KINDS.items():
+        ids = table[kind] = {}
+        owners = {}  # slug -> profile name
+        for name in dict(names)[key]:
+            slug = _profile_slug(name)
+            if not slug:
+                raise ValueError(f"{key}: profile name {name!r} has no letters or digits")
+            if slug in owners:
+                raise ValueError(f"{key}: profile names {owners[slug]!r} and {name!r} share the @id "
+                                 f"{policy_profile_id(org_url, kind, name)}")
+            owners[slug] = name
+            ids[name] = ids[slug] = policy_profile_id(org_url, kind, name)
+    return table
+
+
+def policy_profile_table(org: dict) -> dict:
+    """
+    Named-profile lookup table for organization_policies_schema() data:
+      {"shipping": {"standard": "https://x.com/#shipping-standard", ...},
+       "return-policy": {"default": "https://x.com/#return-policy-default"}}
+    Profiles are found by name or slug. Raises ValueError when org_url is
+    missing or two names map to the same @id. Cached per org_url + names.
+    """
+    names = tuple((key, tuple(org.get(key) or ())) for key in _POLICY_KINDS)
+    return _profile_table(org.get("org_url"), names)
+
+
+def _policy_refs(data: dict):
+    """
+    {"@id"} references for data["shipping_profile"] / data["return_policy_profile"],
+    or None when unset. Names are looked up in data["policy_profiles"] (the
+    organization_policies_schema() data, e.g. {"$include": "shared/policies.json"}).
+    """
+    wanted = (("shipping", data.get("shipping_profile")), ("return-policy", data.get("return_policy_profile")))
+    if not any(name for _, name in wanted):
+        return None, None
+    org = data.get("policy_profiles")
+    if not org:
+        raise ValueError("shipping_profile / return_policy_profile need policy_profiles (the organization policies data)")
+    table = policy_profile_table(org)
+
+    refs = []
+    for kind, name in wanted:
+        if not name:
+            refs.append(None)
+            continue
+        profile_id = table[kind].get(name) or table[kind].get(_profile_slug(name))
+        if profile_id is None:
+            raise ValueError(f"Unknown {kind} profile {name!r} (known: {', '.join(sorted(table[kind]))})")
+        refs.append({"@id": profile_id})
+    return tuple(refs)
+
+
+def organization_policies_schema(data: dict):
+    """
+    Shipping and return policies defined once for the whole catalog, as
+    @id nodes on the Organization (hasShippingService / hasMerchantReturnPolicy).
+    Products then carry only {"@id"} references:
+      product data: {"shipping_profile": "express", "return_policy_profile": "default",
+                     "policy_profiles": <this data>}   (see policy_profile_table)
+
+    data:
+      {"org_url": "https://x.com/", "org_name": "X",
+       "shipping_profiles": {             # profile name -> product_schema() shipping fields
+         "standard": {"shipping_country": "US", "handling_min_days": "1", "handling_max_days": "2",
+                      "transit_min_days": "3", "transit_max_days": "7"},
+         "express": {...}},
+       "return_policies": {               # profile name -> product_schema() return fields
+         "default": {"return_policy_category": "...", "return_days": "30",
+                     "return_method": "...", "return_fees": "..."}}}
+    """
+    table = policy_profile_table(data)  # raises on a missing org_url / clashing names
+    org_url = data["org_url"]
+    shipping_nodes = [
+        {"@type": "OfferShippingDetails", "@id": table["shipping"][name], "name": name,
+         **_build_shipping_details(fields)}
+        for name, fields in (data.get("shipping_profiles") or {}).items()
+    ]
+    return_nodes = [
+        {"@type": "MerchantReturnPolicy", "@id": table["return-policy"][name], "name": name,
+         **_build_return_policy(fields)}
+        for name, fields in (data.get("return_policies") or {}).items()
+    ]
+
+    organization = {
+        "@type": "Organization",
+        "@id": f"{org_url.rstrip('/')}/#organization",
+        "name": pooled(data.get("org_name")),
+        "url": pooled(org_url),
+        "hasShippingService": [{"@id": node["@id"]} for node in shipping_nodes],
+        "hasMerchantReturnPolicy": [{"@id": node["@id"]} for node in return_nodes],
+    }
+    return _clean_schema({
+        "@context": "https://schema.org",
+        "@graph": [organization, *shipping_nodes, *return_nodes],
+    })
+
+
+# -------------------------
+# Product Group (variants)
+# -------------------------
+# varies_by name -> schema.org property URL; the variant carries the property itself
+VARIES_BY = {
+    "size": "https://schema.org/size",
+    "color": "https://schema.org/color",
+    "material": "https://schema.org/material",
+    "pattern": "https://schema.org/pattern",
+    "suggestedAge": "https://schema.org/suggestedAge",
+    "suggestedGender": "https://schema.org/suggestedGender",
+}
+
+_EMPTY = (None, "", [], {})
+
+# Fields read from the group only (never per variant)
+GROUP_FIELDS = (
+    "group_url", "group_images", "product_name", "product_description", "brand", "item_condition", "varies_by",
+    "seller_enabled", "seller_name", "seller_url",
+    "shipping_enabled", "shipping_country", "handling_min_days", "handling_max_days",
+    "transit_min_days", "transit_max_days", "shipping_profile",
+    "return_policy_enabled", "return_policy_category", "return_days", "return_method", "return_fees",
+    "return_policy_profile",
+    "product_rating_enabled", "product_rating_value", "product_review_count", "product_best_rating",
+)
+
+
+def _parse_varies_by(varies_by_in):
+    """
+    ["color", "size"] or "color, size" (feed column) -> known names, in order
+    """
+    if isinstance(varies_by_in, str):
+        varies_by_in = re.split(r"[,|]", varies_by_in)
+    return [v.strip() for v in varies_by_in or [] if v and v.strip() in VARIES_BY]
+
+
+def _build_variant(v: dict, varies_by: list, offer_base: dict, group_name: str | None, group_url: str | None):
+    """
+    Minimal variant Product. offer_base holds the group-level Offer fields
+    (already clean) and is shared, never mutated.
+    """
+    offer = {
+        "@type": "Offer",
+        "url": v.get("url") or group_url,
+        "priceCurrency": pooled(v.get("currency")) or offer_base.get("priceCurrency"),
+        "price": v.get("price"),
+        "availability": pooled(v.get("availability")) or offer_base.get("availability"),
+    }
+    offer = {k: val for k, val in offer.items() if val not in _EMPTY}
+    for key, value in offer_base.items():
+        offer.setdefault(key, value)
+
+    values = [v.get(k) for k in varies_by]
+    name = v.get("name")
+    if not name and group_name:
+        shown = [str(x) for x in values if x not in _EMPTY]
+        name = f"{group_name} ({', '.join(shown)})" if shown else group_name
+
+    product = {"@type": "Product", "name": name, "sku": v.get("sku"), "gtin": v.get("gtin"), "mpn": v.get("mpn")}
+    for key, value in zip(varies_by, values):
+        product[key] = pooled(value)
+    product["image"] = v.get("image")
+    product = {k: val for k, val in product.items() if val not in _EMPTY}
+    product["offers"] = offer
+    return product
+
+
+def _graph_ref(node: dict, node_id: str | None, shared_nodes: list):
+    """
+    {"@id"} reference to node, which goes into the @graph once. Without an
+    @id (no group url) the node stays inline in every Offer instead.
+    """
+    if not node_id:
+        return node
+    shared_nodes.append({"@type": node["@type"], "@id": node_id, **node})
+    return {"@id": node_id}
+
+
+def product_group_schema(group: dict, variants):
+    """
+    One ProductGroup per style: attributes shared by every variant are
+    written once on the group; each variant carries only what differs.
+
+    group: product_schema() fields for the shared parts (product_name,
+           product_description, brand, product_images, url, currency,
+           availability, item_condition, seller_*, shipping_*, return_*,
+           product_rating_*), plus:
+             "group_id": "STYLE-1"          -> productGroupID
+             "varies_by": ["color", "size"] -> variesBy (see VARIES_BY)
+    variants: iterable of
+      {"sku": "STYLE-1-RED-M", "color": "Red", "size": "M", "price": "49.00",
+       "url"?, "name"?, "image"?, "gtin"?, "mpn"?, "availability"?, "currency"?}
+
+    Seller, shipping and return policy become single @id nodes in the @graph
+    that every variant's Offer references (inline copies when the group has
+    no url to build @ids from); with "shipping_profile" /
+    "return_policy_profile" the Offers reference the organization-level
+    policies instead (see organization_policies_schema).
+    """
+    url = group.get("url")
+    varies_by = _parse_varies_by(group.get("varies_by"))
+    shared_nodes = []
+
+    offer_base = {
+        "priceCurrency": pooled(group.get("currency")),
+        "availability": pooled(group.get("availability")),
+        "itemCondition": pooled(group.get("item_condition")),
+    }
+
+    if group.get("seller_enabled"):
+        seller_url = group.get("seller_url")
+        seller_id = f"{seller_url.rstrip('/')}/#organization" if seller_url else _page_fragment_id(url, "seller")
+        seller = {"@type": "Organization", "name": pooled(group.get("seller_name")), "url": pooled(seller_url)}
+        offer_base["seller"] = _graph_ref(seller, seller_id, shared_nodes)
+
+    shipping_ref, return_ref = _policy_refs(group)
+    if shipping_ref:
+        offer_base["shippingDetails"] = shipping_ref
+    elif group.get("shipping_enabled"):
+        offer_base["shippingDetails"] = _graph_ref(
+            _build_shipping_details(group), _page_fragment_id(url, "shipping"), shared_nodes)
+
+    if return_ref:
+        offer_base["hasMerchantReturnPolicy"] = return_ref
+    elif group.get("return_policy_enabled"):
+        offer_base["hasMerchantReturnPolicy"] = _graph_ref(
+            _build_return_policy(group), _page_fragment_id(url, "return-policy"), shared_nodes)
+
+    offer_base = _clean_schema(offer_base)
+    group_name = group.get("product_name")
+
+    group_node = {
+        "@type": "ProductGroup",
+        "@id": _page_fragment_id(url, "product-group"),
+        "name": group_name,
+        "description": group.get("product_description"),
+        "url": url,
+        "productGroupID": group.get("group_id"),
+        "brand": {"@type": "Brand", "name": pooled(group.get("brand"))} if group.get("brand") else None,
+        "image": group.get("product_images", []),
+        "variesBy": [VARIES_BY[k] for k in varies_by],
+    }
+    if group.get("product_rating_enabled"):
+        group_node["aggregateRating"] = {
+            "@type": "AggregateRating",
+            "ratingValue": group.get("product_rating_value"),
+            "reviewCount": group.get("product_review_count"),
+            "bestRating": group.get("product_best_rating") or "5"
+        }
+
+    # Variants are built clean, so the (possibly huge) list skips _clean_schema
+    has_variant = [_build_variant(v, varies_by, offer_base, group_name, url) for v in variants]
+
+    group_node = _clean_schema(group_node)
+    if has_variant:
+        group_node["hasVariant"] = has_variant
+    return {
+        "@context": "https://schema.org",
+        "@graph": [group_node, *_clean_schema(shared_nodes)],
+    }
+
+
+def product_group_page(data: dict):
+    """
+    Single-input form of product_group_schema() for the batch tools:
+    the group fields plus "variants": [...].
+    """
+    return product_group_schema(data, data.get("variants") or [])
+
+
+def iter_product_groups(rows, group_key: str = "item_group_id"):
+    """
+    Streams one product_group_schema() document per group from a flat
+    variant feed (one row per variant, merchant-feed style). Rows of a group
+    must be consecutive; the first row of each group supplies the group
+    fields, and a later row whose GROUP_FIELDS disagree raises a warning
+    (its values are ignored). Only one group is held in memory at a time.
+
+    A row's url / image / product_images describe its variant. The group's
+    own url and images come from the "group_url" and "group_images"
+    ("|"-separated) columns; without group_url the group has no url, and
+    its shared nodes are inlined (see product_group_schema).
+    """
+    for group_id, group_rows in itertools.groupby(rows, key=lambda r: r.get(group_key)):
+        first = next(group_rows)
+        group = {k: v for k, v in first.items() if k not in _VARIANT_ONLY_FIELDS}
+        group.update({
+            "group_id": first.get("group_id") or group_id,
+            "url": first.get("group_url"),
+            "product_images": _split_cell(first.get("group_images")),
+        })
+        yield product_group_schema(group, itertools.chain([first], _check_group_rows(first, group_rows, group_id)))
+
+
+# Feed row columns that belong to the row's variant, never to its group
+_VARIANT_ONLY_FIELDS = frozenset({"url", "image", "product_images"})
+
+
+def _split_cell(value) -> list:
+    if isinstance(value, str):
+        return [v.strip() for v in value.split("|") if v.strip()]
+    return list(value or [])
+
+
+def _check_group_rows(first: dict, rows, group_id):
+    for row in rows:
+        conflicts = [k for k in GROUP_FIELDS if row.get(k) not in _EMPTY and row.get(k) != first.get(k)]
+        if conflicts:
+            warnings.warn(
+                f"Product group {group_id!r}, sku {row.get('sku')!r}: conflicting {', '.join(conflicts)}; "
+                f"the group's first row is used",
+                stacklevel=3,
+            )
+        yield row
+
+
+# -------------------------
+# Graph merge (one @context + @graph per page)
+# -------------------------
+def _graph_nodes(schema):
+    """
+    Top-level nodes of a block, a list of blocks, or @graph documents,
+    without their @context. Frozen trees (utils.frozen: tuples for lists)
+    are accepted too.
+    """
+    blocks = schema if isinstance(schema, (list, tuple)) else [schema]
+    for block in blocks:
+        if not block:
+            continue
+        if "@graph" in block:
+            yield from block["@graph"]
+        else:
+            yield {k: v for k, v in block.items() if k != "@context"}
+
+
+def _is_full_node(value) -> bool:
+    # {"@id": ...} alone is already a reference
+    return isinstance(value, dict) and isinstance(value.get("@id"), str) and len(value) > 1
+
+
+def _count_nested_ids(value, counts: dict, top: bool = False):
+    if isinstance(value, dict):
+        if not top and _is_full_node(value):
+            counts[value["@id"]] = counts.get(value["@id"], 0) + 1
+        for v in value.values():
+            _count_nested_ids(v, counts)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _count_nested_ids(v, counts)
+
+
+def _link_nested(value, hoist: set, nested_copies: dict):
+    """
+    Replaces nested nodes whose @id is in `hoist` with {"@id"} references,
+    collecting the full copies in nested_copies.
+    """
+    if isinstance(value, dict):
+        linked = {k: _link_nested(v, hoist, nested_copies) for k, v in value.items() if k != "@context"}
+        if _is_full_node(value) and value["@id"] in hoist:
+            nested_copies.setdefault(value["@id"], []).append(linked)
+            return {"@id": value["@id"]}
+        return linked
+    if isinstance(value, (list, tuple)):
+        return [_link_nested(v, hoist, nested_copies) for v in value]
+    return value
+
+
+def _merge_node(target: dict, node: dict):
+    # first non-empty value wins
+    for k, v in node.items():
+        if target.get(k) in (None, "", [], (), {}):
+            target[k] = v
+
+
+def merge_schema_graph(schema) -> dict:
+    """
+    Accepts the same input as render_schema_blocks(): a block, a list of
+    blocks, or @graph documents. Returns ONE document:
+      {"@context": "https://schema.org", "@graph": [...]}
+    (or a plain block with @context when only one node is left).
+
+    - Top-level nodes sharing an @id are merged into one node.
+    - Nested nodes whose @id is a top-level node, or that appear more than
+      once, become {"@id": ...} references; repeated nested nodes are moved
+      into the graph once.
+    """
+    top = list(_graph_nodes(schema))
+    if not top:
+        return {}
+
+    counts = {}
+    for node in top:
+        _count_nested_ids(node, counts, top=True)
+    top_ids = {node["@id"] for node in top if isinstance(node.get("@id"), str)}
+    hoist = top_ids | {node_id for node_id, n in counts.items() if n > 1}
+
+    graph = []
+    by_id = {}
+    nested_copies = {}
+    for node in top:
+        linked = {k: _link_nested(v, hoist, nested_copies) for k, v in node.items() if k != "@context"}
+        node_id = linked.get("@id")
+        if not isinstance(node_id, str):
+            graph.append(linked)
+        elif node_id in by_id:
+            _merge_node(by_id[node_id], linked)
+        else:
+            by_id[node_id] = linked
+            graph.append(linked)
+
+    # Nested copies only fill gaps; the top-level node stays authoritative
+    for node_id, copies in nested_copies.items():
+        if node_id not in by_id:
+            by_id[node_id] = {}
+            graph.append(by_id[node_id])
+        for copy in copies:
+            _merge_node(by_id[node_id], copy)
+
+    if len(graph) == 1:
+        return {"@context": "https://schema.org", **graph[0]}
+    return {"@context": "https://schema.org", "@graph": graph}
+
+
+def render_schema_blocks(schema, graph: bool = False) -> str:
     """
     Accepts:
       - dict (single schema)
       - list[dict] (multiple schemas)
     Returns JSON-LD <script> tags.
+    graph=True merges everything into a single @graph script tag (see merge_schema_graph).
     """
     if not schema:
         return ""
 
+    if graph:
+        return to_script_tag(merge_schema_graph(schema))
+
     if isinstance(schema, dict):
         return to_script_tag(schema)
 
     if isinstance(schema, list):
         return "\n\n".join(to_script_tag(block) for block in schema)
 
-    raise TypeError("render_schema_blocks expects dict or list of dicts")
\ No newline at end of file
+    raise TypeError("render_schema_blocks expects dict or list of dicts")
+
+
+# Page type -> builder (the first five are the app's sidebar page types)
+PAGE_BUILDERS = {
+    "Homepage": homepage_schema,
+    "Local Business": local_business_schema,
+    "Service Page": service_page_schema,
+    "Collection / Category Page": collection_schema,
+    "Product Page": product_schema,
+    "Product Group": product_group_page,
+    "Organization Policies": organization_policies_schema,
+}
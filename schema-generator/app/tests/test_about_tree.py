@@ -0,0 +1,47 @@
+from benchmarks.fixtures import _homepage_full
+from templates.page_templates import _build_main_entity_of_page_webpage, homepage_schema
+from utils.about_tree import iter_about_things
+
+LINES = [
+    "Furniture | https://en.wikipedia.org/wiki/Furniture",
+    "  - Bed | https://en.wikipedia.org/wiki/Bed",
+    "      - Bunk bed",
+    "Lighting",
+]
+
+
+def _webpage(schema):
+    blocks = schema if isinstance(schema, list) else [schema]
+    for block in blocks:
+        page = block.get("mainEntityOfPage")
+        if isinstance(page, dict):
+            return page
+
+
+def test_things_go_into_the_page_as_parsed():
+    about = list(iter_about_things(LINES))
+    data = _homepage_full()
+    data["main_entity_of_page"] = {**data["main_entity_of_page"], "about": about}
+
+    page = _webpage(homepage_schema(data))
+    assert page["about"] == [
+        {"@type": "Thing", "name": "Furniture", "sameAs": ["https://en.wikipedia.org/wiki/Furniture"],
+         "hasPart": [{"@type": "Thing", "name": "Bed", "sameAs": ["https://en.wikipedia.org/wiki/Bed"],
+                      "hasPart": [{"@type": "Thing", "name": "Bunk bed"}]}]},
+        {"@type": "Thing", "name": "Lighting"},
+    ]
+
+
+def test_webpage_builder_uses_things_without_rebuilding():
+    about = list(iter_about_things(LINES))
+    page = _build_main_entity_of_page_webpage({"name": "Home", "about": about}, "https://x.com/")
+    assert all(a is b for a, b in zip(page["about"], about))
+
+
+def test_form_shaped_entries_are_still_converted():
+    page = _build_main_entity_of_page_webpage({"name": "Home", "about": [
+        {"name": "Furniture", "same_as": ["https://en.wikipedia.org/wiki/Furniture"],
+         "has_part": [{"name": "Bed", "same_as": [], "has_part": [{"name": "Bunk bed", "same_as": []}]}]},
+    ]}, "https://x.com/")
+    assert page["about"][0]["sameAs"] == ["https://en.wikipedia.org/wiki/Furniture"]
+    assert page["about"][0]["hasPart"][0]["hasPart"][0] == {"@type": "Thing", "name": "Bunk bed", "sameAs": []}
@@ -0,0 +1,10 @@
+from utils.byte_budget import apply_byte_budget
+from utils.schema_helpers import to_script_tag
+
+
+def test_budget_counts_script_escapes():
+    schema = {"@type": "FAQPage", "mainEntity": [
+        {"@type": "Question", "name": f"Q{i}</b>", "text": "a</script>b</p>"} for i in range(20)]}
+    for max_bytes in (10_000, 1_500, 600):
+        result = apply_byte_budget(schema, max_bytes, page_type="Service Page")
+        assert result["bytes"] == len(to_script_tag(result["schema"]))
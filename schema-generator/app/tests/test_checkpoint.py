@@ -0,0 +1,37 @@
+from batch.checkpoint import Checkpoint
+
+
+def _journal(tmp_path, text):
+    path = tmp_path / ".checkpoint"
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def test_torn_line_is_ignored_across_restarts(tmp_path):
+    # crash while writing "p10": the journal ends in the fragment "p1"
+    path = _journal(tmp_path, "p0\np2\np1")
+
+    for _ in range(2):
+        with Checkpoint(path) as checkpoint:
+            assert "p0" in checkpoint and "p2" in checkpoint
+            assert "p1" not in checkpoint
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "p0\np2\n"
+
+
+def test_keys_after_a_torn_line_are_kept(tmp_path):
+    path = _journal(tmp_path, "p0\np1")
+    with Checkpoint(path, flush_every=1) as checkpoint:
+        checkpoint.mark("p10")
+
+    with Checkpoint(path) as checkpoint:
+        assert checkpoint.done == {"p0", "p10"}
+
+
+def test_restart_starts_over(tmp_path):
+    path = _journal(tmp_path, "p0\np1\n")
+    with Checkpoint(path, resume=False) as checkpoint:
+        assert "p0" not in checkpoint
+    with Checkpoint(path) as checkpoint:
+        assert checkpoint.done == set()
@@ -0,0 +1,96 @@
+import json
+
+import pandas as pd
+import pytest
+
+from batch.coerce import coerce_count, coerce_feed, coerce_frame, coerce_price, coerce_rating
+
+
+def _coerce(fn, values, **kwargs):
+    errors = []
+    raw = pd.Series(values, index=range(1, len(values) + 1), dtype=object)
+    out = fn(raw, errors, **kwargs)
+    bad = pd.concat(errors)["row"].tolist() if errors else []
+    return [None if pd.isna(v) else v for v in out], bad
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("10 USD", "10.00"),
+    ("usd 10", "10.00"),
+    ("$1,234.5", "1234.50"),
+    ("1.234,50 €", "1234.50"),
+    ("1 234,50", "1234.50"),
+    ("2.675", "2.68"),
+    ("12,5", "12.50"),
+    ("1,234", "1234.00"),
+])
+def test_price_accepts_currency_and_separators(value, expected):
+    assert _coerce(coerce_price, [value]) == ([expected], [])
+
+
+@pytest.mark.parametrize("value", ["5e3", "2 x 10", "10 dollars", "1-2", "N/A", "-5"])
+def test_price_rejects_garbage(value):
+    assert _coerce(coerce_price, [value]) == ([None], [1])
+
+
+def test_comma_rule_is_shared():
+    assert _coerce(coerce_rating, ["1,0", "4,5"], column="rating_value") == ([1.0, 4.5], [])
+    assert _coerce(coerce_count, ["1,0", "1,200", "12.0"], column="return_days") == ([1, 1200, 12], [])
+    # a day count with a fraction is rejected, never scaled by 10
+    assert _coerce(coerce_count, ["1,5", "2.5"], column="return_days") == ([None, None], [1, 2])
+
+
+def test_frame_reports_price_errors():
+    frame = pd.DataFrame({"price": ["5e3", "19.99"]}, index=[1, 2])
+    out, errors = coerce_frame(frame)
+    assert out["price"].isna().tolist() == [True, False]
+    assert errors[["row", "column", "error"]].values.tolist() == [[1, "price", "not a price"]]
+
+
+def test_ratings_are_checked_against_their_row_best_rating():
+    frame = pd.DataFrame({
+        "product_rating_value": ["9", "9", "0.5", "4,5"],
+        "product_best_rating": ["10", None, "10", "-1"],
+    }, index=range(1, 5))
+    out, errors = coerce_frame(frame)
+
+    assert out["product_rating_value"].tolist()[0] == 9.0
+    assert pd.isna(out["product_rating_value"].tolist()[1])  # default bestRating 5
+    assert errors[["row", "column", "error"]].values.tolist() == [
+        [2, "product_rating_value", "rating out of range"],
+        [3, "product_rating_value", "rating out of range"],
+        [4, "product_best_rating", "must be positive"],
+    ]
+
+
+def test_inverted_day_ranges_drop_the_max():
+    frame = pd.DataFrame({"handling_min_days": ["3", "1"], "handling_max_days": ["1", "2"]}, index=[1, 2])
+    out, errors = coerce_frame(frame)
+
+    assert out["handling_max_days"].tolist()[1] == 2 and pd.isna(out["handling_max_days"].tolist()[0])
+    assert errors[["row", "column", "value", "error"]].values.tolist() == [
+        [1, "handling_max_days", "1", "less than handling_min_days"],
+    ]
+
+
+def test_coerce_feed(tmp_path):
+    feed = tmp_path / "feed.csv"
+    feed.write_text(
+        "product_name,price,review_count,sku\n"
+        "Chair,$49.5,12,007\n"
+        "Table,oops,1.5,008\n"
+        "Lamp,,3,009\n"
+    )
+    out, errors_path = tmp_path / "feed.ndjson", tmp_path / "errors.csv"
+    summary = coerce_feed(str(feed), str(out), str(errors_path), chunk_size=2)
+
+    assert summary["rows"] == 3 and summary["errors"] == 2
+    assert summary["errors_by_column"] == {"price": 1, "review_count": 1}
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert rows == [
+        {"product_name": "Chair", "price": "49.50", "review_count": 12, "sku": "007"},
+        {"product_name": "Table", "sku": "008"},
+        {"product_name": "Lamp", "review_count": 3, "sku": "009"},
+    ]
+    errors = pd.read_csv(errors_path)  # one header across chunks
+    assert errors[["row", "column"]].values.tolist() == [[2, "price"], [2, "review_count"]]
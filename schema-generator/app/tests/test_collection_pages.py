@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.fixtures import _collection
+from templates.page_templates import collection_pages, collection_schema
+
+
+def _page_nodes(docs):
+    return [doc["@graph"][0] for doc in docs]
+
+
+@pytest.mark.parametrize("url, pattern", [
+    ("https://example-furniture.com/chairs/", "https://example-furniture.com/chairs/page/{page}/"),
+    ("https://example-furniture.com/chairs", "https://example-furniture.com/chairs/page/{page}/"),
+    ("https://example-furniture.com/chairs/", "https://example-furniture.com/chairs?page={page}"),
+])
+def test_page_urls_and_ids_are_consistent(url, pattern):
+    data = {**_collection(25), "url": url}
+    pages = _page_nodes(collection_pages(data, page_size=10, url_pattern=pattern))
+
+    assert len(pages) == 3
+    assert pages[0]["url"] == "https://example-furniture.com/chairs"
+    assert not any(p["url"].endswith("/") for p in pages)
+    assert all(p["@id"] == _fragment(p["url"], "collectionpage") for p in pages)
+    # page 1 keeps collection_schema()'s @id
+    assert pages[0]["@id"] == collection_schema(data)["@graph"][0]["@id"]
+
+
+def _fragment(url, name):
+    return f"{url}#{name}" if "?" in url else f"{url}/#{name}"
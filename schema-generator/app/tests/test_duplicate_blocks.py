@@ -0,0 +1,76 @@
+import json
+
+from batch.duplicate_blocks import count_duplicates, duplicate_report, iter_blocks
+
+
+def _faq(page, question="Do you ship?"):
+    return {
+        "@type": "FAQPage",
+        "@id": f"https://x.com/{page}/#faq",
+        "mainEntity": [{"@type": "Question", "name": question,
+                        "acceptedAnswer": {"@type": "Answer", "text": "Yes."}}],
+    }
+
+
+def _crumbs(page):
+    return {"@type": "BreadcrumbList", "itemListElement": [
+        {"@type": "ListItem", "position": 1, "name": "Home", "item": "https://x.com/"},
+        {"@type": "ListItem", "position": 2, "name": page, "item": f"https://x.com/{page}/"},
+    ]}
+
+
+PAGES = {
+    "a": [{"@type": "Service", "name": "A"}, _faq("a"), _crumbs("a")],
+    "b": [{"@type": "Service", "name": "B"}, _faq("b"), _crumbs("b")],
+    "c": {"@type": "WebPage", "mainEntity": _faq("c")},  # nested, not top level
+    "d": [_faq("d", "Do you install?")],
+}
+
+
+def _write_dir(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    for page, schema in PAGES.items():
+        (out / f"{page}@service-page.json").write_text(json.dumps(schema))
+    return out
+
+
+def test_blocks_identical_but_for_id_form_one_cluster(tmp_path):
+    report = duplicate_report(str(_write_dir(tmp_path)))
+
+    assert report["totals"] == {"pages": 4, "blocks": 6, "distinct_blocks": 4, "duplicate_blocks": 3, "clusters": 1}
+    cluster, = report["clusters"]
+    assert cluster["type"] == "FAQPage" and cluster["count"] == 3
+    assert cluster["examples"] == ["a@service-page", "b@service-page", "c@service-page"]
+    assert "@id" not in cluster["sample"]
+
+
+def test_ndjson_input_and_spilled_runs_match(tmp_path):
+    results = tmp_path / "schemas.ndjson"
+    with open(results, "w") as f:
+        for page, schema in PAGES.items():
+            f.write(json.dumps({"id": page, "line": 1, "schema": schema, "error": None}) + "\n")
+        f.write(json.dumps({"id": "bad", "line": 5, "schema": None, "error": "ValueError: x"}) + "\n")
+
+    in_memory = duplicate_report(str(results), min_count=1)
+    spilled = duplicate_report(str(results), min_count=1, run_size=2)
+    assert spilled == in_memory
+    assert [c["count"] for c in in_memory["clusters"]] == [3, 1, 1, 1]
+
+
+def test_list_type_blocks_are_found():
+    block = {"@type": ["FAQPage", "WebPage"], "name": "Help"}
+    schema = [{"@type": "Organization", "subjectOf": block}, {"@type": ["Thing", 7]}]
+
+    assert list(iter_blocks(schema, frozenset({"FAQPage"}))) == [block]
+    duplicates, totals = count_duplicates([("a", schema), ("b", schema)], types=["FAQPage"])
+    assert totals["clusters"] == 1 and list(duplicates.values()) == [2]
+
+
+def test_list_type_cluster_reports_the_matched_type(tmp_path):
+    results = tmp_path / "schemas.ndjson"
+    block = {"@type": ["WebPage", "FAQPage"], "name": "Help"}
+    results.write_text("".join(json.dumps({"id": p, "schema": [block]}) + "\n" for p in "ab"))
+
+    cluster, = duplicate_report(str(results))["clusters"]
+    assert cluster["type"] == "FAQPage" and cluster["examples"] == ["a", "b"]
@@ -0,0 +1,65 @@
+import csv
+import json
+
+import pytest
+
+from batch.feed_dedupe import BloomFilter, dedupe_feed
+
+ROWS = [
+    {"url": "https://x.com/p/1", "sku": "A-1"},
+    {"url": "https://x.com/p/2", "sku": "A-2"},
+    {"url": " https://x.com/p/1", "sku": "A-3"},
+    {"url": "https://x.com/P/2", "sku": ""},
+    {"url": "https://x.com/p/1", "sku": "A-3"},
+    {"url": "https://x.com/p/5", "sku": ""},
+]
+
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / "feed.csv"
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["url", "sku"])
+        writer.writeheader()
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def _found(report):
+    return {(d["field"], d["key"]): d["rows"] for d in report["duplicates"]}
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    keys = [f"https://x.com/p/{i}" for i in range(1000)]
+    false_positives = sum(bloom.add(key) for key in keys)
+    assert false_positives < 50  # sized for 1%
+    assert all(key in bloom for key in keys)
+    assert all(bloom.add(key) for key in keys)
+    assert bloom.stats()["keys"] == 1000 - false_positives
+
+
+def test_exact_duplicates_with_row_numbers(feed):
+    report = dedupe_feed(feed)
+
+    assert report["rows"] == 6
+    assert _found(report) == {("url", "https://x.com/p/1"): [1, 3, 5], ("sku", "A-3"): [3, 5]}
+    assert report["fields"] == {"url": {"duplicate_keys": 1, "duplicate_rows": 2},
+                                "sku": {"duplicate_keys": 1, "duplicate_rows": 1}}
+
+
+def test_lowercase_keys(feed):
+    report = dedupe_feed(feed, fields=["url"], lowercase=True)
+    assert _found(report) == {("url", "https://x.com/p/1"): [1, 3, 5], ("url", "https://x.com/p/2"): [2, 4]}
+
+
+def test_false_positives_are_not_reported(tmp_path):
+    path = tmp_path / "feed.ndjson"
+    rows = [{"url": f"https://x.com/p/{i}", "sku": f"S-{i}"} for i in range(2000)] + [{"url": "https://x.com/p/7"}]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    # a filter sized for far fewer rows: most keys become candidates, pass 2 weeds them out
+    report = dedupe_feed(str(path), expected_rows=10, error_rate=0.5, max_rows=1)
+
+    assert report["candidates"] > 100
+    assert report["duplicates"] == [{"field": "url", "key": "https://x.com/p/7", "count": 2, "rows": [8]}]
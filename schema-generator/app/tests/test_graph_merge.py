@@ -0,0 +1,26 @@
+from templates.page_templates import merge_schema_graph
+from utils.frozen import BuildCache, FragmentCache, freeze
+
+BRAND = {"@type": "Brand", "@id": "https://x.com/#brand", "name": "X"}
+
+
+def _blocks():
+    return [
+        {"@context": "https://schema.org", "@type": "WebSite", "@id": "https://x.com/#website", "publisher": [BRAND]},
+        {"@context": "https://schema.org", "@type": "Product", "@id": "https://x.com/p#product",
+         "brand": BRAND, "offers": [{"@type": "Offer", "seller": [BRAND]}]},
+    ]
+
+
+def test_frozen_blocks_merge_like_plain_ones():
+    expected = merge_schema_graph(_blocks())
+    assert {"@id": "https://x.com/#brand"} in expected["@graph"][0]["publisher"]
+    assert merge_schema_graph(freeze(_blocks())) == expected
+    assert merge_schema_graph(freeze(_blocks(), FragmentCache())) == expected
+
+
+def test_cached_builder_result_merges():
+    cache = BuildCache()
+    schema = cache.get_or_build("Homepage", {"k": 1}, lambda data: _blocks())
+    assert isinstance(schema, tuple)
+    assert merge_schema_graph(schema) == merge_schema_graph(_blocks())
@@ -0,0 +1,31 @@
+import json
+import re
+
+from batch.html_inject import inject_site
+from batch.runner import page_key
+from utils.schema_helpers import to_script_tag
+
+ANSWER = 'Yes.</script><script>alert("x")</script>'
+
+
+def test_script_end_in_text_is_escaped():
+    tag = to_script_tag({"@type": "Answer", "text": ANSWER})
+    body = tag[len('<script type="application/ld+json">'): -len("</script>")]
+    assert "</" not in body
+    assert json.loads(body)["text"] == ANSWER
+
+
+def test_injected_faq_cannot_break_out_of_its_block(tmp_path):
+    site, out = tmp_path / "site", tmp_path / "out"
+    (site / "faq").mkdir(parents=True)
+    out.mkdir()
+    (site / "faq" / "index.html").write_text("<html><head>\n<title>FAQ</title>\n</head><body></body></html>")
+    schema = {"@context": "https://schema.org", "@type": "FAQPage", "mainEntity": [
+        {"@type": "Question", "name": "Safe?", "acceptedAnswer": {"@type": "Answer", "text": ANSWER}}]}
+    (out / (page_key("https://x.com/faq/", "Service Page") + ".json")).write_text(json.dumps(schema))
+
+    assert inject_site(str(site), str(out), workers=1)["updated"] == 1
+    html = (site / "faq" / "index.html").read_text()
+    blocks = re.findall(r'<script type="application/ld\+json">(.*?)</script>', html, re.DOTALL)
+    assert len(blocks) == 1 and html.count("</script") == 1
+    assert json.loads(blocks[0]) == schema
@@ -0,0 +1,15 @@
+from utils.interning import active_pool, pool_scope, pooled
+
+
+def test_no_pool_outside_a_scope():
+    assert active_pool() is None
+    value = "".join(["U", "SD"])
+    assert pooled(value) is value
+
+
+def test_scope_shares_values_and_is_released():
+    with pool_scope() as pool:
+        first = pooled("".join(["U", "SD"]))
+        assert pooled("".join(["U", "SD"])) is first
+        assert pool.stats() == {"values": 1, "hits": 1, "misses": 1}
+    assert active_pool() is None
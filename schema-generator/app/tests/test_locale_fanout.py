@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from benchmarks.fixtures import _homepage_full, _product_full, _product_group, _product_with_profiles, _service_full
+from templates.locale_fanout import LocaleSkeleton, locale_fanout
+
+
+def _full_build(page_type, data, locale, override):
+    # a skeleton with no translatable paths builds every overriding locale in full
+    return LocaleSkeleton(page_type, data, []).render(locale, override)
+
+
+CASES = [
+    ("Homepage", _homepage_full, {
+        "de-DE": {"name": "Beispiel Möbel", "description": "Massivholzmöbel."},
+        "ws-1": {"name": " Föö "},
+        "empty": {"name": "", "description": ""},
+        "ws-2": {"description": "Massivholz\n"},
+    }),
+    ("Product Page", _product_full, {
+        "de-DE": {"product_name": "Eichentisch", "breadcrumbs": [{"name": "Start"}, {"name": "Eichentisch"}]},
+        "ws": {"product_name": "\tEichentisch ", "page_name": " "},
+        "empty": {"product_name": "", "page_name": "", "breadcrumbs": [{"name": ""}]},
+    }),
+    ("Service Page", _service_full, {
+        "fr-FR": {"service_name": "Réparation", "faqs": [{"question": "Q?", "answer": "R."}]},
+        "ws": {"service_name": "Réparation ", "faqs": [{"question": " Q?"}]},
+        "empty": {"faqs": [{}, {"answer": ""}]},
+        "de-DE": {"service_name": "Klimaanlage", "url": "https://coolair.example/de/klimaanlage/",
+                  "breadcrumbs": [{"url": "https://coolair.example/de/"}, {"url": "https://coolair.example/de/klimaanlage/"}]},
+        "de-AT": {"url": "https://coolair.example/at/klimaanlage"},
+    }),
+    ("Homepage", _homepage_full, {
+        "de-DE": {"website_schema": {"url": "https://example-furniture.com"}, "site_url": "https://example-furniture.com/de/"},
+        "fr-FR": {"main_entity_of_page": {"url": "https://example-furniture.com/fr/", "name": "Accueil"}},
+    }),
+    ("Product Group", lambda: _product_group(["Natural", "Walnut"], ["S", "M"]), {
+        "de-DE": {"product_name": "Eichenstuhl", "varies_by": ["size"]},
+        "fr-FR": {"varies_by": ["colour", "size"], "variants": [{"color": "Naturel"}]},
+    }),
+    ("Product Page", _product_with_profiles, {
+        "de-DE": {"product_name": "Eichentisch", "shipping_profile": "express"},
+        "fr-FR": {"return_policy_profile": "default", "shipping_profile": "standard"},
+    }),
+]
+
+
+@pytest.mark.parametrize("page_type, make_data, locales", CASES)
+def test_fanout_matches_full_build(page_type, make_data, locales):
+    data = make_data()
+    for locale, schema in locale_fanout(page_type, data, locales):
+        assert schema == _full_build(page_type, data, locale, locales[locale]), locale
+
+
+@pytest.mark.parametrize("page_type, make_data, locales", CASES)
+def test_fanout_matches_full_build_with_untidy_base(page_type, make_data, locales):
+    data = make_data()
+    first = next(k for k in ("name", "product_name", "service_name") if k in data)
+    data[first] = f" {data[first]} "
+    data["description"] = ""
+    for locale, schema in locale_fanout(page_type, data, locales):
+        assert schema == _full_build(page_type, data, locale, locales[locale]), locale
+
+
+def test_misfit_locale_does_not_disable_the_skeleton():
+    data = _service_full()
+    skeleton = LocaleSkeleton("Service Page", data, [("service_name",), ("faqs", 3, "question")])
+    skeleton.render("de-DE", {"service_name": "Reparatur"})
+    skeleton.render("fr-FR", {"service_name": "Réparation"})
+    skeleton.render("xx", {"faqs": [{}, {}, {}, {"question": "Extra?", "answer": "Yes."}]})
+    assert skeleton.full_builds == 1
+
+
+def test_plain_text_locales_use_the_skeleton():
+    data = _service_full()
+    locales = {
+        "de-DE": {"service_name": "Klimaanlage", "faqs": [{"question": "Frage?", "answer": "Antwort."}]},
+        "fr-FR": {"service_name": "Climatisation", "url": "https://coolair.example/fr/climatisation/"},
+    }
+    paths = [("service_name",), ("faqs", 0, "question"), ("faqs", 0, "answer"), ("url",)]
+    skeleton = LocaleSkeleton("Service Page", data, paths)
+    assert ("url",) not in skeleton.paths
+    assert ("service_name",) in skeleton.paths
+    for locale, override in locales.items():
+        assert skeleton.render(locale, override) == _full_build("Service Page", data, locale, override)
+    assert skeleton.full_builds == 1  # only fr-FR, which overrides the url
+
+
+def test_rejected_profile_key_falls_back_instead_of_raising():
+    data = _product_with_profiles()
+    locales = {"de-DE": {"product_name": "Eichentisch"}, "fr-FR": {"shipping_profile": "express"}}
+    skeleton = LocaleSkeleton("Product Page", data, [("product_name",), ("shipping_profile",)])
+    assert skeleton.paths == [("product_name",)]
+    results = dict(locale_fanout("Product Page", data, locales))
+    for locale, override in locales.items():
+        assert results[locale] == _full_build("Product Page", data, locale, override)
+
+
+def _nodes(node):
+    if isinstance(node, dict):
+        yield node
+        for v in node.values():
+            yield from _nodes(v)
+    elif isinstance(node, (list, tuple)):
+        for v in node:
+            yield from _nodes(v)
+
+
+def test_list_types_get_in_language():
+    data = _homepage_full()
+    data["main_entity_of_page"]["@type"] = ["WebPage", "AboutPage"]
+    (_, schema), = locale_fanout("Homepage", data, {"de-DE": {"name": "Beispiel Möbel"}})
+    assert "⟦" not in json.dumps(schema)
+    assert any(node.get("inLanguage") == "de-DE" and isinstance(node.get("@type"), list) for node in _nodes(schema))
+
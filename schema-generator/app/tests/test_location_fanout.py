@@ -0,0 +1,45 @@
+import pytest
+
+from batch.fanout import write_location_shards
+from templates.page_templates import local_business_fanout
+
+TEMPLATE = {"url": "https://hardware.example/", "name": "Example Hardware", "business_type": "Store",
+            "telephone": "+1-555-0100"}
+
+
+def test_location_business_type_survives_shared_properties():
+    schemas = list(local_business_fanout(TEMPLATE, [
+        {"id": "1", "business_type": "HardwareStore", "street": "1 Main St"},
+        {"id": "2", "street": "2 Main St"},
+    ]))
+    assert [s["@type"] for s in schemas[1:]] == ["HardwareStore", "Store"]
+    assert all(s["@context"] == "https://schema.org" for s in schemas[1:])
+
+
+def test_stores_in_one_zip_get_distinct_ids():
+    locations = [
+        {"street": "1 Main St", "city": "Austin", "zip": "78701"},
+        {"street": "9 Oak Ave", "city": "Austin", "zip": "78701"},
+    ]
+    ids = [s["@id"] for s in list(local_business_fanout(TEMPLATE, locations))[1:]]
+    assert ids == ["https://hardware.example#location-1-main-st-austin-78701",
+                   "https://hardware.example#location-9-oak-ave-austin-78701"]
+
+
+def test_duplicate_ids_raise():
+    locations = [{"id": "a", "street": "1 Main St"}, {"id": "a", "street": "9 Oak Ave"}]
+    with pytest.raises(ValueError, match="Duplicate location"):
+        list(local_business_fanout(TEMPLATE, locations))
+
+
+def test_location_without_id_or_street_raises():
+    with pytest.raises(ValueError, match="needs an id or a street address"):
+        list(local_business_fanout(TEMPLATE, [{"city": "Austin", "zip": "78701"}]))
+    # its own url is enough
+    schemas = list(local_business_fanout(TEMPLATE, [{"url": "https://hardware.example/austin/", "zip": "78701"}]))
+    assert schemas[1]["@id"] == "https://hardware.example/austin#entity"
+
+
+def test_shards_check_duplicates_before_building(tmp_path):
+    with pytest.raises(ValueError, match="Duplicate location"):
+        write_location_shards(TEMPLATE, [{"id": "a"}, {"id": "a"}], str(tmp_path), workers=1)
@@ -0,0 +1,81 @@
+import io
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from batch.ndjson_filter import run_filter
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_answers_each_line_without_waiting_for_more_input(workers):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "batch.ndjson_filter", "--workers", str(workers), "--quiet"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    # request/response: the next line is only sent once the previous answer arrived
+    timer = threading.Timer(30, proc.kill)
+    timer.start()
+    try:
+        for i in range(3):
+            job = {"id": i, "page_type": "Product Page", "data": {"product_name": f"P{i}", "price": "1"}}
+            proc.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+            proc.stdin.flush()
+            answer = json.loads(proc.stdout.readline())
+            assert answer["id"] == i and answer["error"] is None
+        proc.stdin.write(b"not json\n")
+        proc.stdin.close()
+        assert json.loads(proc.stdout.readline())["error"].startswith("JSONDecodeError")
+        assert proc.wait() == 0
+    finally:
+        timer.cancel()
+        proc.kill()
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_output_order_and_line_numbers(workers):
+    jobs = [json.dumps({"id": i, "page_type": "Product Page", "data": {"product_name": f"P{i}"}}) for i in range(100)]
+    text = "\n".join(jobs[:50]) + "\n\nnot json\n" + "\n".join(jobs[50:])  # no trailing newline
+    out = io.BytesIO()
+    summary = run_filter(io.BytesIO(text.encode("utf-8")), out, workers=workers, chunk_size=8)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert summary == {"lines": 101, "errors": 1}
+    assert [r["line"] for r in rows] == list(range(1, 51)) + list(range(52, 103))
+    assert [r["id"] for r in rows if r["error"] is None] == list(range(100))
+
+
+def _filter(rows, **kwargs):
+    out = io.BytesIO()
+    run_filter(io.BytesIO("".join(json.dumps(r) + "\n" for r in rows).encode("utf-8")), out, **kwargs)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_data_path_needs_data_dir(tmp_path):
+    secret = tmp_path / "secret.json"
+    secret.write_text(json.dumps({"product_name": "leaked"}))
+    rows = _filter([{"page_type": "Product Page", "data_path": str(secret)}])
+    assert rows[0]["schema"] is None and "--data-dir" in rows[0]["error"]
+
+
+def test_data_path_stays_inside_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    (data_dir / "shared").mkdir(parents=True)
+    (tmp_path / "secret.json").write_text(json.dumps({"product_name": "leaked"}))
+    (data_dir / "shared" / "name.json").write_text(json.dumps("Chair"))
+    (data_dir / "chair.json").write_text(json.dumps({"product_name": {"$include": "shared/name.json"}}))
+    (data_dir / "sneaky.json").write_text(json.dumps({"product_name": {"$include": "../secret.json"}}))
+    (data_dir / "link.json").symlink_to(tmp_path / "secret.json")
+
+    rows = _filter([
+        {"page_type": "Product Page", "data_path": "chair.json"},
+        {"page_type": "Product Page", "data_path": "../secret.json"},
+        {"page_type": "Product Page", "data_path": str(tmp_path / "secret.json")},
+        {"page_type": "Product Page", "data_path": "sneaky.json"},
+        {"page_type": "Product Page", "data_path": "link.json"},
+    ], data_dir=str(data_dir))
+
+    assert rows[0]["error"] is None and rows[0]["schema"]["name"] == "Chair"
+    for row in rows[1:]:
+        assert row["schema"] is None and "outside the data directory" in row["error"]
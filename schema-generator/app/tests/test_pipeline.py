@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from batch import pipeline
+from batch.pipeline import BoundedQueue, PipelineAborted, run_pipeline
+from batch.runner import page_key
+
+
+def _feed(tmp_path, rows=400):
+    path = tmp_path / "feed.ndjson"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(json.dumps({
+                "url": f"https://example.com/p/{i}", "page_type": "Product Page",
+                "name": f"Widget {i}", "description": "x" * 300, "price": "19.99", "currency": "USD",
+            }) + "\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_every_queue_is_byte_bounded(tmp_path, workers):
+    out = str(tmp_path / "out.ndjson")
+    report = run_pipeline(_feed(tmp_path), out, workers=workers, max_buffer_mb=0.02, chunk_size=4)
+
+    for name, q in report["queues"].items():
+        assert q["max_bytes"] == 4000, name
+        assert q["peak_bytes"] <= q["max_bytes"], name
+    with open(out, encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 400
+
+
+def test_built_results_carry_their_json_size():
+    result = pipeline.build_page({"url": "https://example.com/p/1", "page_type": "Product Page",
+                                  "data": {"name": "Widget"}})
+    assert result["bytes"] == len(json.dumps(result["schema"], separators=(",", ":")))
+
+
+def test_resource_is_not_imported_at_module_level():
+    assert not hasattr(pipeline, "resource")
+    assert pipeline._peak_rss_mb() > 0
+
+
+def test_full_queue_blocks_its_producer_until_there_is_room():
+    q = BoundedQueue("q", max_items=2)
+    q.put("a")
+    q.put("b")
+    done = threading.Event()
+    producer = threading.Thread(target=lambda: (q.put("c"), done.set()))
+    producer.start()
+
+    assert not done.wait(0.1)
+    assert q.get() == "a"
+    assert done.wait(2)
+    producer.join()
+    assert [q.get(), q.get()] == ["b", "c"]
+    assert q.stats()["peak_items"] == 2 and q.stats()["producer_blocked_seconds"] > 0
+
+
+def test_oversized_item_passes_an_empty_queue_and_abort_wakes_waiters():
+    q = BoundedQueue("q", max_items=10, max_bytes=100)
+    q.put("big", size=500)
+    errors = []
+
+    def put():
+        try:
+            q.put("next", size=1)
+        except PipelineAborted as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=put)
+    producer.start()
+    time.sleep(0.05)
+    q.abort()
+    producer.join(2)
+    assert len(errors) == 1
+    with pytest.raises(PipelineAborted):
+        q.get()
+
+
+def test_ndjson_output_keeps_input_order_and_bad_lines(tmp_path):
+    feed = tmp_path / "jobs.ndjson"
+    feed.write_text(
+        json.dumps({"url": "https://x.com/p/1", "page_type": "Product Page", "data": {"product_name": "Chair"}}) + "\n"
+        "not json\n"
+        "\n"
+        + json.dumps({"url": "https://x.com/p/2", "page_type": "Blog", "data": {}}) + "\n"
+        + json.dumps({"url": "https://x.com/p/3", "page_type": "Product Page", "data": {"product_name": "Lamp"}}) + "\n"
+    )
+    out = tmp_path / "out.ndjson"
+    report = run_pipeline(str(feed), str(out), workers=2, queue_depth=1, chunk_size=1)
+
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [row["line"] for row in rows] == [1, 2, 4, 5]
+    assert [row["error"] is None for row in rows] == [True, False, False, True]
+    assert rows[1]["error"].startswith("JSONDecodeError") and rows[2]["schema"] is None
+    assert rows[3]["schema"]["name"] == "Lamp"
+    assert set(report["stages"]) == {"ingest", "parse", "build", "serialize", "write"}
+    assert report["bottleneck"] in report["stages"]
+
+
+def test_feed_rows_to_a_directory(tmp_path):
+    feed = tmp_path / "feed.csv"
+    feed.write_text("url,product_name\nhttps://x.com/p/1,Chair\nhttps://x.com/p/2,Table\n")
+    out = tmp_path / "out"
+    run_pipeline(str(feed), str(out), page_type="Product Page")
+
+    assert sorted(os.listdir(out)) == sorted(
+        page_key(f"https://x.com/p/{i}", "Product Page") + ".json" for i in (1, 2)
+    )
+    with open(out / (page_key("https://x.com/p/2", "Product Page") + ".json")) as f:
+        assert json.load(f)["name"] == "Table"
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.fixtures import _organization_policies, _product_group, _product_minimal
+from templates.page_templates import organization_policies_schema, product_group_page, product_schema
+
+
+def test_offer_references_profile_by_name_or_slug():
+    org = _organization_policies()
+    offer = product_schema({**_product_minimal(), "shipping_profile": "Express",
+                            "return_policy_profile": "default", "policy_profiles": org})["offers"]
+    assert offer["shippingDetails"] == {"@id": "https://example-furniture.com/#shipping-express"}
+    assert offer["hasMerchantReturnPolicy"] == {"@id": "https://example-furniture.com/#return-policy-default"}
+
+
+def test_product_group_offers_reference_profiles():
+    data = _product_group(["Black"], ["S"])
+    data.update({"shipping_profile": "freight", "policy_profiles": _organization_policies()})
+    graph = product_group_page(data)["@graph"]
+    offer = graph[0]["hasVariant"][0]["offers"]
+    assert offer["shippingDetails"] == {"@id": "https://example-furniture.com/#shipping-freight"}
+    assert "OfferShippingDetails" not in [node.get("@type") for node in graph]
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"shipping_profile": "standard"}, "need policy_profiles"),
+    ({"return_policy_profile": "typo", "policy_profiles": _organization_policies()}, "Unknown return-policy profile"),
+    ({"shipping_profile": "standard", "policy_profiles": {**_organization_policies(), "org_url": ""}}, "org_url"),
+])
+def test_unresolvable_profile_raises(row, message):
+    with pytest.raises(ValueError, match=message):
+        product_schema({**_product_minimal(), **row})
+
+
+def test_organization_needs_url_and_unique_ids():
+    with pytest.raises(ValueError, match="org_url"):
+        organization_policies_schema({**_organization_policies(), "org_url": None})
+    with pytest.raises(ValueError, match="share the @id"):
+        organization_policies_schema({**_organization_policies(),
+                                      "shipping_profiles": {"Express 2-Day": {}, "express-2-day": {}}})
@@ -0,0 +1,64 @@
+import warnings
+
+import pytest
+
+from benchmarks.fixtures import _product_group
+from templates.page_templates import iter_product_groups, product_group_page
+
+
+def test_group_without_url_inlines_shared_nodes():
+    data = _product_group(["Black"], ["S", "M"])
+    del data["url"]
+    data["seller_url"] = ""
+    graph = product_group_page(data)["@graph"]
+    assert len(graph) == 1
+    offer = graph[0]["hasVariant"][0]["offers"]
+    assert offer["seller"]["@type"] == "Organization"
+    assert offer["shippingDetails"]["@type"] == "OfferShippingDetails"
+    assert offer["hasMerchantReturnPolicy"]["@type"] == "MerchantReturnPolicy"
+
+
+def test_no_empty_has_variant():
+    data = _product_group([], [])
+    assert "hasVariant" not in product_group_page(data)["@graph"][0]
+
+
+def test_conflicting_group_fields_warn():
+    rows = [
+        {"item_group_id": "G1", "sku": "G1-S", "product_name": "Chair", "brand": "Oak", "size": "S"},
+        {"item_group_id": "G1", "sku": "G1-M", "product_name": "Chair", "brand": "Pine", "size": "M"},
+        {"item_group_id": "G2", "sku": "G2-S", "product_name": "Table"},
+    ]
+    with pytest.warns(UserWarning, match=r"'G1', sku 'G1-M': conflicting brand;"):
+        docs = list(iter_product_groups(rows))
+    assert len(docs) == 2
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        list(iter_product_groups([rows[0], {**rows[1], "brand": "Oak"}]))
+
+
+def test_feed_group_url_comes_from_group_url_column():
+    rows = [
+        {"item_group_id": "G1", "sku": "G1-S", "product_name": "Chair", "size": "S", "varies_by": "size",
+         "url": "https://x.com/chair?size=S", "image": "https://x.com/s.jpg",
+         "group_url": "https://x.com/chair", "group_images": "https://x.com/a.jpg | https://x.com/b.jpg"},
+        {"item_group_id": "G1", "sku": "G1-M", "product_name": "Chair", "size": "M", "varies_by": "size",
+         "url": "https://x.com/chair?size=M", "group_url": "https://x.com/chair"},
+    ]
+    group = next(iter_product_groups(rows))["@graph"][0]
+    assert group["url"] == "https://x.com/chair"
+    assert group["@id"] == "https://x.com/chair/#product-group"
+    assert group["image"] == ["https://x.com/a.jpg", "https://x.com/b.jpg"]
+    assert [v["offers"]["url"] for v in group["hasVariant"]] == ["https://x.com/chair?size=S", "https://x.com/chair?size=M"]
+    assert group["hasVariant"][0]["image"] == "https://x.com/s.jpg"
+
+
+def test_feed_group_without_group_url_borrows_no_variant_url():
+    rows = [{"item_group_id": "G1", "sku": "G1-S", "product_name": "Chair", "seller_enabled": True,
+             "seller_name": "Oak Co", "url": "https://x.com/chair?size=S", "image": "https://x.com/s.jpg"}]
+    graph = next(iter_product_groups(rows))["@graph"]
+    assert len(graph) == 1
+    group = graph[0]
+    assert "url" not in group and "@id" not in group and "image" not in group
+    assert group["hasVariant"][0]["offers"]["seller"]["name"] == "Oak Co"
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from batch.checkpoint import Checkpoint
+from batch.runner import page_key, run_jobs
+
+
+def _job(url, page_type="Product Page", **data):
+    return {"url": url, "page_type": page_type, "data": {"product_name": "Chair", **data}}
+
+
+def test_completed_run_removes_journal(tmp_path):
+    out, journal = str(tmp_path / "out"), str(tmp_path / ".checkpoint")
+    jobs = [_job(f"https://x.com/p/{i}") for i in range(3)]
+
+    report = run_jobs(jobs, out, workers=1, checkpoint=Checkpoint(journal))
+    assert report["checkpoint"]["completed"] and not os.path.exists(journal)
+
+    # changed data after a finished run is regenerated, not skipped
+    report = run_jobs([_job("https://x.com/p/0", product_name="Table")], out, workers=1, checkpoint=Checkpoint(journal))
+    assert report["checkpoint"]["skipped"] == 0
+    with open(os.path.join(out, page_key("https://x.com/p/0", "Product Page") + ".json")) as f:
+        assert json.load(f)["name"] == "Table"
+
+
+def test_interrupted_run_keeps_journal(tmp_path):
+    out, journal = str(tmp_path / "out"), str(tmp_path / ".checkpoint")
+
+    def jobs():
+        yield from (_job(f"https://x.com/p/{i}") for i in range(10))
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        run_jobs(jobs(), out, workers=1, chunk_size=1, checkpoint=Checkpoint(journal))
+    with Checkpoint(journal) as checkpoint:
+        assert 0 < len(checkpoint.done) < 10
+
+
+def test_one_url_with_two_page_types(tmp_path):
+    out, journal = str(tmp_path / "out"), str(tmp_path / ".checkpoint")
+    jobs = [_job("https://x.com/chair"), {"url": "https://x.com/chair", "page_type": "Service Page",
+                                         "data": {"service_name": "Assembly"}}]
+    checkpoint = Checkpoint(journal)
+    report = run_jobs(jobs, out, workers=1, checkpoint=checkpoint)
+
+    assert report["checkpoint"]["recorded"] == 2
+    assert sorted(os.listdir(out)) == ["chair@product-page.json", "chair@service-page.json"]
+
+
+def test_organization_policies_job_takes_its_url_from_the_job(tmp_path):
+    out = str(tmp_path / "out")
+    data = {"org_name": "Example", "shipping_profiles": {"standard": {"shipping_country": "US"}}}
+    report = run_jobs([{"url": "https://x.com/", "page_type": "Organization Policies", "data": data}], out, workers=1)
+
+    assert report["errors"] == []
+    with open(os.path.join(out, page_key("https://x.com/", "Organization Policies") + ".json")) as f:
+        graph = json.load(f)["@graph"]
+    assert graph[0]["@id"] == "https://x.com/#organization"
+    assert graph[1]["@id"].startswith("https://x.com/")
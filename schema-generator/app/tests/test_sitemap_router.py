@@ -0,0 +1,89 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from batch.runner import page_key
+from batch.sitemap_router import compile_routes, generate_from_sitemap, iter_sitemap_urls, route_url
+
+ROUTES = [
+    {"pattern": "^/$", "page_type": "Homepage"},
+    {"pattern": "^/services/", "page_type": "Service Page"},
+    {"pattern": "^/products/", "page_type": "Product Page"},
+]
+
+
+def _urlset(*urls):
+    locs = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'
+
+
+def _index(*locs):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "sitemap.xml").write_text(_index(
+        "https://x.com/sitemaps/pages.xml",
+        "https://x.com/sitemaps/products.xml.gz",
+        "https://x.com/sitemaps/gone.xml",
+    ))
+    (tmp_path / "pages.xml").write_text(_urlset("https://x.com/", "https://x.com/services/repair/", "https://x.com/about"))
+    with gzip.open(tmp_path / "products.xml.gz", "wt") as f:
+        f.write(_urlset("https://x.com/products/chair", "https://x.com/products/table"))
+
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "index.json").write_text(json.dumps({"site_url": "https://x.com/", "name": "X"}))
+    (data / "services__repair.json").write_text(json.dumps({"service_name": "Repair"}))
+    (data / "products__chair.json").write_text(json.dumps({"product_name": "Chair"}))
+    return tmp_path
+
+
+def test_index_is_followed_into_local_and_gzipped_sitemaps(site):
+    missing = []
+    urls = list(iter_sitemap_urls(str(site / "sitemap.xml"), missing))
+
+    assert urls == [
+        "https://x.com/", "https://x.com/services/repair/", "https://x.com/about",
+        "https://x.com/products/chair", "https://x.com/products/table",
+    ]
+    assert missing == ["https://x.com/sitemaps/gone.xml"]
+
+
+def test_first_matching_route_wins():
+    routes = compile_routes({"^/products/sale/": "Collection / Category Page", "^/products/": "Product Page"})
+    assert route_url("https://x.com/products/sale/chairs?page=2", routes) == "Collection / Category Page"
+    assert route_url("https://x.com/products/chair", routes) == "Product Page"
+    assert route_url("https://x.com", compile_routes(ROUTES)) == "Homepage"
+    assert route_url("https://x.com/blog/post", routes) is None
+
+
+def test_unknown_page_type_in_routes():
+    with pytest.raises(ValueError, match="Unknown page type"):
+        compile_routes([{"pattern": "^/", "page_type": "Blog"}])
+
+
+def test_generate_from_sitemap(site):
+    out = site / "out"
+    report = generate_from_sitemap(str(site / "sitemap.xml"), ROUTES, str(site / "data"), str(out), workers=1)
+
+    assert report["errors"] == []
+    assert report["skipped"] == {
+        "missing_sitemaps": ["https://x.com/sitemaps/gone.xml"],
+        "unrouted": 1,       # /about
+        "missing_data": 1,   # /products/table
+    }
+    assert sorted(os.listdir(out)) == sorted(
+        page_key(url, page_type) + ".json" for url, page_type in [
+            ("https://x.com/", "Homepage"),
+            ("https://x.com/services/repair/", "Service Page"),
+            ("https://x.com/products/chair", "Product Page"),
+        ]
+    )
+    with open(out / (page_key("https://x.com/products/chair", "Product Page") + ".json")) as f:
+        product = json.load(f)
+    assert product["@type"] == "Product" and product["name"] == "Chair"
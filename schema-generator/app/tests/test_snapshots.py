@@ -0,0 +1,33 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+from benchmarks.fixtures import FIXTURES, load_fixtures
+from benchmarks.snapshots import GOLDEN_DIR, MANIFEST_PATH, serialize
+from templates.page_templates import PAGE_BUILDERS
+
+
+with open(MANIFEST_PATH, encoding="utf-8") as f:
+    MANIFEST = json.load(f)
+
+
+def test_every_fixture_has_a_golden():
+    assert sorted(MANIFEST) == sorted(FIXTURES)
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_output_matches_golden(name):
+    (page_type, data), = load_fixtures([name]).values()
+    output = serialize(PAGE_BUILDERS[page_type](data))
+    golden = MANIFEST[name]
+    assert golden["page_type"] == page_type
+
+    full_path = os.path.join(GOLDEN_DIR, f"{name}.json")
+    if os.path.exists(full_path):
+        # compare text first so a failure shows the diff
+        with open(full_path, encoding="utf-8") as f:
+            assert output.decode("utf-8") == f.read()
+    assert len(output) == golden["bytes"]
+    assert hashlib.sha256(output).hexdigest() == golden["sha256"]
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+
+from benchmarks.streamlit_load import PAGE_STEPS, Session, percentiles, run_load_test, scenarios  # noqa: E402
+
+SIZES = {"realistic": 3}
+
+
+def test_percentiles():
+    assert percentiles([]) == {"count": 0}
+    stats = percentiles(range(1, 101))
+    assert stats["count"] == 100 and stats["p50"] == 51 and stats["max"] == 100
+
+
+def test_sessions_drive_the_app_to_real_output():
+    session = Session(timeout=60)
+    name, page_type, steps = next(s for s in scenarios(SIZES) if s[1] == "Product Page")
+    session.round([(name, page_type, steps)])
+
+    assert session.errors == []
+    assert len(session.latencies) == 1 + 1 + len(steps)  # initial load, page switch, one rerun per edit
+    output = "\n".join(block.value for block in session.at.code)
+    assert '"@type": "Product"' in output and '"name": "Oak Chair"' in output
+
+
+def test_load_report():
+    report = run_load_test(n_sessions=2, rounds=2, sizes=SIZES)
+    per_round = sum(1 + len(steps) for _, _, steps in scenarios(SIZES))
+
+    assert report["errors"] == []
+    assert report["reruns"] == 2 * (1 + 2 * per_round)
+    assert set(report["latency_ms"]["by_scenario"]) == {"initial load"} | {f"{t} / realistic" for t in PAGE_STEPS}
+    assert report["memory_mb"]["growth_per_session_per_round"] is not None
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+from batch.watch import BatchWatcher  # noqa: E402
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://x.com/services/a/</loc></url>
+  <url><loc>https://x.com/services/b/</loc></url>
+</urlset>
+"""
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (tmp_path / "sitemap.xml").write_text(SITEMAP)
+    (tmp_path / "routes.json").write_text(json.dumps({"^/services/": "Service Page"}))
+    (data / "services__a.json").write_text(json.dumps({"service_name": "A"}))
+    watcher = BatchWatcher(str(tmp_path / "sitemap.xml"), str(tmp_path / "routes.json"), str(data),
+                           str(tmp_path / "out"), report=lambda r: None)
+    watcher.rebuild_index()
+    watcher.rebuilds = 0
+    rebuild = watcher.rebuild_index
+
+    def counting_rebuild():
+        watcher.rebuilds += 1
+        rebuild()
+
+    watcher.rebuild_index = counting_rebuild
+    return watcher
+
+
+def test_unknown_files_are_ignored(watcher):
+    temp = f"{watcher.data_dir}/.services__a.json.swp.json"
+    open(temp, "w").close()
+    assert watcher.affected_pages({temp, f"{watcher.data_dir}/notes.json"}) == set()
+    assert watcher.rebuilds == 0
+
+
+def test_new_data_file_adds_only_its_page(watcher):
+    path = f"{watcher.data_dir}/services__b.json"
+    with open(path, "w") as f:
+        json.dump({"service_name": "B"}, f)
+    assert watcher.affected_pages({path}) == {"https://x.com/services/b/"}
+    assert watcher.rebuilds == 0 and len(watcher.index) == 2
+
+
+def test_config_change_rebuilds(watcher):
+    assert watcher.affected_pages({watcher.routes_path}) == {"https://x.com/services/a/"}
+    assert watcher.rebuilds == 1
@@ -0,0 +1,137 @@
+"""
+Indentation-aware parser for nested about / knowsAbout taxonomies.
+
+Input format (any depth, indentation decides nesting):
+  Furniture | https://en.wikipedia.org/wiki/Furniture, https://www.wikidata.org/wiki/Q14745
+    - Bed | https://en.wikipedia.org/wiki/Bed
+        - Bunk bed | https://en.wikipedia.org/wiki/Bunk_bed
+    - Sofa | https://en.wikipedia.org/wiki/Couch
+
+Bullet markers (- • — –) are optional. A bulleted line without indentation is
+still treated as a child of the current top-level entry, so the original
+"Parent / - Child" format keeps working.
+
+The parser is a single pass over the lines and a generator: each top-level
+entry is yielded as soon as the next top-level entry starts, so only one
+subtree is held in memory at a time.
+"""
+
+_BULLETS = "-•—–"
+
+
+def _split_entry(text):
+    """
+    "Bed | url1, url2" -> ("Bed", ["url1", "url2"])
+    """
+    if "|" in text:
+        name, urls = text.split("|", 1)
+        return name.strip(), [u.strip() for u in urls.split(",") if u.strip()]
+    return text.strip(), []
+
+
+def _iter_tree(lines, make_node, add_child):
+    """
+    Core single-pass walk shared by every output shape.
+
+    make_node(name, urls) -> node
+    add_child(parent_node, child_node) -> None
+
+    Yields finished top-level nodes.
+    """
+    root_indent = None
+    stack = []  # [(indent, node)], stack[0] is the current top-level node
+
+    for raw in lines or []:
+        if not raw:
+            continue
+        expanded = raw.expandtabs(4)
+        text = expanded.lstrip()
+        if not text:
+            continue
+        indent = len(expanded) - len(text)
+
+        is_bullet = text[0] in _BULLETS
+        if is_bullet:
+            text = text.lstrip(_BULLETS).strip()
+            if not text:
+                continue
+
+        starts_root = not is_bullet and (root_indent is None or indent <= root_indent)
+        if not starts_root and not stack:
+            # Child line before any parent: nothing to attach it to
+            continue
+
+        name, urls = _split_entry(text)
+        node = make_node(name, urls)
+
+        if starts_root:
+            if stack:
+                yield stack[0][1]
+            root_indent = indent
+            stack = [(indent, node)]
+            continue
+
+        # Unindented bullets belong directly under the top-level entry
+        if indent <= root_indent:
+            indent = root_indent + 1
+
+        while len(stack) > 1 and stack[-1][0] >= indent:
+            stack.pop()
+        add_child(stack[-1][1], node)
+        stack.append((indent, node))
+
+    if stack:
+        yield stack[0][1]
+
+
+def _make_compact(name, urls):
+    return (name, tuple(urls), [])
+
+
+def _add_compact(parent, child):
+    parent[2].append(child)
+
+
+def iter_about_nodes(lines):
+    """
+    Yields compact top-level nodes:
+      (name, (url, ...), [child_node, ...])
+    """
+    return _iter_tree(lines, _make_compact, _add_compact)
+
+
+def _make_thing(name, urls):
+    thing = {"@type": "Thing", "name": name}
+    if urls:
+        thing["sameAs"] = urls
+    return thing
+
+
+def _add_part(parent, child):
+    parts = parent.get("hasPart")
+    if parts is None:
+        parts = parent["hasPart"] = []
+    parts.append(child)
+
+
+def iter_about_things(lines):
+    """
+    Yields schema-ready top-level nodes directly, without an intermediate form:
+      {"@type":"Thing","name":"Furniture","sameAs":[...],"hasPart":[{"@type":"Thing",...}]}
+
+    Empty sameAs / hasPart are never emitted.
+    """
+    return _iter_tree(lines, _make_thing, _add_part)
+
+
+def compact_to_about(node):
+    """
+    Convert one compact node into the dict shape used by the form helpers:
+      {"name": "...", "same_as": [...], "has_part": [...]}
+    ("has_part" only when the node has children)
+    """
+    name, urls, children = node
+    out = {"name": name, "same_as": list(urls)}
+    if children:
+        out["has_part"] = [compact_to_about(c) for c in children]
+    return out
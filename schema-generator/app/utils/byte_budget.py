@@ -0,0 +1,283 @@
+"""
+Per-script-tag byte budget with priority-based property shedding.
+
+  result = apply_byte_budget(schema, max_bytes=20_000, page_type="Product Page")
+  result -> {
+    "schema": trimmed schema,
+    "bytes": 19_874,
+    "budget": 20_000,
+    "within_budget": True,
+    "decisions": [{"action": "drop", "path": "/offers/priceValidUntil", "bytes_saved": 41}, ...]
+  }
+
+Sizes are computed once per node (exactly matching json.dumps with the same
+indent, plus to_script_tag's "</" escapes when script_tag=True) and then updated incrementally: dropping a
+property or list item subtracts its cost from its ancestors instead of
+re-serializing the document.
+
+Rules (lowest priority first, i.e. shed first):
+  "aggregateRating"                                      drop every aggregateRating
+  {"key": "mainEntity", "type": "FAQPage", "action": "truncate", "min_items": 3}
+                                                         drop trailing FAQ questions
+  {"key": "itemListElement", "type": "OfferCatalog", "action": "truncate"}
+"""
+
+import json
+
+from utils.schema_helpers import to_script_tag
+
+
+# entity_recommendations() optional labels -> property keys they map to
+_OPTIONAL_LABEL_KEYS = {
+    "additionalType": ["additionalType"],
+    "about/knowsAbout": ["about", "knowsAbout"],
+    "OfferCatalog": ["hasOfferCatalog"],
+    "aggregateRating": ["aggregateRating"],
+    "identifier": ["identifier"],
+    "founder": ["founder"],
+    "hasOfferCatalog": ["hasOfferCatalog"],
+    "areaServed": ["areaServed"],
+    "offers": ["offers"],
+    "shipping/return references": ["shippingDetails", "hasMerchantReturnPolicy"],
+    "gtin/mpn": ["gtin", "mpn"],
+    "priceValidUntil": ["priceValidUntil"],
+    "itemCondition": ["itemCondition"],
+}
+
+# Large lists are trimmed before anything is dropped outright
+_DEFAULT_TRUNCATIONS = [
+    {"key": "mainEntity", "type": "FAQPage", "action": "truncate", "min_items": 1},
+    {"key": "itemListElement", "type": "OfferCatalog", "action": "truncate", "min_items": 1},
+    {"key": "itemListElement", "type": "ItemList", "action": "truncate", "min_items": 1},
+]
+
+_SCRIPT_TAG_OVERHEAD = len(to_script_tag({})) - len("{}")
+
+
+def default_shedding_order(page_type: str):
+    """
+    Truncate FAQ / OfferCatalog / ItemList first, then drop the page type's
+    optional properties from entity_recommendations() in reverse listing order.
+    """
+    from templates.page_templates import entity_recommendations
+
+    rules = [dict(r) for r in _DEFAULT_TRUNCATIONS]
+    for label in reversed(entity_recommendations(page_type).get("optional", [])):
+        for key in _OPTIONAL_LABEL_KEYS.get(label, []):
+            rules.append({"key": key, "action": "drop"})
+    return rules
+
+
+def _copy_tree(obj):
+    """
+    Plain recursive copy. Unlike deepcopy it never preserves shared references,
+    so every node has exactly one position (and depth) in the copy.
+    """
+    if isinstance(obj, dict):
+        return {k: _copy_tree(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_copy_tree(v) for v in obj]
+    return obj
+
+
+class _SizeIndex:
+    """
+    Serialized size of every container, memoized per (node, depth).
+    indent=None matches json.dumps() defaults, indent=N matches json.dumps(indent=N).
+    script_safe counts the "</" -> "<\\/" escapes to_script_tag() adds.
+    """
+
+    def __init__(self, indent: int | None, script_safe: bool = False):
+        self.indent = indent
+        self.script_safe = script_safe
+        self._memo = {}
+
+    def _atom_size(self, value) -> int:
+        size = len(json.dumps(value))
+        if self.script_safe and isinstance(value, str):
+            size += value.count("</")
+        return size
+
+    def _item_cost(self, key_len: int | None, value_size: int, depth: int) -> int:
+        key_cost = 0 if key_len is None else key_len + 2
+        if self.indent is None:
+            return key_cost + value_size + 2
+        return 1 + self.indent * (depth + 1) + key_cost + value_size + 1
+
+    def _container_size(self, items_cost: int, depth: int) -> int:
+        if self.indent is None:
+            return items_cost
+        return 2 + self.indent * depth + items_cost
+
+    def size(self, node, depth: int = 0) -> int:
+        if isinstance(node, dict):
+            memo_key = (id(node), depth)
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                return cached
+            if not node:
+                total = 2
+            else:
+                total = self._container_size(
+                    sum(self._item_cost(self._atom_size(k), self.size(v, depth + 1), depth) for k, v in node.items()),
+                    depth,
+                )
+            self._memo[memo_key] = total
+            return total
+
+        if isinstance(node, list):
+            memo_key = (id(node), depth)
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                return cached
+            if not node:
+                total = 2
+            else:
+                total = self._container_size(
+                    sum(self._item_cost(None, self.size(v, depth + 1), depth) for v in node),
+                    depth,
+                )
+            self._memo[memo_key] = total
+            return total
+
+        return self._atom_size(node)
+
+    def removal_cost(self, container, key, depth: int) -> int:
+        """
+        Bytes saved by removing container[key] (dict key or list index).
+        """
+        if len(container) == 1:
+            return self.size(container, depth) - 2
+        key_len = self._atom_size(key) if isinstance(container, dict) else None
+        return self._item_cost(key_len, self.size(container[key], depth + 1), depth)
+
+    def apply_delta(self, chain, delta: int):
+        """
+        chain: [(node, depth), ...] from the root down to the modified container.
+        """
+        for node, depth in chain:
+            memo_key = (id(node), depth)
+            self._memo[memo_key] = self._memo[memo_key] - delta
+
+
+def estimate_json_size(obj, indent: int | None = 2) -> int:
+    """
+    Exact length of json.dumps(obj, indent=indent) without building the string.
+    (ASCII output, so characters == bytes.)
+    """
+    return _SizeIndex(indent).size(obj)
+
+
+def _normalize_rule(rule):
+    if isinstance(rule, str):
+        return {"key": rule, "action": "drop"}
+    return {"action": "drop", **rule}
+
+
+def _find_matches(node, rule, chain, path, out):
+    """
+    Collect (chain, container, key, path) for every property the rule targets.
+    chain ends with (container, depth).
+    """
+    depth = len(chain)
+    if isinstance(node, dict):
+        here = chain + [(node, depth)]
+        if rule["key"] in node and (not rule.get("type") or node.get("@type") == rule["type"]):
+            out.append((here, node, rule["key"], f"{path}/{_escape(rule['key'])}"))
+        for k, v in node.items():
+            if isinstance(v, (dict, list)):
+                _find_matches(v, rule, here, f"{path}/{_escape(k)}", out)
+    elif isinstance(node, list):
+        here = chain + [(node, depth)]
+        for i, v in enumerate(node):
+            if isinstance(v, (dict, list)):
+                _find_matches(v, rule, here, f"{path}/{i}", out)
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _shed_block(block, max_bytes: int, rules, indent: int | None, overhead: int):
+    sizes = _SizeIndex(indent, script_safe=overhead > 0)
+    decisions = []
+
+    def total():
+        return sizes.size(block) + overhead
+
+    for rule in rules:
+        if total() <= max_bytes:
+            break
+        matches = []
+        _find_matches(block, rule, [], "", matches)
+
+        # Shed from the end of the document first
+        for chain, container, key, path in reversed(matches):
+            if total() <= max_bytes:
+                break
+            if key not in container:
+                continue
+            depth = chain[-1][1]
+
+            if rule["action"] == "truncate" and isinstance(container[key], list):
+                items = container[key]
+                list_chain = chain + [(items, depth + 1)]
+                removed = saved = 0
+                while len(items) > rule.get("min_items", 1) and total() > max_bytes:
+                    cost = sizes.removal_cost(items, len(items) - 1, depth + 1)
+                    items.pop()
+                    sizes.apply_delta(list_chain, cost)
+                    removed += 1
+                    saved += cost
+                if removed:
+                    decisions.append({"action": "truncate", "path": path, "removed_items": removed, "bytes_saved": saved})
+            elif rule["action"] == "drop":
+                cost = sizes.removal_cost(container, key, depth)
+                del container[key]
+                sizes.apply_delta(chain, cost)
+                decisions.append({"action": "drop", "path": path, "bytes_saved": cost})
+
+    return total(), decisions
+
+
+def apply_byte_budget(schema, max_bytes: int, rules=None, page_type: str | None = None,
+                      indent: int | None = 2, script_tag: bool = True):
+    """
+    Trim a schema (dict, or list of blocks = one script tag each) to max_bytes per tag.
+
+    rules:      shedding order, lowest priority first (see module docstring).
+                Defaults to default_shedding_order(page_type).
+    script_tag: count the <script type="application/ld+json"> wrapper too.
+
+    The input is never mutated.
+    """
+    if rules is None:
+        rules = default_shedding_order(page_type or "")
+    rules = [_normalize_rule(r) for r in rules]
+    overhead = _SCRIPT_TAG_OVERHEAD if script_tag else 0
+
+    if isinstance(schema, list):
+        blocks = [_copy_tree(b) for b in schema]
+        results = []
+        decisions = []
+        for i, block in enumerate(blocks):
+            size, block_decisions = _shed_block(block, max_bytes, rules, indent, overhead)
+            results.append(size)
+            decisions.extend({**d, "block": i} for d in block_decisions)
+        return {
+            "schema": blocks,
+            "bytes": results,
+            "budget": max_bytes,
+            "within_budget": all(s <= max_bytes for s in results),
+            "decisions": decisions,
+        }
+
+    block = _copy_tree(schema)
+    size, decisions = _shed_block(block, max_bytes, rules, indent, overhead)
+    return {
+        "schema": block,
+        "bytes": size,
+        "budget": max_bytes,
+        "within_budget": size <= max_bytes,
+        "decisions": decisions,
+    }
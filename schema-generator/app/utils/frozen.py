@@ -0,0 +1,165 @@
+"""
+Immutable, structurally shared schema trees.
+
+  freeze(schema)              -> FrozenDict / tuple tree (json.dumps output is unchanged)
+  freeze(schema, cache)       -> same, but identical subtrees become ONE shared object
+  thaw(frozen)                -> plain dict / list tree (safe to mutate)
+
+Frozen trees can be cached and handed to any number of threads without
+defensive deep copies: nothing can mutate them in place.
+
+FragmentCache hash-conses subtrees bottom-up. Children are canonicalized
+first, so a node's key is just its keys plus its children's identities,
+and building the key is O(width) rather than O(subtree).
+"""
+
+import json
+import threading
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict. Still a dict subclass, so json.dumps() and every
+    reader in this repo treat it exactly like the original mapping.
+    """
+
+    __slots__ = ("_hash",)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict is immutable; thaw() it first")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _atom(value):
+    """
+    Cache-key component for an already-frozen child. Containers are keyed by
+    identity (they're canonical); scalars by type + value so 1 / 1.0 / True
+    never collapse into one another.
+    """
+    if isinstance(value, (FrozenDict, tuple)):
+        return ("#", id(value))
+    return (type(value).__name__, value)
+
+
+class FragmentCache:
+    """
+    Thread-safe pool of canonical frozen subtrees.
+
+    max_entries bounds memory: when exceeded the pool is reset (existing
+    trees stay valid, only future sharing restarts).
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._pool = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def canonical(self, key, make):
+        with self._lock:
+            # value keeps the canonical node alive, so its id() stays unique
+            node = self._pool.get(key)
+            if node is not None:
+                self.hits += 1
+                return node
+            if len(self._pool) >= self.max_entries:
+                self._pool.clear()
+            node = make()
+            self._pool[key] = node
+            self.misses += 1
+            return node
+
+    def __len__(self):
+        return len(self._pool)
+
+    def stats(self) -> dict:
+        return {"fragments": len(self._pool), "hits": self.hits, "misses": self.misses}
+
+
+def freeze(obj, cache: FragmentCache | None = None):
+    if isinstance(obj, dict):
+        items = [(k, freeze(v, cache)) for k, v in obj.items()]
+        if cache is None:
+            return FrozenDict(items)
+        key = ("d", tuple((k, _atom(v)) for k, v in items))
+        return cache.canonical(key, lambda: FrozenDict(items))
+
+    if isinstance(obj, (list, tuple)):
+        items = tuple(freeze(v, cache) for v in obj)
+        if cache is None:
+            return items
+        key = ("l", tuple(_atom(v) for v in items))
+        return cache.canonical(key, lambda: items)
+
+    return obj
+
+
+def thaw(obj):
+    if isinstance(obj, dict):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+class BuildCache:
+    """
+    Memoizes whole builder results as frozen trees, keyed by page type + input.
+    Shared across threads / Streamlit sessions; results are immutable, so a
+    hit can be returned directly.
+    """
+
+    def __init__(self, max_entries: int = 1024, fragments: FragmentCache | None = None):
+        self.max_entries = max_entries
+        self.fragments = fragments or FragmentCache()
+        self._results = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(page_type: str, data) -> str:
+        return page_type + "\n" + json.dumps(data, sort_keys=True, default=str)
+
+    def get_or_build(self, page_type: str, data, builder):
+        key = self.key(page_type, data)
+        with self._lock:
+            hit = self._results.get(key)
+            if hit is not None:
+                self.hits += 1
+                return hit
+            self.misses += 1
+
+        result = freeze(builder(data), self.fragments)
+
+        with self._lock:
+            if len(self._results) >= self.max_entries:
+                # drop the oldest entry (dicts keep insertion order)
+                self._results.pop(next(iter(self._results)))
+            self._results[key] = result
+        return result
+
+    def stats(self) -> dict:
+        return {"results": len(self._results), "hits": self.hits, "misses": self.misses, **{
+            f"fragment_{k}": v for k, v in self.fragments.stats().items()
+        }}
@@ -0,0 +1,113 @@
+"""
+String interning / constant pooling for bulk runs.
+
+Literal constants in the builders ("https://schema.org", "Offer", "ListItem")
+are already shared by Python. Values that come from feeds are not: every
+row's "USD", "https://schema.org/InStock" or brand name is a fresh string
+object. Pooling them means 100k products hold one "USD", not 100k.
+
+  pooled("USD")                 -> the shared "USD" object (builders use this)
+  intern_row(row, FEED_FIELDS)  -> same row, repeated values shared (ingest uses this)
+
+A pool never evicts, so none is active by default (pooled() returns its
+argument). Bulk runs install one for their duration:
+
+  with pool_scope():
+      ...
+"""
+
+from contextlib import contextmanager
+
+# Feed / form fields whose values repeat heavily across rows
+POOLED_FIELDS = frozenset({
+    "page_type", "business_type", "provider_type",
+    "currency", "default_currency", "availability", "item_condition",
+    "brand", "seller_name", "seller_url", "site_name", "site_url",
+    "shipping_country", "return_policy_category", "return_method", "return_fees",
+    "country", "state", "city",
+})
+
+
+class InternPool:
+    """
+    One shared object per distinct hashable value.
+    """
+
+    def __init__(self):
+        self._pool = {}
+        self.hits = 0
+        self.misses = 0
+
+    def intern(self, value):
+        shared = self._pool.get(value)
+        if shared is None:
+            self._pool[value] = value
+            self.misses += 1
+            return value
+        self.hits += 1
+        return shared
+
+    def __len__(self):
+        return len(self._pool)
+
+    def clear(self):
+        self._pool.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {"values": len(self._pool), "hits": self.hits, "misses": self.misses}
+
+
+_active_pool = None
+
+
+def use_pool(pool: InternPool | None):
+    """
+    Swap the pool used by pooled() (None disables pooling). Returns the previous pool.
+    """
+    global _active_pool
+    previous, _active_pool = _active_pool, pool
+    return previous
+
+
+def active_pool() -> InternPool | None:
+    return _active_pool
+
+
+@contextmanager
+def pool_scope(pool: InternPool | None = None):
+    """
+    Activates `pool` (a fresh InternPool by default) for the block, then
+    restores the previous one, so the pooled values are freed with it.
+    """
+    pool = pool if pool is not None else InternPool()
+    previous = use_pool(pool)
+    try:
+        yield pool
+    finally:
+        use_pool(previous)
+
+
+def pooled(value):
+    """
+    Shared copy of a string value; anything else is returned unchanged.
+    """
+    if type(value) is str and _active_pool is not None:
+        return _active_pool.intern(value)
+    return value
+
+
+def intern_row(row: dict, fields=POOLED_FIELDS, pool: InternPool | None = None) -> dict:
+    """
+    Pool the keys of a row (json.loads creates new key strings per line) and
+    the values of the given fields.
+    """
+    if pool is None:
+        pool = _active_pool
+    if pool is None:
+        return row
+    intern = pool.intern
+    return {
+        intern(k): (intern(v) if k in fields and type(v) is str else v)
+        for k, v in row.items()
+    }
@@ -0,0 +1,84 @@
+"""
+Per-run timing recorder for the app's diagnostics panel.
+
+  recorder = PerfRecorder()
+  use_recorder(recorder)
+  lap("inputs")                    # time since the previous lap() / start
+  with timed("build"):
+      schema = product_schema(data)
+  recorder.report() -> {"spans": {"build": {"ms": 1.92, "calls": 1}, "clean": {...}}, "total_ms": 35.1}
+
+The active recorder lives in a ContextVar, so concurrent Streamlit sessions
+(one script thread each) never see each other's timings. With no recorder,
+timed() still creates and runs a generator-based context manager (about a
+microsecond); hot paths check active_recorder() first and skip it.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+
+class PerfRecorder:
+    def __init__(self):
+        self.started = self.last_lap = time.perf_counter()
+        self.spans = {}
+        self._open = set()
+
+    def add(self, name: str, seconds: float):
+        row = self.spans.setdefault(name, [0.0, 0])
+        row[0] += seconds
+        row[1] += 1
+
+    def report(self) -> dict:
+        return {
+            "spans": {name: {"ms": round(s * 1000, 2), "calls": n} for name, (s, n) in self.spans.items()},
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+        }
+
+
+_active_recorder = contextvars.ContextVar("perf_recorder", default=None)
+
+
+def use_recorder(recorder: PerfRecorder | None):
+    """
+    Set the recorder for the current context (None disables timing). Returns the previous one.
+    """
+    previous = _active_recorder.get()
+    _active_recorder.set(recorder)
+    return previous
+
+
+def active_recorder() -> PerfRecorder | None:
+    return _active_recorder.get()
+
+
+def lap(name: str):
+    """
+    Records the time since the previous lap() (or since the recorder started)
+    as span `name`. For phases that aren't a single block, e.g. a form.
+    """
+    recorder = _active_recorder.get()
+    if recorder is not None:
+        now = time.perf_counter()
+        recorder.add(name, now - recorder.last_lap)
+        recorder.last_lap = now
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Adds the block's wall time to span `name`. Nested blocks with the same
+    name (e.g. builders that clean sub-parts, then the whole) count once.
+    """
+    recorder = _active_recorder.get()
+    if recorder is None or name in recorder._open:
+        yield
+        return
+    recorder._open.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder._open.discard(name)
+        recorder.add(name, time.perf_counter() - started)
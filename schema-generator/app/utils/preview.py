@@ -0,0 +1,71 @@
+"""
+Helpers for previewing large schemas without serializing them in full.
+
+  schema_stats(schema)                  -> {"bytes": 1_234_567, "nodes": 40_210, "depth": 7}
+  resolve_path(schema, ["@graph", 1])   -> the ItemList node
+  preview_rows(node, offset=0, limit=50) -> one summary row per child, for a window of children
+"""
+
+import json
+
+from utils.byte_budget import estimate_json_size
+
+
+def schema_stats(schema, indent: int | None = 2) -> dict:
+    """
+    Output size (exact, without building the string), node count and depth.
+    """
+    nodes = 0
+    depth = 0
+    stack = [(schema, 1)]
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        depth = max(depth, level)
+        if isinstance(node, dict):
+            stack.extend((v, level + 1) for v in node.values())
+        elif isinstance(node, (list, tuple)):
+            stack.extend((v, level + 1) for v in node)
+    return {"bytes": estimate_json_size(schema, indent), "nodes": nodes, "depth": depth}
+
+
+def resolve_path(schema, path):
+    node = schema
+    for step in path or []:
+        node = node[step]
+    return node
+
+
+def summarize(value, max_chars: int = 80) -> str:
+    """
+    "{12 keys}" / "[2,000 items]" / truncated scalar JSON
+    """
+    if isinstance(value, dict):
+        label = value.get("@type") if isinstance(value.get("@type"), str) else None
+        keys = f"{len(value):,} keys"
+        return f"{{{label} · {keys}}}" if label else f"{{{keys}}}"
+    if isinstance(value, (list, tuple)):
+        return f"[{len(value):,} items]"
+    text = json.dumps(value)
+    return text if len(text) <= max_chars else text[: max_chars - 1] + "…"
+
+
+def preview_rows(node, offset: int = 0, limit: int = 50):
+    """
+    Returns (rows, total) where rows = [{"key", "summary", "is_container"}]
+    for children offset .. offset+limit only.
+    """
+    if isinstance(node, dict):
+        total = len(node)
+        items = list(node.items())[offset: offset + limit] if total > limit else list(node.items())
+    elif isinstance(node, (list, tuple)):
+        total = len(node)
+        items = [(i, node[i]) for i in range(offset, min(offset + limit, total))]
+    else:
+        return [], 0
+
+    rows = [
+        {"key": k, "summary": summarize(v), "is_container": isinstance(v, (dict, list, tuple)) and len(v) > 0}
+        for k, v in items
+    ]
+    return rows, total
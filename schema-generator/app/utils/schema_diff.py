@@ -0,0 +1,145 @@
+"""
+RFC 6902 JSON Patch diffs between two versions of a builder's output.
+
+  result = diff_schema(previous_schema, new_schema)
+  result -> {"changed": True, "patch": [{"op": "replace", "path": "/offers/price", "value": "19.99"}]}
+
+Every subtree gets a digest that is computed once, bottom-up, and cached by
+object identity. Identical subtrees are skipped with a single digest
+comparison instead of being walked, so re-publishing a large document where
+one price moved only touches the path down to that price.
+
+Schema outputs are treated as immutable: don't mutate a tree after it has
+been hashed with a SubtreeHasher you intend to reuse.
+"""
+
+import hashlib
+import json
+
+
+def _escape_token(token) -> str:
+    """
+    JSON Pointer token escaping (RFC 6901): "~" -> "~0", "/" -> "~1"
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+class SubtreeHasher:
+    """
+    Caches a digest per container node (keyed by id, holding a reference so
+    the id can't be reused while cached).
+
+    Reuse one hasher across calls to keep the previous version's digests:
+      hasher = SubtreeHasher()
+      diff_schema(v1, v2, hasher)
+      diff_schema(v2, v3, hasher)   # v2 digests are not recomputed
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def digest(self, obj) -> bytes:
+        if isinstance(obj, dict):
+            hit = self._cache.get(id(obj))
+            if hit is not None and hit[0] is obj:
+                return hit[1]
+            h = hashlib.blake2b(b"{", digest_size=16)
+            for k in sorted(obj):
+                h.update(json.dumps(k).encode())
+                h.update(self.digest(obj[k]))
+            digest = h.digest()
+        elif isinstance(obj, (list, tuple)):
+            hit = self._cache.get(id(obj))
+            if hit is not None and hit[0] is obj:
+                return hit[1]
+            h = hashlib.blake2b(b"[", digest_size=16)
+            for v in obj:
+                h.update(self.digest(v))
+            digest = h.digest()
+        else:
+            # Scalars are hashed by their JSON text, so 1 / 1.0 / True stay distinct
+            return hashlib.blake2b(json.dumps(obj).encode(), digest_size=16).digest()
+
+        self._cache[id(obj)] = (obj, digest)
+        return digest
+
+    def clear(self):
+        self._cache.clear()
+
+
+def _diff(old, new, path, ops, hasher):
+    if old is new:
+        return
+
+    old_is_dict, new_is_dict = isinstance(old, dict), isinstance(new, dict)
+    old_is_list, new_is_list = isinstance(old, (list, tuple)), isinstance(new, (list, tuple))
+
+    if old_is_dict and new_is_dict:
+        if hasher.digest(old) == hasher.digest(new):
+            return
+        for k in old:
+            if k not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape_token(k)}"})
+        for k, v in new.items():
+            child_path = f"{path}/{_escape_token(k)}"
+            if k in old:
+                _diff(old[k], v, child_path, ops, hasher)
+            else:
+                ops.append({"op": "add", "path": child_path, "value": v})
+        return
+
+    if old_is_list and new_is_list:
+        if hasher.digest(old) == hasher.digest(new):
+            return
+        _diff_list(old, new, path, ops, hasher)
+        return
+
+    if old_is_dict or new_is_dict or old_is_list or new_is_list:
+        ops.append({"op": "replace", "path": path, "value": new})
+        return
+
+    if type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def _diff_list(old, new, path, ops, hasher):
+    """
+    Trim the common prefix / suffix by digest (cheap for inserts and deletes
+    at either end), then pair the middle index-wise.
+    """
+    digest = hasher.digest
+    start = 0
+    shortest = min(len(old), len(new))
+    while start < shortest and digest(old[start]) == digest(new[start]):
+        start += 1
+
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and digest(old[old_end - 1]) == digest(new[new_end - 1]):
+        old_end -= 1
+        new_end -= 1
+
+    old_mid = old_end - start
+    new_mid = new_end - start
+
+    for i in range(min(old_mid, new_mid)):
+        _diff(old[start + i], new[start + i], f"{path}/{start + i}", ops, hasher)
+
+    if new_mid > old_mid:
+        for i in range(start + old_mid, start + new_mid):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+    elif old_mid > new_mid:
+        for i in range(start + old_mid - 1, start + new_mid - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+
+
+def diff_schema(old, new, hasher: SubtreeHasher | None = None) -> dict:
+    """
+    Compare two outputs of the same builder (dict or list of blocks).
+
+    Returns:
+      {"changed": bool, "patch": [RFC 6902 operations]}
+    """
+    hasher = hasher or SubtreeHasher()
+    ops = []
+    _diff(old, new, "", ops, hasher)
+    return {"changed": bool(ops), "patch": ops}
@@ -18,9 +18,11 @@ def clean_list(text):
 def to_script_tag(schema_dict):
     """
     Wrap a JSON-serializable dict in a JSON-LD <script> tag.
+    "</" is written as "<\\/" (the same JSON string), so text like "</script>"
+    in a description can't close the tag early.
     """
     return (
         '<script type="application/ld+json">\n'
-        + json.dumps(schema_dict, indent=2)
+        + json.dumps(schema_dict, indent=2).replace("</", "<\\/")
         + "\n</script>"
     )
\ No newline at end of file